@@ -0,0 +1,98 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from whatsapp_chatbot_python import GreenAPIBot
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    latency = 0.0
+
+    def do_GET(self) -> None:
+        # The bot checks the instance settings at startup.
+        self.send_json({
+            "incomingWebhook": "yes",
+            "outgoingMessageWebhook": "yes",
+            "outgoingAPIMessageWebhook": "yes"
+        })
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        time.sleep(self.latency)
+
+        self.send_json({"idMessage": "BAE5F4886F6F2D05"})
+
+    def send_json(self, data: dict) -> None:
+        body = json.dumps(data).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def log_message(self, *_: Any) -> None:
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure broadcast throughput against a local fake API."
+    )
+    parser.add_argument("--chats", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 8, 32]
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.01,
+        help="Simulated API latency in seconds."
+    )
+    arguments = parser.parse_args()
+
+    FakeAPIHandler.latency = arguments.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    bot = GreenAPIBot(
+        "1101000001", "token",
+        host=host, media=host,
+        delete_notifications_at_startup=False
+    )
+
+    print(f"{'concurrency':>12} {'sent':>8} {'failed':>7} {'messages/s':>11}")
+
+    for concurrency in arguments.concurrency:
+        chats = [
+            f"{79000000000 + index}@c.us" for index in range(arguments.chats)
+        ]
+
+        started = time.perf_counter()
+
+        result = None
+        for result in bot.broadcast(chats, "Hello", concurrency=concurrency):
+            pass
+
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{concurrency:>12} {result.sent:>8} {result.failed:>7}"
+            f" {arguments.chats / elapsed:>11.0f}"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
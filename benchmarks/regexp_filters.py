@@ -0,0 +1,88 @@
+import argparse
+import time
+from typing import List
+from unittest.mock import patch
+
+from whatsapp_chatbot_python import GreenAPIBot
+
+
+def create_event(text: str) -> dict:
+    return {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {
+            "chatId": "11001234567@c.us",
+            "sender": "11001234567@c.us"
+        },
+        "messageData": {
+            "typeMessage": "textMessage",
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+
+def create_bot(patterns: int) -> GreenAPIBot:
+    with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+        bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+    for index in range(patterns):
+        bot.router.message.add_handler(
+            lambda _: None, regexp=rf"(?:order|buy) {index}(?: please)?"
+        )
+
+    return bot
+
+
+def run_linear(bot: GreenAPIBot, events: List[dict]) -> None:
+    observer = bot.router.message
+    for event in events:
+        for handler in observer.handlers:
+            notification = observer.create_notification(event)
+            if handler.execute_handler(observer, notification):
+                break
+
+
+def run_combined(bot: GreenAPIBot, events: List[dict]) -> None:
+    for event in events:
+        bot.router.route_event(event)
+
+
+def measure(function, bot: GreenAPIBot, events: List[dict]) -> float:
+    started = time.perf_counter()
+    function(bot, events)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare per-handler and combined regexp matching."
+    )
+    parser.add_argument(
+        "--patterns", type=int, nargs="+", default=[100, 1000, 10000]
+    )
+    parser.add_argument("--events", type=int, default=100)
+    arguments = parser.parse_args()
+
+    print(f"{'patterns':>10} {'linear, ev/s':>14} {'combined, ev/s':>16} {'speedup':>8}")
+
+    for patterns in arguments.patterns:
+        bot = create_bot(patterns)
+
+        # Half of the events match the last pattern, half match nothing.
+        events = [
+            create_event(f"order {patterns - 1}" if index % 2 else "hello")
+            for index in range(arguments.events)
+        ]
+
+        bot.router.route_event(events[0])
+
+        linear = measure(run_linear, bot, events)
+        combined = measure(run_combined, bot, events)
+
+        print(
+            f"{patterns:>10} {len(events) / linear:>14.0f}"
+            f" {len(events) / combined:>16.0f} {linear / combined:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import time
+
+# The time is taken before other imports, so importing the bot is measured.
+STARTED = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import threading  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+from typing import Any, Dict  # noqa: E402
+
+MODES = ("default", "cached")
+
+
+class FakeAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    latency = 0.0
+
+    def do_GET(self) -> None:
+        time.sleep(self.latency)
+
+        if "/getSettings/" in self.path:
+            self.send_json({
+                "incomingWebhook": "yes",
+                "outgoingMessageWebhook": "yes",
+                "outgoingAPIMessageWebhook": "yes"
+            })
+        else:
+            self.send_json({
+                "receiptId": 1,
+                "body": {
+                    "typeWebhook": "incomingMessageReceived",
+                    "instanceData": {"idInstance": 1101000001},
+                    "timestamp": int(time.time()) + 1,
+                    "idMessage": "BAE5F4886F6F2D05",
+                    "senderData": {
+                        "chatId": "79000000000@c.us",
+                        "sender": "79000000000@c.us",
+                        "senderName": ""
+                    },
+                    "messageData": {
+                        "typeMessage": "textMessage",
+                        "textMessageData": {"textMessage": "Hello"}
+                    }
+                }
+            })
+
+    def do_DELETE(self) -> None:
+        time.sleep(self.latency)
+
+        self.send_json({"result": True, "isCleared": True})
+
+    def send_json(self, data: dict) -> None:
+        body = json.dumps(data).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def log_message(self, *_: Any) -> None:
+        pass
+
+
+def run_bot(mode: str, host: str, cache_path: str) -> Dict[str, float]:
+    from whatsapp_chatbot_python import GreenAPIBot, Notification
+    from whatsapp_chatbot_python.settings import SettingsCache
+
+    imported = time.perf_counter()
+
+    options: Dict[str, Any] = {}
+    if mode == "cached":
+        options = {
+            "settings_cache": SettingsCache(cache_path),
+            "drain_in_background": True
+        }
+
+    bot = GreenAPIBot(
+        "1101000001", "token", host=host, media=host, **options
+    )
+
+    created = time.perf_counter()
+
+    handled = []
+
+    @bot.router.message()
+    def handler(_: Notification) -> None:
+        handled.append(time.perf_counter())
+
+        raise KeyboardInterrupt
+
+    bot.run_forever()
+
+    return {
+        "import": imported - STARTED,
+        "init": created - imported,
+        "first_event": handled[0] - STARTED
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure the time from import to the first handled event."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.05,
+        help="Simulated API latency in seconds."
+    )
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.child:
+        print(json.dumps(run_bot(*arguments.child)))
+
+        return None
+
+    FakeAPIHandler.latency = arguments.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAPIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    directory = tempfile.TemporaryDirectory()
+    cache_path = os.path.join(directory.name, "settings.json")
+
+    print(
+        f"{'mode':>8} {'process, ms':>12} {'import, ms':>11}"
+        f" {'init, ms':>9} {'first event, ms':>16}"
+    )
+
+    for mode in MODES:
+        results = []
+        for _ in range(arguments.runs):
+            started = time.perf_counter()
+
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.startup",
+                    "--child", mode, host, cache_path
+                ],
+                check=True, capture_output=True, text=True
+            ).stdout
+
+            results.append({
+                **json.loads(output.splitlines()[-1]),
+                "process": time.perf_counter() - started
+            })
+
+        # The median run is shown.
+        result = sorted(results, key=lambda item: item["process"])[
+            len(results) // 2
+        ]
+
+        print(
+            f"{mode:>8} {result['process'] * 1000:>12.0f}"
+            f" {result['import'] * 1000:>11.0f}"
+            f" {result['init'] * 1000:>9.0f}"
+            f" {result['first_event'] * 1000:>16.0f}"
+        )
+
+    server.shutdown()
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
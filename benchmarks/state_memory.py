@@ -0,0 +1,71 @@
+import argparse
+import gc
+import tracemalloc
+from typing import Type
+
+from whatsapp_chatbot_python.manager.state import (
+    AbstractStateManager, CompactStateManager, StateManager
+)
+
+STATE_NAMES = ["username", "password", "confirmation"]
+
+
+def measure(
+        state_manager_class: Type[AbstractStateManager],
+        senders: int,
+        data_ratio: float
+) -> float:
+    gc.collect()
+    tracemalloc.start()
+
+    state_manager = state_manager_class()
+
+    with_data = int(senders * data_ratio)
+    for index in range(senders):
+        sender = f"{79000000000 + index}@c.us"
+
+        state_manager.set_state(
+            sender, STATE_NAMES[index % len(STATE_NAMES)]
+        )
+        if index < with_data:
+            state_manager.set_state_data(sender, {"username": "user"})
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del state_manager
+    gc.collect()
+
+    return current / senders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare the memory used by state managers."
+    )
+    parser.add_argument(
+        "--senders", type=int, nargs="+", default=[1000000, 5000000, 10000000]
+    )
+    parser.add_argument(
+        "--data-ratio", type=float, default=0.1,
+        help="Share of senders that have state data."
+    )
+    arguments = parser.parse_args()
+
+    print(
+        f"{'senders':>10} {'StateManager, B/sender':>23}"
+        f" {'Compact, B/sender':>18} {'saving':>7}"
+    )
+
+    for senders in arguments.senders:
+        default = measure(StateManager, senders, arguments.data_ratio)
+        compact = measure(CompactStateManager, senders, arguments.data_ratio)
+
+        print(
+            f"{senders:>10} {default:>23.1f} {compact:>18.1f}"
+            f" {1 - compact / default:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import asyncio
+
+from whatsapp_chatbot_python import AsyncBot, AsyncNotification
+
+bot = AsyncBot(
+    "1101000001", "d75b3a66374942c5b3c019c698abc2067e151558acbd412345"
+)
+
+
+@bot.router.message(command="start")
+async def message_handler(notification: AsyncNotification) -> None:
+    await notification.answer("Hello")
+
+
+@bot.router.message(text_message="rates")
+async def rates_handler(notification: AsyncNotification) -> None:
+    await notification.answer_with_file("data/rates.png")
+
+
+asyncio.run(bot.run_forever())
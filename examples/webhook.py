@@ -0,0 +1,21 @@
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+
+bot = GreenAPIBot(
+    "1101000001", "d75b3a66374942c5b3c019c698abc2067e151558acbd412345",
+    settings={
+        "webhookUrl": "https://example.com/webhook",
+        "webhookUrlToken": "secret",
+        "incomingWebhook": "yes",
+        "outgoingMessageWebhook": "yes",
+        "outgoingAPIMessageWebhook": "yes"
+    },
+    delete_notifications_at_startup=False
+)
+
+
+@bot.router.message(text_message="message")
+def message_handler(notification: Notification) -> None:
+    notification.answer("Hello")
+
+
+bot.run_webhook(port=8080, path="/webhook", webhook_token="secret", workers=4)
@@ -44,5 +44,6 @@ setup(
         " (CC BY-ND 4.0)"
     ),
     install_requires=["whatsapp-api-client-python>=0.0.53"],
+    extras_require={"redis": ["redis>=4.0.0"]},
     python_requires=">=3.7"
 )
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from whatsapp_chatbot_python import AsyncBot, AsyncNotification
+from whatsapp_chatbot_python.dispatcher import AsyncChatDispatcher
+
+event_example: dict = {
+    "typeWebhook": "incomingMessageReceived",
+    "senderData": {
+        "chatId": "11001234567@c.us",
+        "sender": "11001234567@c.us"
+    },
+    "messageData": {
+        "typeMessage": "textMessage",
+        "textMessageData": {
+            "textMessage": "Hello"
+        }
+    }
+}
+
+
+class AsyncManagerTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_router(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        async def message_handler(notification: AsyncNotification):
+            self.assertIsInstance(notification, AsyncNotification)
+            self.assertEqual(notification.event, event_example)
+
+            handled.append(notification.message_text)
+
+        await bot.router.route_event(event_example)
+
+        self.assertEqual(handled, ["Hello"])
+
+    async def test_sync_handler(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message(text_message="Hello")
+        def message_handler(notification: AsyncNotification):
+            handled.append(notification.chat)
+
+        await bot.router.route_event(event_example)
+
+        self.assertEqual(handled, ["11001234567@c.us"])
+
+    async def test_answer(self):
+        bot = self.create_bot()
+        bot.api.sending.sendMessageAsync = AsyncMock()
+
+        @bot.router.message()
+        async def message_handler(notification: AsyncNotification):
+            await notification.answer("Hi")
+
+        await bot.router.route_event(event_example)
+
+        bot.api.sending.sendMessageAsync.assert_awaited_once_with(
+            "11001234567@c.us", "Hi", None, None, None, None
+        )
+
+    async def test_chat_order(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        async def message_handler(notification: AsyncNotification):
+            text = notification.message_text
+            if text == "first":
+                await asyncio.sleep(0.05)
+
+            handled.append(text)
+
+        dispatcher = AsyncChatDispatcher(bot.router, bot.logger, 10)
+        for text in ["first", "second"]:
+            event = {
+                **event_example,
+                "messageData": {
+                    "typeMessage": "textMessage",
+                    "textMessageData": {"textMessage": text}
+                }
+            }
+
+            await dispatcher.submit(event)
+
+        await dispatcher.join()
+
+        self.assertEqual(handled, ["first", "second"])
+        self.assertEqual(dispatcher.chat_tasks, {})
+
+    async def test_run_forever(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        async def message_handler(notification: AsyncNotification):
+            handled.append(notification.message_text)
+
+        bot._request = AsyncMock(side_effect=[
+            {"receiptId": 1, "body": event_example},
+            None,
+            None,
+            asyncio.CancelledError()
+        ])
+
+        await bot.run_forever()
+
+        self.assertEqual(handled, ["Hello"])
+        self.assertEqual(
+            bot._request.await_args_list[1].args[1:],
+            ("DELETE", "deleteNotification", "1")
+        )
+
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def create_bot(self, mock__update_settings: MagicMock) -> AsyncBot:
+        mock__update_settings.return_value = None
+
+        return AsyncBot("", "", delete_notifications_at_startup=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.backoff import (
+    API_ERROR,
+    Backoff,
+    CLOSED,
+    CircuitBreaker,
+    HALF_OPEN,
+    NETWORK_ERROR,
+    OPEN,
+    ReceiveBackoff,
+    get_error_kind
+)
+from whatsapp_chatbot_python.metrics import Metrics
+from .test_dispatcher import create_event
+
+
+class BackoffTestCase(unittest.TestCase):
+    @patch("whatsapp_chatbot_python.backoff.random.uniform")
+    def test_backoff(self, mock_uniform):
+        mock_uniform.side_effect = lambda low, high: high
+
+        backoff = Backoff(0.1, 1.0)
+
+        delays = [round(backoff.get_delay(), 2) for _ in range(6)]
+        self.assertEqual(delays, [0.1, 0.2, 0.4, 0.8, 1.0, 1.0])
+
+        backoff.reset()
+        self.assertEqual(round(backoff.get_delay(), 2), 0.1)
+
+    def test_jitter(self):
+        backoff = Backoff(1.0, 1.0)
+
+        for _ in range(100):
+            self.assertTrue(0.5 <= backoff.get_delay() <= 1.0)
+
+    @patch("whatsapp_chatbot_python.backoff.time.monotonic")
+    def test_circuit_breaker(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+
+        changes = []
+        breaker = CircuitBreaker(
+            2, 10.0, lambda previous, state: changes.append(state)
+        )
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.get_remaining_time(), 10.0)
+
+        # A failed probe opens the circuit again.
+        mock_monotonic.return_value = 10
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+        mock_monotonic.return_value = 20
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+        self.assertEqual(
+            changes, [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+        )
+
+    @patch("whatsapp_chatbot_python.backoff.time.monotonic")
+    def test_failed_probe(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+
+        receive_backoff = ReceiveBackoff(
+            MagicMock(), None, 0.1, 1.0, failure_threshold=3,
+            recovery_timeout=30.0
+        )
+        for _ in range(3):
+            receive_backoff.on_error(NETWORK_ERROR, "Error")
+
+        # The probe fails before anything reads the state, and the bot waits
+        # for the whole timeout again.
+        mock_monotonic.return_value = 30.3
+        delay = receive_backoff.on_error(NETWORK_ERROR, "Error")
+
+        self.assertEqual(receive_backoff.breaker.state, OPEN)
+        self.assertAlmostEqual(delay, 30.0)
+
+    def test_receive_backoff(self):
+        metrics = Metrics()
+        receive_backoff = ReceiveBackoff(
+            MagicMock(), metrics, 0.1, 1.0, failure_threshold=3,
+            recovery_timeout=30.0
+        )
+
+        delays = [
+            receive_backoff.on_error(NETWORK_ERROR, "Error") for _ in range(3)
+        ]
+
+        self.assertTrue(all(delay < 1.0 for delay in delays[:2]))
+        self.assertAlmostEqual(delays[2], 30.0, places=1)
+        self.assertEqual(
+            metrics.get_counter("receive_errors_total", kind=NETWORK_ERROR), 3
+        )
+        self.assertEqual(
+            metrics.get_counter("circuit_breaker_transitions_total", state=OPEN),
+            1
+        )
+        self.assertAlmostEqual(
+            metrics.get_counter("receive_backoff_seconds_total"), sum(delays)
+        )
+
+        receive_backoff.on_success()
+
+        self.assertEqual(receive_backoff.breaker.state, CLOSED)
+        self.assertEqual(receive_backoff.backoff.attempts, 0)
+
+    def test_get_error_kind(self):
+        self.assertEqual(get_error_kind(ConnectionError()), NETWORK_ERROR)
+        self.assertEqual(get_error_kind(KeyError()), API_ERROR)
+
+
+class ReceiveLoopTestCase(unittest.TestCase):
+    def test_handler_error(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            handled.append(notification.message_text)
+
+            if notification.message_text == "1":
+                raise ValueError("Handler error")
+
+        responses = []
+        for receipt_id in range(1, 3):
+            response = MagicMock()
+            response.data = {
+                "receiptId": receipt_id,
+                "body": create_event("1@c.us", str(receipt_id))
+            }
+            responses.append(response)
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=[*responses, KeyboardInterrupt]
+        )
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        with patch("whatsapp_chatbot_python.bot.time.sleep") as mock_sleep:
+            bot.run_forever()
+
+        # The notification is deleted and the next one is received at once.
+        self.assertEqual(handled, ["1", "2"])
+        self.assertEqual(
+            bot.api.receiving.deleteNotification.call_count, 2
+        )
+        mock_sleep.assert_not_called()
+        self.assertEqual(
+            bot.metrics.get_counter("receive_errors_total", kind="handler"), 1
+        )
+
+    def test_api_error(self):
+        bot = self.create_bot()
+
+        bot.api.receiving.receiveNotification = MagicMock(side_effect=[
+            Response(None, "Connection error"),
+            Response(500, "Internal error"),
+            Response(200, "null"),
+            KeyboardInterrupt
+        ])
+
+        with patch("whatsapp_chatbot_python.bot.time.sleep") as mock_sleep:
+            bot.run_forever()
+
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(
+            bot.metrics.get_counter("receive_errors_total", kind=NETWORK_ERROR),
+            1
+        )
+        self.assertEqual(
+            bot.metrics.get_counter("receive_errors_total", kind=API_ERROR), 1
+        )
+        self.assertEqual(bot.receive_backoff.backoff.attempts, 0)
+
+    @staticmethod
+    def create_bot() -> GreenAPIBot:
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                metrics=Metrics()
+            )
+
+        bot.logger = MagicMock()
+        bot.receive_backoff.logger = bot.logger
+
+        return bot
+
+
+if __name__ == "__main__":
+    unittest.main()
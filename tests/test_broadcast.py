@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import GreenAPIBot
+
+
+class BroadcastTestCase(unittest.TestCase):
+    def test_broadcast(self):
+        bot = self.create_bot()
+
+        def send_message(chat, _):
+            if chat == "3@c.us":
+                return Response(400, "{}")
+            return Response(200, "{}")
+
+        bot.api.sending.sendMessage.side_effect = send_message
+
+        chats = [f"{index}@c.us" for index in range(10)]
+        results = list(bot.broadcast(
+            chats + ["1@c.us"], lambda chat: f"Hello, {chat}", concurrency=3
+        ))
+
+        self.assertEqual(sorted(result.chat for result in results), sorted(chats))
+        self.assertEqual(
+            [result.chat for result in results if not result.ok], ["3@c.us"]
+        )
+        self.assertEqual((results[-1].sent, results[-1].failed), (9, 1))
+        bot.api.sending.sendMessage.assert_any_call("5@c.us", "Hello, 5@c.us")
+
+    def test_checkpoint(self):
+        bot = self.create_bot()
+        bot.api.sending.sendMessage.side_effect = [
+            Response(200, "{}"), Response(200, "{}"), ConnectionError()
+        ]
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        checkpoint = os.path.join(directory.name, "checkpoint")
+
+        chats = ["1@c.us", "2@c.us", "3@c.us"]
+
+        results = list(bot.broadcast(
+            chats, "Hello", concurrency=1, checkpoint=checkpoint, max_retries=0
+        ))
+        errors = {result.chat: result.error for result in results}
+        self.assertIsInstance(errors.pop("3@c.us"), ConnectionError)
+        self.assertEqual(errors, {"1@c.us": None, "2@c.us": None})
+
+        bot.api.sending.sendMessage.side_effect = None
+        bot.api.sending.sendMessage.return_value = Response(200, "{}")
+
+        results = list(bot.broadcast(chats, "Hello", checkpoint=checkpoint))
+
+        self.assertEqual([result.chat for result in results], ["3@c.us"])
+        with open(checkpoint) as file:
+            self.assertEqual(sorted(file.read().split()), chats)
+
+    def test_retry(self):
+        bot = self.create_bot()
+        bot.api.sending.sendMessage.side_effect = [
+            Response(429, "{}"), Response(200, "{}")
+        ]
+
+        with patch("whatsapp_chatbot_python.outbox.time.sleep") as mock_sleep:
+            results = list(bot.broadcast(["1@c.us"], "Hello"))
+
+        self.assertTrue(results[0].ok)
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_broadcast_file(self):
+        bot = self.create_bot()
+        bot.api.sending.sendFileByUrl.return_value = Response(200, "{}")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "rates.png")
+        with open(path, "wb") as file:
+            file.write(b"image")
+
+        with patch.object(bot.api, "raw_request") as mock_raw_request:
+            mock_raw_request.return_value = Response(
+                200, '{"urlFile": "https://example.com/rates.png"}'
+            )
+
+            results = list(bot.broadcast_file(
+                ["1@c.us", "2@c.us"], path, caption="Rates"
+            ))
+
+        # The file is uploaded once.
+        mock_raw_request.assert_called_once()
+        self.assertTrue(all(result.ok for result in results))
+        bot.api.sending.sendFileByUrl.assert_any_call(
+            "2@c.us", "https://example.com/rates.png", "rates.png", "Rates"
+        )
+
+    @staticmethod
+    def create_bot() -> GreenAPIBot:
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+        bot.api.sending = MagicMock()
+
+        return bot
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.dedupe import EventDeduplicator, get_event_key
+from whatsapp_chatbot_python.metrics import Metrics
+from .test_dispatcher import create_event
+
+
+def create_message(id_message: str) -> dict:
+    return {**create_event("1@c.us", id_message), "idMessage": id_message}
+
+
+class EventDeduplicatorTestCase(unittest.TestCase):
+    def test_get_event_key(self):
+        status = {
+            "typeWebhook": "outgoingMessageStatus",
+            "idMessage": "1",
+            "status": "sent"
+        }
+
+        self.assertEqual(
+            get_event_key(status), ":outgoingMessageStatus:1:sent"
+        )
+        self.assertNotEqual(
+            get_event_key(status), get_event_key({**status, "status": "read"})
+        )
+        self.assertIsNone(get_event_key({"typeWebhook": "stateInstanceChanged"}))
+
+        # The same group message is received by every instance in the group.
+        self.assertNotEqual(
+            get_event_key({**status, "instanceData": {"idInstance": 1101}}),
+            get_event_key({**status, "instanceData": {"idInstance": 1102}})
+        )
+
+    def test_router(self):
+        metrics = Metrics()
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                deduplicator=EventDeduplicator(metrics=metrics)
+            )
+
+        handled = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            handled.append(notification.event["idMessage"])
+
+        for id_message in ["1", "2", "1"]:
+            bot.router.route_event(create_message(id_message))
+
+        self.assertEqual(handled, ["1", "2"])
+        self.assertEqual(
+            (bot.router.deduplicator.hits, bot.router.deduplicator.misses),
+            (1, 2)
+        )
+        self.assertEqual(metrics.get_counter("dedupe_hits_total"), 1)
+        self.assertEqual(metrics.get_counter("dedupe_misses_total"), 2)
+
+    def test_handler_error(self):
+        deduplicator = EventDeduplicator()
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                deduplicator=deduplicator
+            )
+
+        @bot.router.message()
+        def handler(_: Notification):
+            raise ValueError
+
+        # A notification that was not handled is not remembered.
+        with self.assertRaises(ValueError):
+            bot.router.route_event(create_message("1"))
+
+        self.assertFalse(deduplicator.is_handled(create_message("1")))
+
+    def test_max_size(self):
+        deduplicator = EventDeduplicator(max_size=2)
+
+        for id_message in ["1", "2", "3"]:
+            deduplicator.add(create_message(id_message))
+
+        self.assertEqual(len(deduplicator), 2)
+        self.assertFalse(deduplicator.is_handled(create_message("1")))
+        self.assertTrue(deduplicator.is_handled(create_message("3")))
+
+    @patch("whatsapp_chatbot_python.dedupe.time.time")
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 0
+
+        deduplicator = EventDeduplicator(ttl=10)
+        deduplicator.add(create_message("1"))
+
+        mock_time.return_value = 5
+        deduplicator.add(create_message("2"))
+
+        mock_time.return_value = 10
+        self.assertFalse(deduplicator.is_handled(create_message("1")))
+        self.assertTrue(deduplicator.is_handled(create_message("2")))
+
+        deduplicator.add(create_message("3"))
+        self.assertEqual(len(deduplicator), 2)
+
+    def test_path(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "events.db")
+
+        deduplicator = EventDeduplicator(path=path)
+        deduplicator.add(create_message("1"))
+        deduplicator.close()
+
+        # Handled notifications are remembered after a restart.
+        deduplicator = EventDeduplicator(path=path)
+        self.addCleanup(deduplicator.close)
+
+        self.assertTrue(deduplicator.is_handled(create_message("1")))
+        self.assertFalse(deduplicator.is_handled(create_message("2")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,325 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.dispatcher import (
+    ChatWorkerPool,
+    NotificationPrefetcher,
+    ProcessSupervisor,
+    get_chat_id,
+    get_shard
+)
+
+
+def create_event(chat: str, text: str) -> dict:
+    return {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {"chatId": chat, "sender": chat},
+        "messageData": {
+            "typeMessage": "textMessage",
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+
+class DispatcherTestCase(unittest.TestCase):
+    def test_get_chat_id(self):
+        self.assertEqual(
+            get_chat_id(create_event("1@c.us", "")), "1@c.us"
+        )
+        self.assertEqual(
+            get_chat_id({
+                "typeWebhook": "outgoingMessageStatus", "chatId": "2@c.us"
+            }), "2@c.us"
+        )
+        self.assertEqual(
+            get_chat_id({"typeWebhook": "incomingCall", "from": "3@c.us"}),
+            "3@c.us"
+        )
+
+    def test_chat_order(self):
+        bot = self.create_bot()
+
+        lock = threading.Lock()
+        handled = {}
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            time.sleep(0.001)
+
+            with lock:
+                handled.setdefault(notification.chat, []).append(
+                    int(notification.message_text)
+                )
+
+        pool = ChatWorkerPool(bot.router, bot.logger, 4)
+        pool.start()
+
+        for index in range(50):
+            for chat in ["1@c.us", "2@c.us", "3@c.us"]:
+                pool.submit(create_event(chat, str(index)))
+
+        pool.stop()
+
+        self.assertEqual(len(handled), 3)
+        for messages in handled.values():
+            self.assertEqual(messages, list(range(50)))
+
+    def test_parallel_chats(self):
+        bot = self.create_bot()
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        @bot.router.message()
+        def handler(_):
+            barrier.wait()
+
+        pool = ChatWorkerPool(bot.router, bot.logger, 2)
+        pool.start()
+
+        shards = {}
+        for chat in ["1@c.us", "2@c.us", "3@c.us", "4@c.us"]:
+            event = create_event(chat, "")
+            shards.setdefault(get_shard(event, 2), event)
+
+        self.assertEqual(len(shards), 2)
+
+        for event in shards.values():
+            pool.submit(event)
+
+        pool.stop()
+
+        self.assertFalse(barrier.broken)
+
+    def test_run_forever(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            handled.append(notification.message_text)
+
+        response = MagicMock()
+        response.data = {"receiptId": 1, "body": create_event("1@c.us", "1")}
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=[response, KeyboardInterrupt]
+        )
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        bot.run_forever(workers=2)
+
+        self.assertEqual(handled, ["1"])
+        bot.api.receiving.deleteNotification.assert_called_once_with(1)
+
+    def test_prefetcher(self):
+        bot = self.create_bot()
+
+        responses = []
+        for receipt_id in [1, 2, 2, 3]:
+            response = MagicMock()
+            response.data = {
+                "receiptId": receipt_id,
+                "body": create_event("1@c.us", str(receipt_id))
+            }
+            responses.append(response)
+
+        empty = MagicMock()
+        empty.data = None
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=lambda: responses.pop(0) if responses else empty
+        )
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        prefetcher = NotificationPrefetcher(bot.api, bot.logger, 2)
+        prefetcher.start()
+
+        events = [prefetcher.get() for _ in range(3)]
+
+        prefetcher.stop()
+
+        self.assertEqual(
+            [event["messageData"]["textMessageData"]["textMessage"]
+             for event in events], ["1", "2", "3"]
+        )
+        self.assertEqual(list(prefetcher.drain()), [])
+        self.assertEqual(
+            [call.args[0] for call in
+             bot.api.receiving.deleteNotification.call_args_list],
+            [1, 2, 2, 3]
+        )
+
+    def test_run_forever_prefetch(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            handled.append(notification.message_text)
+
+            if len(handled) == 2:
+                raise KeyboardInterrupt
+
+        responses = []
+        for receipt_id in range(1, 4):
+            response = MagicMock()
+            response.data = {
+                "receiptId": receipt_id,
+                "body": create_event("1@c.us", str(receipt_id))
+            }
+            responses.append(response)
+
+        empty = MagicMock()
+        empty.data = None
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=lambda: responses.pop(0) if responses else empty
+        )
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        bot.run_forever(prefetch=4)
+
+        deleted = [
+            str(call.args[0]) for call in
+            bot.api.receiving.deleteNotification.call_args_list
+        ]
+
+        self.assertEqual(handled[:2], ["1", "2"])
+        self.assertTrue(set(deleted) <= set(handled))
+
+    def test_process_supervisor(self):
+        bot = self.create_bot()
+
+        results = multiprocessing.get_context("fork").SimpleQueue()
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            results.put((
+                os.getpid(), notification.chat, int(notification.message_text)
+            ))
+
+        supervisor = ProcessSupervisor(bot.router, bot.logger, 2)
+        supervisor.start()
+
+        for index in range(20):
+            for chat in ["1@c.us", "2@c.us", "3@c.us"]:
+                supervisor.submit(create_event(chat, str(index)))
+
+        supervisor.stop()
+
+        handled = {}
+        processes = {}
+        while not results.empty():
+            pid, chat, index = results.get()
+
+            handled.setdefault(chat, []).append(index)
+            processes.setdefault(chat, set()).add(pid)
+
+        self.assertEqual(len(handled), 3)
+        for chat, messages in handled.items():
+            self.assertEqual(messages, list(range(20)))
+            self.assertEqual(len(processes[chat]), 1)
+
+        self.assertEqual(supervisor.in_flight, [{}, {}])
+
+    def test_process_supervisor_restart(self):
+        bot = self.create_bot()
+
+        results = multiprocessing.get_context("fork").SimpleQueue()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        marker = os.path.join(directory.name, "crashed")
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            text = notification.message_text
+            if text == "poison":
+                os._exit(1)
+            if text == "crash" and not os.path.exists(marker):
+                open(marker, "w").close()
+
+                os._exit(1)
+
+            results.put((os.getpid(), text))
+
+        supervisor = ProcessSupervisor(bot.router, bot.logger, 1)
+        supervisor.start()
+
+        pid = supervisor.processes[0].pid
+
+        for text in ["first", "crash", "poison", "last"]:
+            supervisor.submit(create_event("1@c.us", text))
+
+        supervisor.stop()
+
+        first = results.get()
+        crash = results.get()
+        last = results.get()
+
+        self.assertEqual(first, (pid, "first"))
+        self.assertEqual(crash[1], "crash")
+        self.assertNotEqual(crash[0], pid)
+        self.assertEqual(last[1], "last")
+        self.assertEqual(supervisor.in_flight, [{}])
+
+        self.assertRaises(ValueError, bot.run_forever, workers=2, processes=2)
+
+    def test_process_supervisor_confirmed(self):
+        bot = self.create_bot()
+
+        results = multiprocessing.get_context("fork").SimpleQueue()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        marker = os.path.join(directory.name, "crashed")
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            text = notification.message_text
+            if text == "crash" and not os.path.exists(marker):
+                open(marker, "w").close()
+
+                os._exit(1)
+
+            results.put(text)
+
+        supervisor = ProcessSupervisor(bot.router, bot.logger, 1)
+        supervisor.start()
+
+        # The worker confirms the first event and dies before the
+        # supervisor reads the confirmation.
+        events = [
+            create_event("1@c.us", "first"), create_event("1@c.us", "crash")
+        ]
+        for sequence, event in enumerate(events, 1):
+            supervisor.in_flight[0][sequence] = [event, 1]
+            supervisor.queues[0].put((sequence, event))
+
+        supervisor.processes[0].join(5)
+        supervisor._check_workers()
+
+        self.assertEqual(supervisor.in_flight, [{2: [events[1], 2]}])
+
+        supervisor.stop()
+
+        self.assertEqual([results.get(), results.get()], ["first", "crash"])
+        self.assertTrue(results.empty())
+
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def create_bot(self, mock__update_settings: MagicMock) -> GreenAPIBot:
+        mock__update_settings.return_value = None
+
+        return GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
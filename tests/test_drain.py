@@ -0,0 +1,102 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.drain import NotificationDrainer
+from .test_dispatcher import create_event
+
+
+def create_response(receipt_id: int, timestamp: float) -> MagicMock:
+    response = MagicMock()
+    response.data = {
+        "receiptId": receipt_id,
+        "body": {**create_event("1@c.us", str(receipt_id)), "timestamp": timestamp}
+    }
+
+    return response
+
+
+class NotificationDrainerTestCase(unittest.TestCase):
+    def test_clear(self):
+        api = MagicMock()
+        api.queues.clearWebhooksQueue.return_value = Response(200, "{}")
+
+        self.assertEqual(NotificationDrainer(api, MagicMock()).drain(), 0)
+
+        api.queues.clearWebhooksQueue.assert_called_once()
+        api.receiving.receiveNotification.assert_not_called()
+
+    def test_delete_one_by_one(self):
+        api = MagicMock()
+        api.session.headers = {}
+        api.queues.clearWebhooksQueue.return_value = Response(500, "")
+        api.receiving.receiveNotification.side_effect = [
+            create_response(1, 0), create_response(2, 0), Response(200, "null")
+        ]
+
+        self.assertEqual(NotificationDrainer(api, MagicMock()).drain(), 2)
+
+        self.assertEqual(api.receiving.deleteNotification.call_count, 2)
+        self.assertEqual(api.session.headers, {})
+
+    def test_max_age(self):
+        api = MagicMock()
+        api.session.headers = {}
+        api.receiving.receiveNotification.side_effect = [
+            create_response(1, time.time() - 120),
+            create_response(2, time.time() - 30),
+        ]
+
+        drainer = NotificationDrainer(api, MagicMock(), max_age=60)
+
+        # Recent notifications are kept in the queue.
+        self.assertEqual(drainer.drain(), 1)
+
+        api.queues.clearWebhooksQueue.assert_not_called()
+        api.receiving.deleteNotification.assert_called_once_with(1)
+        self.assertFalse(drainer.is_stale({"timestamp": 0}))
+
+    @patch("whatsapp_chatbot_python.drain.time.time", return_value=1000.9)
+    def test_startup_second(self, _):
+        drainer = NotificationDrainer(MagicMock(), MagicMock())
+
+        self.assertTrue(drainer.is_stale({"timestamp": 900}))
+
+        # Notifications stamped in the startup second are recent, even if
+        # the server clock is a little behind.
+        self.assertFalse(drainer.is_stale({"timestamp": 998}))
+        self.assertFalse(drainer.is_stale({"timestamp": 1000}))
+
+    def test_in_background(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("", "", drain_in_background=True)
+
+        handled = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            handled.append(notification.message_text)
+
+        bot.api.receiving.receiveNotification = MagicMock(side_effect=[
+            create_response(1, time.time() - 60),
+            create_response(2, time.time() - 60),
+            create_response(3, time.time() + 1),
+            create_response(4, time.time() - 60),
+            KeyboardInterrupt
+        ])
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        bot.run_forever()
+
+        # Old notifications are deleted without handling until the first new
+        # one is received.
+        self.assertEqual(handled, ["3", "4"])
+        self.assertEqual(bot.api.receiving.deleteNotification.call_count, 4)
+        self.assertEqual(bot.drainer.skipped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import re
+import unittest
+from unittest.mock import MagicMock
+
+from whatsapp_chatbot_python import Notification
+from whatsapp_chatbot_python.filters import (
+    ChatIDFilter,
+    CommandFilter,
+    RegExpFilter,
+    TextMessageFilter
+)
+from whatsapp_chatbot_python.manager.handler import Handler
+
+
+def create_notification(text: str) -> Notification:
+    event = {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {
+            "chatId": "11001234567@c.us",
+            "sender": "11001234567@c.us"
+        },
+        "messageData": {
+            "typeMessage": "textMessage",
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+    return Notification(event, MagicMock(), MagicMock())
+
+
+class FiltersTestCase(unittest.TestCase):
+    def test_compiled_filters(self):
+        handler = Handler(
+            print,
+            from_chat=["11001234567@c.us", "11002345678@c.us"],
+            regexp=(r"hello", re.IGNORECASE),
+            unknown_filter="ignored"
+        )
+
+        self.assertEqual(len(handler.compiled_filters), 2)
+        self.assertIsInstance(handler.compiled_filters[0], ChatIDFilter)
+        self.assertEqual(
+            handler.compiled_filters[0].chat,
+            frozenset(["11001234567@c.us", "11002345678@c.us"])
+        )
+
+        self.assertTrue(handler.check_event(create_notification("HELLO")))
+        self.assertFalse(handler.check_event(create_notification("HELLO!")))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(re.error):
+            Handler(print, regexp=r"(unclosed")
+
+        with self.assertRaises(TypeError):
+            RegExpFilter(("pattern", 0, "extra"))
+
+        with self.assertRaises(TypeError):
+            CommandFilter(["help"])
+
+        with self.assertRaises(TypeError):
+            TextMessageFilter(["text", 1])
+
+    def test_command_filter(self):
+        filter_ = CommandFilter(("help", "!/"))
+
+        self.assertTrue(filter_.check_event(create_notification("/help")))
+        self.assertTrue(filter_.check_event(create_notification("!help me")))
+        self.assertFalse(filter_.check_event(create_notification("help")))
+        self.assertFalse(filter_.check_event(create_notification(" ")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import BaseStates, GreenAPIBot, Notification
+from whatsapp_chatbot_python.manager.handler import Handler
+
+
+class States(BaseStates):
+    USERNAME = "username"
+
+
+def create_event(text: str, type_message: str = "textMessage") -> dict:
+    return {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {
+            "chatId": "11001234567@c.us",
+            "sender": "11001234567@c.us"
+        },
+        "messageData": {
+            "typeMessage": type_message,
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+
+class IndexTestCase(unittest.TestCase):
+    def test_candidates_order(self):
+        bot = self.create_bot()
+
+        observer = bot.router.message
+        observer.add_handler(print, text_message="1")
+        observer.add_handler(print)
+        observer.add_handler(print, command="start")
+        observer.add_handler(print, text_message=["1", "2"])
+        observer.add_handler(print, type_message="textMessage")
+        observer.add_handler(print, type_message="pollMessage")
+
+        handlers = observer.handlers
+
+        self.assertEqual(
+            list(observer.get_candidates(
+                observer.create_notification(create_event("1"))
+            )),
+            [handlers[0], handlers[1], handlers[3], handlers[4]]
+        )
+        self.assertEqual(
+            list(observer.get_candidates(
+                observer.create_notification(create_event("/start now"))
+            )),
+            [handlers[1], handlers[2], handlers[4]]
+        )
+
+    def test_first_match_wins(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message(type_message="textMessage", text_message="2")
+        def first_handler(_):
+            handled.append("first")
+
+        @bot.router.message(text_message="1")
+        def second_handler(_):
+            handled.append("second")
+
+        @bot.router.message(type_message="textMessage")
+        def third_handler(_):
+            handled.append("third")
+
+        bot.router.route_event(create_event("1"))
+        bot.router.route_event(create_event("2"))
+        bot.router.route_event(create_event("3"))
+
+        self.assertEqual(handled, ["second", "first", "third"])
+
+    def test_state(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message(state=States.USERNAME)
+        def username_handler(_):
+            handled.append("username")
+
+        @bot.router.message(state=None)
+        def message_handler(notification: Notification):
+            handled.append("none")
+
+            notification.state_manager.set_state(
+                notification.sender, States.USERNAME.value
+            )
+
+        bot.router.route_event(create_event("1"))
+        bot.router.route_event(create_event("2"))
+
+        self.assertEqual(handled, ["none", "username"])
+
+    def test_deferred_state(self):
+        bot = self.create_bot()
+
+        get_state = MagicMock(wraps=bot.router.message.state_manager.get_state)
+        bot.router.message.state_manager.get_state = get_state
+
+        handled = []
+
+        @bot.router.message(text_message="hi")
+        def text_handler(_):
+            handled.append("text")
+
+        @bot.router.message(state=None)
+        def state_handler(_):
+            handled.append("state")
+
+        # The state is not looked up when an earlier handler matches.
+        bot.router.route_event(create_event("hi"))
+        get_state.assert_not_called()
+
+        bot.router.route_event(create_event("hello"))
+
+        self.assertEqual(handled, ["text", "state"])
+        self.assertTrue(get_state.called)
+
+    def test_unmatched_event(self):
+        bot = self.create_bot()
+
+        for index in range(300):
+            bot.router.message.add_handler(print, text_message=str(index))
+
+        with patch.object(Handler, "check_event") as check_event:
+            bot.router.route_event(create_event("unknown"))
+
+        check_event.assert_not_called()
+
+    def test_missing_keys(self):
+        bot = self.create_bot()
+
+        bot.router.message.add_handler(print, type_message="textMessage")
+
+        notification = bot.router.message.create_notification(
+            {"typeWebhook": "incomingMessageReceived"}
+        )
+
+        self.assertEqual(
+            list(bot.router.message.get_candidates(notification)), []
+        )
+
+    def test_rebuild(self):
+        bot = self.create_bot()
+
+        observer = bot.router.message
+        notification = observer.create_notification(create_event("2"))
+
+        observer.add_handler(print, text_message="1")
+        self.assertEqual(len(list(observer.get_candidates(notification))), 0)
+
+        observer.handlers.append(Handler(print, text_message="2"))
+        self.assertEqual(len(list(observer.get_candidates(notification))), 1)
+
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def create_bot(self, mock__update_settings: MagicMock) -> GreenAPIBot:
+        mock__update_settings.return_value = None
+
+        return GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
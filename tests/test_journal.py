@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.journal import EventJournal
+from .test_dispatcher import create_event
+
+
+class EventJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.path = os.path.join(self.directory.name, "journal")
+
+    def test_replay(self):
+        journal = EventJournal(self.path, flush_interval=0)
+
+        events = [create_event("1@c.us", str(index)) for index in range(3)]
+        for event in events:
+            journal.append(event)
+        journal.sync()
+
+        journal.mark_done(events[1])
+        journal.close()
+
+        # The last line is incomplete after a crash.
+        with open(os.path.join(self.path, os.listdir(self.path)[0]), "a") as file:
+            file.write('{"id": 4, "eve')
+
+        journal = self.open_journal()
+
+        self.assertEqual(list(journal.replay()), [events[0], events[2]])
+
+        for event in journal.replay():
+            journal.mark_done(event)
+        journal.close()
+
+        self.assertEqual(len(self.open_journal()), 0)
+
+    def test_compaction(self):
+        journal = EventJournal(self.path, segment_size=1024, flush_interval=0)
+        self.addCleanup(journal.close)
+
+        pending_event = create_event("1@c.us", "pending")
+        journal.append(pending_event)
+
+        for index in range(100):
+            event = create_event("1@c.us", str(index))
+            journal.append(event)
+            journal.mark_done(event)
+
+        # Unfinished events are kept, and old segments are deleted.
+        self.assertEqual(len(os.listdir(self.path)), 1)
+        journal.close()
+
+        self.assertEqual(list(self.open_journal().replay()), [pending_event])
+
+    def test_run_forever(self):
+        journal = EventJournal(self.path, flush_interval=0)
+        journal.append(create_event("1@c.us", "unfinished"))
+        journal.close()
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                journal=self.open_journal()
+            )
+
+        calls = []
+
+        @bot.router.message()
+        def handler(notification: Notification):
+            calls.append(notification.message_text)
+
+        response = MagicMock()
+        response.data = {"receiptId": 1, "body": create_event("1@c.us", "new")}
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=[response, KeyboardInterrupt]
+        )
+        bot.api.receiving.deleteNotification = MagicMock(
+            side_effect=lambda receipt_id: calls.append(receipt_id)
+        )
+
+        bot.run_forever()
+
+        # The new event is deleted before it is handled.
+        self.assertEqual(calls, ["unfinished", 1, "new"])
+        self.assertEqual(len(bot.journal), 0)
+
+    def test_processes(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                journal=self.open_journal()
+            )
+
+        self.assertRaises(ValueError, bot.run_forever, processes=2)
+
+    def open_journal(self) -> EventJournal:
+        journal = EventJournal(self.path, flush_interval=0)
+        self.addCleanup(journal.close)
+
+        return journal
+
+
+if __name__ == "__main__":
+    unittest.main()
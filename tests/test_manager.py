@@ -44,6 +44,31 @@ class ManagerTestCase(unittest.TestCase):
 
         self.assertEqual(len(bot.router.message.handlers), 2)
 
+    def test_notification(self):
+        bot = self.create_bot()
+
+        notifications = []
+
+        @bot.router.message(type_message="textMessage", text_message="Bye")
+        def first_handler(_):
+            pass
+
+        @bot.router.message(type_message="textMessage", regexp="H.*")
+        def second_handler(notification: Notification):
+            notifications.append(notification)
+
+        with patch.object(
+                Notification, "_find_message_text", autospec=True,
+                side_effect=Notification._find_message_text
+        ) as find_message_text:
+            bot.router.route_event(event_example)
+
+        find_message_text.assert_called_once()
+
+        notification = notifications[0]
+        self.assertEqual(notification.message_text, "Hello")
+        self.assertFalse(hasattr(notification, "__dict__"))
+
     @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
     def create_bot(self, mock__update_settings: MagicMock) -> GreenAPIBot:
         mock__update_settings.return_value = None
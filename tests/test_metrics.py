@@ -0,0 +1,131 @@
+import unittest
+import urllib.request
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import GreenAPIBot, Notification
+from whatsapp_chatbot_python.metrics import CallbackSink, Metrics, MetricsServer
+
+event_example: dict = {
+    "typeWebhook": "incomingMessageReceived",
+    "senderData": {
+        "chatId": "11001234567@c.us",
+        "sender": "11001234567@c.us"
+    },
+    "messageData": {
+        "typeMessage": "textMessage",
+        "textMessageData": {
+            "textMessage": "Hello"
+        }
+    }
+}
+
+
+class MetricsTestCase(unittest.TestCase):
+    def test_disabled(self):
+        bot = self.create_bot()
+
+        @bot.router.message(text_message="Hello")
+        def handler(_):
+            pass
+
+        with patch(
+                "whatsapp_chatbot_python.manager.router.json.dumps"
+        ) as router_dumps, patch(
+            "whatsapp_chatbot_python.manager.handler.json.dumps"
+        ) as handler_dumps:
+            bot.router.route_event(event_example)
+
+        router_dumps.assert_not_called()
+        handler_dumps.assert_not_called()
+
+    def test_route_event(self):
+        records = []
+
+        metrics = Metrics([CallbackSink(
+            lambda *record: records.append(record[:2])
+        )])
+
+        bot = self.create_bot(metrics)
+
+        @bot.router.message(text_message="Bye")
+        def bye_handler(_):
+            pass
+
+        @bot.router.message()
+        def message_handler(_: Notification):
+            pass
+
+        bot.router.route_event(event_example)
+
+        self.assertEqual(
+            metrics.get_counter(
+                "events_total", type_webhook="incomingMessageReceived"
+            ), 1
+        )
+        self.assertEqual(
+            metrics.get_counter(
+                "handler_checks_total",
+                handler=message_handler.__qualname__,
+                result="match"
+            ), 1
+        )
+        self.assertEqual(metrics.get_histogram(
+            "handler_duration_seconds", handler=message_handler.__qualname__
+        ).count, 1)
+        self.assertEqual(metrics.get_histogram(
+            "observer_duration_seconds", observer="incomingMessageReceived"
+        ).count, 1)
+
+        self.assertIn(("histogram", "handler_duration_seconds"), records)
+
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE whatsapp_chatbot_events_total counter", text)
+        self.assertIn(
+            "whatsapp_chatbot_observer_duration_seconds_bucket"
+            '{observer="incomingMessageReceived",le="+Inf"} 1', text
+        )
+
+    def test_instrument_api(self):
+        metrics = Metrics()
+
+        bot = self.create_bot(metrics)
+        bot.api.session.request = MagicMock(
+            return_value=MagicMock(status_code=200, text="{}")
+        )
+
+        bot.api.sending.sendMessage("11001234567@c.us", "Hello")
+
+        histogram = metrics.get_histogram(
+            "http_request_duration_seconds", method="sendMessage", code="200"
+        )
+        self.assertEqual(histogram.count, 1)
+
+    def test_server(self):
+        metrics = Metrics()
+        metrics.increment("events_total", type_webhook="incomingCall")
+
+        server = MetricsServer(metrics, "127.0.0.1", 0)
+        server.start()
+        try:
+            with urllib.request.urlopen(
+                    f"http://127.0.0.1:{server.port}/metrics"
+            ) as response:
+                text = response.read().decode()
+        finally:
+            server.stop()
+
+        self.assertIn(
+            'whatsapp_chatbot_events_total{type_webhook="incomingCall"} 1',
+            text
+        )
+
+    @staticmethod
+    def create_bot(metrics: Metrics = None) -> GreenAPIBot:
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            return GreenAPIBot(
+                "", "", delete_notifications_at_startup=False, metrics=metrics
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from whatsapp_chatbot_python import AsyncNotification
+from whatsapp_chatbot_python.metrics import Metrics
+from whatsapp_chatbot_python.multibot import MultiBot
+
+
+def create_event(text: str) -> dict:
+    return {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {
+            "chatId": "11001234567@c.us",
+            "sender": "11001234567@c.us"
+        },
+        "messageData": {
+            "typeMessage": "textMessage",
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+
+class MultiBotTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_run_forever(self):
+        metrics = Metrics()
+        multibot = self.create_multibot(metrics=metrics)
+
+        handled = []
+
+        @multibot.router.message(command="start")
+        async def message_handler(notification: AsyncNotification):
+            handled.append((notification.api.idInstance, notification.chat))
+
+            notification.state_manager.set_state(notification.sender, "start")
+
+        for bot in multibot.bots:
+            bot._request = AsyncMock(side_effect=[
+                {"receiptId": 1, "body": create_event("/start")},
+                None,
+                asyncio.CancelledError()
+            ])
+
+        await multibot.run_forever()
+
+        self.assertEqual(sorted(handled), [
+            ("1101000001", "11001234567@c.us"),
+            ("1101000002", "11001234567@c.us")
+        ])
+
+        first, second = multibot.bots
+        self.assertIsNot(
+            first.router.message.state_manager,
+            second.router.message.state_manager
+        )
+        self.assertEqual(
+            metrics.get_counter(
+                "events_total",
+                instance="1101000001",
+                type_webhook="incomingMessageReceived"
+            ), 1
+        )
+
+    async def test_shared_session(self):
+        requests = []
+
+        async def send_message(request: web.Request) -> web.Response:
+            requests.append(
+                (request.match_info["id_instance"], await request.json())
+            )
+
+            return web.json_response({"idMessage": "BAE5F4886F6F2D05"})
+
+        app = web.Application()
+        app.router.add_post(
+            "/waInstance{id_instance}/sendMessage/{token}", send_message
+        )
+
+        async with TestServer(app) as server:
+            multibot = self.create_multibot(host=str(server.make_url("")))
+
+            responses = []
+
+            @multibot.router.message()
+            async def message_handler(notification: AsyncNotification):
+                responses.append(await notification.answer("Hello"))
+
+            for bot in multibot.bots:
+                bot._request = AsyncMock(side_effect=[
+                    {"receiptId": 1, "body": create_event("Hi")},
+                    None,
+                    asyncio.CancelledError()
+                ])
+
+            with patch(
+                    "aiohttp.ClientSession", wraps=aiohttp.ClientSession
+            ) as mock_session:
+                await multibot.run_forever()
+
+        # Answers do not open sessions of their own.
+        mock_session.assert_called_once()
+
+        self.assertEqual([response.code for response in responses], [200, 200])
+        self.assertEqual(
+            sorted(id_instance for id_instance, _ in requests),
+            ["1101000001", "1101000002"]
+        )
+        self.assertEqual(requests[0][1]["message"], "Hello")
+
+        # The client's own method is restored.
+        self.assertNotIn("requestAsync", vars(multibot.bots[0].api))
+
+    def test_shared_resources(self):
+        multibot = self.create_multibot()
+        first, second = multibot.bots
+
+        self.assertIs(first.api.session, second.api.session)
+        self.assertIs(
+            first.router.message.handlers, multibot.router.message.handlers
+        )
+        self.assertIs(multibot.get_bot("1101000002"), second)
+        self.assertRaises(KeyError, multibot.get_bot, "1101000003")
+
+    @staticmethod
+    def create_multibot(**kwargs) -> MultiBot:
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            return MultiBot(
+                [("1101000001", "token"), ("1101000002", "token")],
+                delete_notifications_at_startup=False,
+                **kwargs
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import AsyncBot, GreenAPIBot, Notification
+from whatsapp_chatbot_python.outbox import Outbox, TokenBucket
+
+event_example: dict = {
+    "typeWebhook": "incomingMessageReceived",
+    "senderData": {
+        "chatId": "11001234567@c.us",
+        "sender": "11001234567@c.us"
+    },
+    "messageData": {
+        "typeMessage": "textMessage",
+        "textMessageData": {"textMessage": "Hello"}
+    }
+}
+
+
+class OutboxTestCase(unittest.TestCase):
+    def test_answer(self):
+        bot = self.create_bot(GreenAPIBot)
+        sending = bot.api.sending
+        sending.sendMessage.return_value = Response(200, '{"idMessage": "1"}')
+
+        futures = []
+
+        @bot.router.message()
+        def message_handler(notification: Notification):
+            futures.append(notification.answer("Hi"))
+
+        outbox = Outbox(bot.api)
+        outbox.start()
+
+        self.assertIs(bot.api.sending, outbox)
+
+        bot.router.route_event(event_example)
+
+        response = futures[0].result(timeout=5)
+
+        outbox.stop()
+
+        self.assertIs(bot.api.sending, sending)
+        self.assertEqual(response.data, {"idMessage": "1"})
+        sending.sendMessage.assert_called_once_with(
+            "11001234567@c.us", "Hi", None, None, None, None
+        )
+
+    def test_retry(self):
+        bot = self.create_bot(GreenAPIBot)
+        bot.api.sending.sendMessage.side_effect = [
+            Response(429, ""), Response(502, ""), Response(200, "{}")
+        ]
+
+        outbox = Outbox(bot.api, backoff=0)
+        outbox.start()
+
+        future = outbox.sendMessage("11001234567@c.us", "Hi")
+        response = future.result(timeout=5)
+
+        outbox.stop()
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(bot.api.sending.sendMessage.call_count, 3)
+
+    def test_retry_limit(self):
+        bot = self.create_bot(GreenAPIBot)
+        bot.api.sending.sendMessage.side_effect = ConnectionError()
+
+        outbox = Outbox(bot.api, backoff=0, max_retries=2)
+        outbox.start()
+
+        future = outbox.sendMessage("11001234567@c.us", "Hi")
+
+        self.assertRaises(ConnectionError, future.result, 5)
+
+        outbox.stop()
+
+        self.assertEqual(bot.api.sending.sendMessage.call_count, 3)
+
+    def test_coalesce(self):
+        bot = self.create_bot(GreenAPIBot)
+        bot.api.sending.sendMessage.return_value = Response(200, "{}")
+
+        outbox = Outbox(bot.api, coalesce=True, max_message_length=11)
+
+        futures = [
+            outbox.sendMessage("11001234567@c.us", "first"),
+            outbox.sendMessage("11001234567@c.us", "last", None),
+            outbox.sendMessage("11001234567@c.us", "other"),
+            outbox.sendMessage("11001234567@c.us", "quoted", "1")
+        ]
+
+        outbox.start()
+        outbox.stop()
+
+        for future in futures:
+            self.assertEqual(future.result(timeout=5).code, 200)
+
+        self.assertEqual(
+            [call.args for call in bot.api.sending.sendMessage.call_args_list],
+            [
+                ("11001234567@c.us", "first\nlast"),
+                ("11001234567@c.us", "other"),
+                ("11001234567@c.us", "quoted", "1")
+            ]
+        )
+
+    @patch("whatsapp_chatbot_python.outbox.time.monotonic")
+    def test_token_bucket(self, mock_monotonic):
+        mock_monotonic.return_value = 0
+
+        bucket = TokenBucket(2)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+        self.assertFalse(bucket.is_full())
+
+        mock_monotonic.return_value = 10
+
+        self.assertTrue(bucket.is_full())
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_async_answer(self):
+        bot = self.create_bot(AsyncBot)
+        bot.api.sending.sendMessage.return_value = Response(200, "{}")
+
+        outbox = Outbox(bot.api)
+        outbox.start()
+
+        async def route_event() -> Response:
+            futures = []
+
+            @bot.router.message()
+            async def message_handler(notification):
+                futures.append(await notification.answer("Hi"))
+
+            await bot.router.route_event(event_example)
+
+            return await futures[0]
+
+        response = asyncio.run(route_event())
+
+        outbox.stop()
+
+        self.assertEqual(response.code, 200)
+
+    def test_async_full_queue(self):
+        bot = self.create_bot(AsyncBot)
+        bot.api.sending.sendMessage.return_value = Response(200, "{}")
+
+        outbox = Outbox(bot.api, workers=1, queue_size=1)
+        outbox.submit("sendMessage", "11001234567@c.us", "1")
+
+        async def send() -> Response:
+            task = asyncio.ensure_future(
+                outbox.sendMessageAsync("11001234567@c.us", "2")
+            )
+
+            # The event loop keeps running while the queue is full.
+            await asyncio.sleep(0.1)
+            self.assertFalse(task.done())
+
+            outbox.start()
+
+            return await (await task)
+
+        response = asyncio.run(send())
+
+        outbox.stop()
+
+        self.assertEqual(response.code, 200)
+        self.assertEqual(bot.api.sending.sendMessage.call_count, 2)
+
+    @staticmethod
+    def create_bot(bot_class):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = bot_class("", "", delete_notifications_at_startup=False)
+
+        bot.api.sending = MagicMock()
+
+        return bot
+
+
+if __name__ == "__main__":
+    unittest.main()
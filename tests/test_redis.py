@@ -0,0 +1,110 @@
+import time
+import unittest
+
+from whatsapp_chatbot_python.manager.redis import RedisStateManager
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+sender = "79001234567@c.us"
+
+
+@unittest.skipUnless(fakeredis, "fakeredis is not installed")
+class RedisStateManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = fakeredis.FakeServer()
+
+    def create_state_manager(self, **kwargs) -> RedisStateManager:
+        state_manager = RedisStateManager(
+            fakeredis.FakeRedis(server=self.server), **kwargs
+        )
+        self.addCleanup(state_manager.close)
+
+        return state_manager
+
+    def test_state(self):
+        state_manager = self.create_state_manager()
+
+        self.assertIsNone(state_manager.get_state(sender))
+
+        state_manager.update_state_data(sender, {"username": "user"})
+        self.assertIsNone(state_manager.get_state(sender))
+
+        state_manager.set_state(sender, "username")
+        state_manager.update_state_data(sender, {"username": "user"})
+        state_manager.update_state_data(sender, {"age": 18})
+
+        state = state_manager.get_state(sender)
+        self.assertEqual(state.name, "username")
+        self.assertEqual(state.data, {"username": "user", "age": 18})
+
+        state_manager.update_state(sender, "password")
+        self.assertEqual(state_manager.get_state(sender).name, "password")
+
+        state_manager.set_state_data(sender, {"password": "secret"})
+        self.assertEqual(
+            state_manager.get_state_data(sender), {"password": "secret"}
+        )
+
+        state_manager.delete_state_data(sender)
+        self.assertIsNone(state_manager.get_state_data(sender))
+
+        state_manager.delete_state(sender)
+        self.assertIsNone(state_manager.get_state(sender))
+
+    def test_get_states(self):
+        state_manager = self.create_state_manager()
+        state_manager.set_state("1@c.us", "first")
+        state_manager.set_state("2@c.us", "second")
+
+        states = state_manager.get_states(["1@c.us", "2@c.us", "3@c.us"])
+
+        self.assertEqual(states["1@c.us"].name, "first")
+        self.assertEqual(states["2@c.us"].name, "second")
+        self.assertIsNone(states["3@c.us"])
+
+    def test_ttl(self):
+        state_manager = self.create_state_manager(ttl=60)
+        state_manager.set_state(sender, "username")
+        state_manager.update_state_data(sender, {"username": "user"})
+
+        key = f"{state_manager.prefix}{sender}"
+        self.assertEqual(state_manager.client.ttl(key), 60)
+        self.assertEqual(state_manager.client.ttl(f"{key}:data"), 60)
+
+    def test_near_cache(self):
+        first = self.create_state_manager(near_cache=True)
+        second = self.create_state_manager(near_cache=True)
+
+        first.set_state(sender, "username")
+        self.assertEqual(second.get_state(sender).name, "username")
+        self.assertIn(sender, second.storage)
+
+        first.update_state(sender, "password")
+
+        deadline = time.monotonic() + 5
+        while sender in second.storage and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(second.get_state(sender).name, "password")
+
+    def test_near_cache_ttl(self):
+        state_manager = self.create_state_manager(ttl=60, near_cache=True)
+        state_manager.set_state(sender, "username")
+
+        self.assertEqual(state_manager.get_state(sender).name, "username")
+
+        # Redis drops the key, and the cached state expires at the same time.
+        state_manager.client.pexpire(f"{state_manager.prefix}{sender}", 50)
+        state_manager.storage.clear()
+        self.assertEqual(state_manager.get_state(sender).name, "username")
+
+        time.sleep(0.1)
+
+        self.assertIsNone(state_manager.get_state(sender))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import re
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import GreenAPIBot
+from whatsapp_chatbot_python.manager.handler import Handler
+from whatsapp_chatbot_python.manager.regexp import RegExpMatcher, to_group
+
+
+def create_event(text: str) -> dict:
+    return {
+        "typeWebhook": "incomingMessageReceived",
+        "senderData": {
+            "chatId": "11001234567@c.us",
+            "sender": "11001234567@c.us"
+        },
+        "messageData": {
+            "typeMessage": "textMessage",
+            "textMessageData": {"textMessage": text}
+        }
+    }
+
+
+class RegExpTestCase(unittest.TestCase):
+    def test_to_group(self):
+        self.assertEqual(
+            to_group("h1", re.compile(r"hello", re.IGNORECASE)),
+            "(?P<h1>(?i:hello))"
+        )
+        self.assertEqual(
+            to_group("h1", re.compile(r"(?i)hello")), "(?P<h1>(?i:hello))"
+        )
+        self.assertIsNone(to_group("h1", re.compile(r"(?P<name>a)")))
+        self.assertIsNone(to_group("h1", re.compile(r"(a)\1")))
+
+    def test_matcher(self):
+        patterns = [
+            r"a+", r"(a)\1", r"A+B?", r"b.*", r"(?P<x>ab)", r"a|b",
+            r"[ab]{2}", r"a b  # comment", r".*"
+        ]
+        flags = [0, 0, re.IGNORECASE, 0, 0, 0, 0, re.VERBOSE, 0]
+
+        handlers = [
+            Handler(print, regexp=(pattern, flag))
+            for pattern, flag in zip(patterns, flags)
+        ]
+
+        random.seed(0)
+        for chunk_size in [1, 2, 3, 512]:
+            matcher = RegExpMatcher(handlers, chunk_size)
+            self.assertEqual(len(matcher.positions), 7)
+
+            for _ in range(200):
+                text = "".join(
+                    random.choice("ab") for _ in range(random.randint(0, 4))
+                )
+
+                expected = [
+                    position for position, handler in enumerate(handlers)
+                    if position not in matcher.positions
+                    or handler.compiled_filters[0].regexp.fullmatch(text)
+                ]
+
+                self.assertEqual(
+                    list(matcher.filter(range(len(handlers)), text)),
+                    expected
+                )
+
+    def test_route_event(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message(regexp=r"order \d+", state="payment")
+        def payment_handler(_):
+            handled.append("payment")
+
+        @bot.router.message(regexp=r"help")
+        def help_handler(_):
+            handled.append("help")
+
+        @bot.router.message(regexp=(r"ORDER \d+", re.IGNORECASE))
+        def order_handler(_):
+            handled.append("order")
+
+        bot.router.route_event(create_event("order 15"))
+        bot.router.route_event(create_event("help"))
+        bot.router.route_event(create_event("unknown"))
+
+        self.assertEqual(handled, ["order", "help"])
+
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def create_bot(self, mock__update_settings: MagicMock) -> GreenAPIBot:
+        mock__update_settings.return_value = None
+
+        return GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
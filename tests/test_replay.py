@@ -0,0 +1,218 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from whatsapp_chatbot_python import AsyncBot, Bot, GreenAPIBot, Notification
+from whatsapp_chatbot_python.dedupe import EventDeduplicator
+from whatsapp_chatbot_python.recorder import EventRecorder, read_recording
+from whatsapp_chatbot_python.replay import (
+    get_percentile, load_router, replay
+)
+from .test_dispatcher import create_event
+
+
+class InstanceCalled(BaseException):
+    pass
+
+
+class RecorderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.path = os.path.join(self.directory.name, "events.jsonl.gz")
+
+    def test_read_recording(self):
+        recorder = EventRecorder(self.path)
+        recorder.record(create_event("1@c.us", "1"))
+        recorder.close()
+
+        # A second run appends to the same file.
+        recorder = EventRecorder(self.path, flush_interval=0)
+        recorder.record(create_event("1@c.us", "2"))
+        recorder.file.flush()
+
+        # The recording of a killed bot is not finished.
+        with open(self.path, "rb") as file:
+            data = file.read()
+        with open(self.path, "wb") as file:
+            file.write(data[:-1])
+
+        texts = [
+            event["messageData"]["textMessageData"]["textMessage"]
+            for _, event in read_recording(self.path)
+        ]
+        self.assertEqual(texts, ["1", "2"])
+
+        recorder.close()
+
+    def test_run_forever(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                recorder=EventRecorder(self.path)
+            )
+
+        response = MagicMock()
+        response.data = {"receiptId": 1, "body": create_event("1@c.us", "1")}
+
+        bot.api.receiving.receiveNotification = MagicMock(
+            side_effect=[response, KeyboardInterrupt]
+        )
+        bot.api.receiving.deleteNotification = MagicMock()
+
+        bot.run_forever()
+        bot.recorder.close()
+
+        with gzip.open(self.path, "rt") as file:
+            self.assertEqual(len(file.readlines()), 1)
+
+        self.assertEqual(
+            [event for _, event in read_recording(self.path)],
+            [create_event("1@c.us", "1")]
+        )
+
+
+class ReplayTestCase(unittest.TestCase):
+    def test_replay(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+        sending = bot.api.sending
+
+        @bot.router.message(text_message="ping")
+        def ping_handler(notification: Notification):
+            notification.answer("pong")
+
+        @bot.router.message()
+        def error_handler(_: Notification):
+            raise ValueError
+
+        events = [
+            (index, create_event("1@c.us", "ping" if index % 2 else "hello"))
+            for index in range(10)
+        ]
+
+        report = replay(bot.router, events, trace_allocations=True)
+
+        self.assertEqual((report.events, report.errors), (10, 5))
+        self.assertEqual(report.sent, {"sendMessage": 5})
+        self.assertEqual(
+            report.observers["incomingMessageReceived"].count, 10
+        )
+        self.assertEqual(
+            {
+                name.rsplit(".", 1)[-1]: stats.count
+                for name, stats in report.handlers.items()
+            },
+            {"ping_handler": 5, "error_handler": 5}
+        )
+        self.assertIsNotNone(report.allocated_blocks)
+        self.assertIn("events/s", report.format())
+
+        # The router is restored after the replay.
+        self.assertIs(bot.api.sending, sending)
+        self.assertIsNone(bot.router.metrics)
+
+    def test_deduplicator(self):
+        event = {**create_event("1@c.us", "1"), "idMessage": "1"}
+
+        deduplicator = EventDeduplicator()
+        deduplicator.add(event)
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "", delete_notifications_at_startup=False,
+                deduplicator=deduplicator
+            )
+
+        calls = []
+
+        @bot.router.message()
+        def handler(_: Notification):
+            calls.append(1)
+
+        # Events already handled by the live bot are replayed in both passes.
+        replay(bot.router, [(0, event), (1, event)], trace_allocations=True)
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(len(deduplicator), 1)
+        self.assertIs(bot.router.deduplicator, deduplicator)
+
+    def test_async_replay(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = AsyncBot("", "", delete_notifications_at_startup=False)
+
+        @bot.router.message()
+        async def handler(notification: Notification):
+            await notification.answer("pong")
+
+        report = replay(bot.router, [(0, create_event("1@c.us", "1"))])
+
+        self.assertEqual((report.events, report.errors), (1, 0))
+        self.assertEqual(report.sent, {"sendMessageAsync": 1})
+
+    @patch("whatsapp_chatbot_python.replay.time.sleep")
+    def test_speed(self, mock_sleep):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+        events = [
+            (100 + index * 10, create_event("1@c.us", "1"))
+            for index in range(3)
+        ]
+
+        replay(bot.router, events, speed=10)
+
+        # Events recorded 10 seconds apart are replayed 1 second apart.
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertAlmostEqual(mock_sleep.call_args_list[1][0][0], 2, 1)
+
+    def test_load_router(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        # Bot modules usually start receiving notifications at the top
+        # level, which must not happen during a replay.
+        path = os.path.join(directory.name, "replayed_bot.py")
+        with open(path, "w") as file:
+            file.write(
+                "import asyncio\n"
+                "from whatsapp_chatbot_python import AsyncBot, GreenAPIBot\n"
+                "bot = GreenAPIBot('1101000001', 'token')\n"
+                "bot.run_forever()\n"
+                "bot.run_webhook()\n"
+                "async_bot = AsyncBot('1101000001', 'token')\n"
+                "asyncio.run(async_bot.run_forever())\n"
+            )
+
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+        self.addCleanup(sys.modules.pop, "replayed_bot", None)
+
+        run_forever = vars(Bot)["run_forever"]
+
+        # The receive loop catches exceptions, so a request to the instance
+        # stops the test with an error that it does not catch.
+        with patch(
+                "whatsapp_api_client_python.API.GreenAPI.request",
+                side_effect=InstanceCalled
+        ):
+            router = load_router("replayed_bot:bot")
+
+        self.assertIs(router, sys.modules["replayed_bot"].bot.router)
+        self.assertIs(vars(Bot)["run_forever"], run_forever)
+
+    def test_get_percentile(self):
+        durations = [float(index) for index in range(1, 101)]
+
+        self.assertEqual(get_percentile(durations, 50), 50)
+        self.assertEqual(get_percentile(durations, 99), 99)
+        self.assertEqual(get_percentile([], 99), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
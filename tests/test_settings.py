@@ -0,0 +1,113 @@
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import GreenAPIBot
+from whatsapp_chatbot_python.settings import SettingsCache
+
+enabled_settings = {
+    "incomingWebhook": "yes",
+    "outgoingMessageWebhook": "yes",
+    "outgoingAPIMessageWebhook": "yes"
+}
+
+
+class SettingsCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.path = os.path.join(self.directory.name, "settings.json")
+
+    def test_is_valid(self):
+        cache = SettingsCache(self.path)
+        self.assertFalse(cache.is_valid("1101", None))
+
+        cache.set(
+            "1101", {**enabled_settings, "delaySendMessagesMilliseconds": 1000}
+        )
+
+        cache = SettingsCache(self.path)
+        self.assertTrue(cache.is_valid("1101", None))
+        self.assertTrue(cache.is_valid(
+            "1101", {"delaySendMessagesMilliseconds": 1000}
+        ))
+        self.assertFalse(cache.is_valid(
+            "1101", {"delaySendMessagesMilliseconds": 5000}
+        ))
+        self.assertFalse(cache.is_valid("1102", None))
+
+        cache.set("1102", dict.fromkeys(enabled_settings, "no"))
+        self.assertFalse(cache.is_valid("1102", None))
+
+    @patch("whatsapp_chatbot_python.bot.threading.Thread")
+    def test_bot(self, mock_thread):
+        cache = SettingsCache(self.path)
+
+        with patch("whatsapp_chatbot_python.bot.GreenAPI") as mock_api:
+            mock_api.return_value.account.getSettings.return_value = Response(
+                200, '{"incomingWebhook": "yes", '
+                     '"outgoingMessageWebhook": "no", '
+                     '"outgoingAPIMessageWebhook": "no"}'
+            )
+
+            GreenAPIBot(
+                "1101", "", delete_notifications_at_startup=False,
+                settings_cache=cache
+            )
+
+            # Without cached settings the bot waits for the API.
+            mock_thread.assert_not_called()
+            self.assertTrue(SettingsCache(self.path).is_valid("1101", None))
+
+            GreenAPIBot(
+                "1101", "", delete_notifications_at_startup=False,
+                settings_cache=cache
+            )
+
+        mock_api.return_value.account.getSettings.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_background_error(self):
+        cache = SettingsCache(self.path)
+        cache.set("1101", enabled_settings)
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("1101", "", delete_notifications_at_startup=False)
+
+        bot.logger = MagicMock()
+        bot.api.account.getSettings = MagicMock(side_effect=ConnectionError)
+
+        bot._check_settings_in_background(None, cache)
+
+        bot.logger.log.assert_called_with(logging.ERROR, ANY)
+
+
+class LazyImportTestCase(unittest.TestCase):
+    def test_import(self):
+        # Importing the package does not load the API client.
+        output = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys, whatsapp_chatbot_python; "
+                "print('whatsapp_api_client_python.API' in sys.modules, "
+                "'aiohttp' in sys.modules)"
+            ],
+            check=True, capture_output=True, text=True
+        ).stdout
+
+        self.assertEqual(output.split(), ["False", "False"])
+
+        from whatsapp_chatbot_python import GreenAPIBot as bot_class
+
+        self.assertIs(bot_class, GreenAPIBot)
+
+
+if __name__ == "__main__":
+    unittest.main()
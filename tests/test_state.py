@@ -0,0 +1,284 @@
+import datetime
+import logging
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import ANY, MagicMock, patch
+
+from whatsapp_chatbot_python import BaseStates, GreenAPIBot
+from whatsapp_chatbot_python.manager.sqlite import SQLiteStateManager
+from whatsapp_chatbot_python.manager.state import (
+    BoundedStateManager, CompactStateManager, State, StateManager
+)
+
+sender = "79001234567@c.us"
+
+
+class SQLiteStateManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "states.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_persistence(self):
+        state_manager = SQLiteStateManager(self.path)
+        state_manager.set_state(sender, "username")
+        state_manager.update_state_data(sender, {"username": "user"})
+        state_manager.update_state_data(sender, {"age": 18})
+        state_manager.set_state("79007654321@c.us", "password")
+        state_manager.delete_state("79007654321@c.us")
+        state_manager.close()
+
+        for preload in (True, False):
+            state_manager = SQLiteStateManager(self.path, preload=preload)
+
+            state = state_manager.get_state(sender)
+            self.assertEqual(state.name, "username")
+            self.assertEqual(state.data, {"username": "user", "age": 18})
+            self.assertIsNone(state_manager.get_state("79007654321@c.us"))
+
+            state_manager.close()
+
+    def test_write_behind(self):
+        state_manager = SQLiteStateManager(self.path, flush_interval=60)
+        state_manager.set_state(sender, "username")
+
+        self.assertEqual(self.count_rows(), 0)
+        self.assertEqual(state_manager.get_state(sender).name, "username")
+
+        state_manager.flush()
+
+        self.assertEqual(self.count_rows(), 1)
+
+        state_manager.delete_state(sender)
+        state_manager.close()
+
+        self.assertEqual(self.count_rows(), 0)
+
+    def test_delete_without_preload(self):
+        state_manager = SQLiteStateManager(self.path)
+        state_manager.set_state(sender, "username")
+        state_manager.close()
+
+        state_manager = SQLiteStateManager(
+            self.path, flush_interval=60, preload=False
+        )
+        state_manager.delete_state(sender)
+
+        # The row is not read again before it is deleted.
+        self.assertIsNone(state_manager.get_state(sender))
+
+        state_manager.close()
+
+        state_manager = SQLiteStateManager(self.path, preload=False)
+        self.assertIsNone(state_manager.get_state(sender))
+        state_manager.close()
+
+    def test_flush_error(self):
+        state_manager = SQLiteStateManager(self.path, flush_interval=0.01)
+        state_manager.logger = MagicMock()
+
+        state_manager.set_state(sender, "username")
+        self.assertRaises(
+            TypeError, state_manager.set_state_data,
+            sender, {"date": datetime.date.today()}
+        )
+
+        # Data changed in place cannot be written, but other senders are.
+        state_manager.set_state_data(sender, {})
+        state_manager.get_state_data(sender)["date"] = datetime.date.today()
+        state_manager.set_state("79007654321@c.us", "password")
+
+        state_manager.stopped.wait(0.1)
+
+        self.assertTrue(state_manager.thread.is_alive())
+        self.assertEqual(self.count_rows(), 1)
+        state_manager.logger.log.assert_called_with(logging.ERROR, ANY)
+
+        # The sender stays dirty and is written when the data is fixed.
+        state_manager.delete_state_data(sender)
+        state_manager.close()
+
+        self.assertEqual(self.count_rows(), 2)
+
+    def test_write_through(self):
+        state_manager = SQLiteStateManager(
+            self.path, durability="full", flush_interval=0
+        )
+        state_manager.set_state(sender, "username")
+
+        self.assertEqual(self.count_rows(), 1)
+
+        state_manager.close()
+
+    def test_namespace(self):
+        state_manager = SQLiteStateManager(self.path, namespace="first")
+        state_manager.set_state(sender, "username")
+        state_manager.close()
+
+        state_manager = SQLiteStateManager(self.path, namespace="second")
+        self.assertIsNone(state_manager.get_state(sender))
+        state_manager.close()
+
+    def test_settings(self):
+        state_manager = SQLiteStateManager(self.path)
+
+        journal_mode = state_manager.connection.execute(
+            "PRAGMA journal_mode"
+        ).fetchone()[0]
+        self.assertEqual(journal_mode, "wal")
+
+        state_manager.close()
+
+        self.assertRaises(
+            ValueError, SQLiteStateManager, self.path, durability="extra"
+        )
+
+    def count_rows(self) -> int:
+        connection = sqlite3.connect(self.path)
+        try:
+            return connection.execute(
+                "SELECT COUNT(*) FROM states"
+            ).fetchone()[0]
+        finally:
+            connection.close()
+
+
+class BoundedStateManagerTestCase(unittest.TestCase):
+    def test_max_size(self):
+        evicted = []
+
+        state_manager = BoundedStateManager(
+            max_size=2, on_evict=lambda *args: evicted.append(args)
+        )
+        state_manager.set_state("1@c.us", "first")
+        state_manager.set_state("2@c.us", "second")
+        state_manager.get_state("1@c.us")
+        state_manager.set_state("3@c.us", "third")
+
+        self.assertEqual(list(state_manager.storage), ["1@c.us", "3@c.us"])
+        self.assertEqual(len(evicted), 1)
+        self.assertEqual(evicted[0][0], "2@c.us")
+        self.assertEqual(evicted[0][1].name, "second")
+
+    @patch("whatsapp_chatbot_python.manager.state.time.monotonic")
+    def test_ttl(self, mock_monotonic):
+        evicted = []
+
+        state_manager = BoundedStateManager(
+            ttl=10, on_evict=lambda sender, _: evicted.append(sender)
+        )
+
+        mock_monotonic.return_value = 0
+        state_manager.set_state("1@c.us", "first")
+        state_manager.set_state("2@c.us", "second")
+
+        mock_monotonic.return_value = 5
+        state_manager.update_state_data("2@c.us", {"key": "value"})
+
+        mock_monotonic.return_value = 12
+        self.assertIsNone(state_manager.get_state("1@c.us"))
+        self.assertEqual(
+            state_manager.get_state_data("2@c.us"), {"key": "value"}
+        )
+
+        mock_monotonic.return_value = 30
+        state_manager.set_state("3@c.us", "third")
+
+        self.assertEqual(list(state_manager.storage), ["3@c.us"])
+        self.assertEqual(evicted, ["1@c.us", "2@c.us"])
+
+    def test_delete_state(self):
+        evicted = []
+
+        state_manager = BoundedStateManager(
+            max_size=1, on_evict=lambda *args: evicted.append(args)
+        )
+        state_manager.set_state(sender, "username")
+        state_manager.delete_state(sender)
+
+        self.assertEqual(len(state_manager.storage), 0)
+        self.assertEqual(len(state_manager.accessed), 0)
+        self.assertEqual(evicted, [])
+
+
+class States(BaseStates):
+    USERNAME = "username"
+
+
+class CompactStateManagerTestCase(unittest.TestCase):
+    def test_state(self):
+        state_manager = CompactStateManager()
+        state_manager.set_state(sender, States.USERNAME)
+        state_manager.set_state("79007654321@c.us", "username")
+
+        self.assertEqual(len(state_manager), 2)
+        self.assertEqual(state_manager.names, [States.USERNAME])
+        self.assertEqual(len(state_manager.storage), 0)
+        self.assertEqual(state_manager.get_state(sender).name, "username")
+
+        state_manager.update_state_data(sender, {"username": "user"})
+        state_manager.update_state_data(sender, {"age": 18})
+
+        self.assertNotIn(sender, state_manager.compact)
+        self.assertEqual(
+            state_manager.get_state_data(sender),
+            {"username": "user", "age": 18}
+        )
+
+        state_manager.update_state(sender, "password")
+        state_manager.delete_state_data(sender)
+
+        self.assertEqual(len(state_manager.storage), 0)
+        self.assertEqual(
+            state_manager.get_state(sender), State("password", None)
+        )
+
+        state_manager.delete_state(sender)
+
+        self.assertIsNone(state_manager.get_state(sender))
+        self.assertEqual(len(state_manager), 1)
+
+    def test_slots(self):
+        state = State("username", None)
+
+        self.assertFalse(hasattr(state, "__dict__"))
+
+    def test_interned_names(self):
+        state_manager = StateManager()
+        state_manager.set_state("1@c.us", "".join(["user", "name"]))
+        state_manager.set_state("2@c.us", "".join(["user", "name"]))
+
+        self.assertIs(
+            state_manager.get_state("1@c.us").name,
+            state_manager.get_state("2@c.us").name
+        )
+
+
+class SharedStateManagerTestCase(unittest.TestCase):
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def test_router_state_manager(self, mock__update_settings):
+        state_manager = CompactStateManager()
+
+        bot = GreenAPIBot(
+            "", "",
+            delete_notifications_at_startup=False,
+            state_manager=state_manager
+        )
+
+        for observer in bot.router.observers.values():
+            self.assertIs(observer.state_manager, state_manager)
+
+        bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+        self.assertIsNot(
+            bot.router.message.state_manager,
+            bot.router.incoming_call.state_manager
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
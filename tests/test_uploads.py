@@ -0,0 +1,246 @@
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from whatsapp_api_client_python.response import Response
+
+from whatsapp_chatbot_python import GreenAPIBot
+from whatsapp_chatbot_python.uploads import (
+    MultipartStream, StreamingUploads, UploadCache
+)
+
+upload_response = Response(
+    200, '{"idMessage": "1", "urlFile": "https://example.com/rates.png"}'
+)
+
+
+class UploadCacheTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.file = os.path.join(self.directory.name, "rates.png")
+        with open(self.file, "wb") as file:
+            file.write(b"image")
+
+        self.cache_path = os.path.join(self.directory.name, "uploads.json")
+
+    def test_answer_with_file(self):
+        bot, send_file_by_upload, send_file_by_url = self.create_bot()
+
+        for _ in range(2):
+            bot.api.sending.sendFileByUpload(
+                "1@c.us", self.file, None, "Rates"
+            )
+
+        send_file_by_upload.assert_called_once()
+        send_file_by_url.assert_called_once_with(
+            "1@c.us", "https://example.com/rates.png", "rates.png",
+            "Rates", None, None, None, None
+        )
+
+        # The cache is kept on disk.
+        cache = UploadCache(self.cache_path)
+        self.assertEqual(cache.get(self.file), "https://example.com/rates.png")
+
+        with open(self.file, "wb") as file:
+            file.write(b"another image")
+
+        self.assertIsNone(cache.get(self.file))
+
+    def test_expired_url(self):
+        bot, send_file_by_upload, send_file_by_url = self.create_bot()
+        send_file_by_url.return_value = Response(400, "")
+
+        for _ in range(2):
+            bot.api.sending.sendFileByUpload("1@c.us", self.file)
+
+        self.assertEqual(send_file_by_upload.call_count, 2)
+        send_file_by_url.assert_called_once()
+
+    @patch("whatsapp_chatbot_python.uploads.time.time")
+    def test_ttl(self, mock_time):
+        mock_time.return_value = 0
+
+        cache = UploadCache(self.cache_path, ttl=10)
+        cache.set(self.file, "https://example.com/rates.png")
+
+        mock_time.return_value = 5
+        self.assertEqual(
+            UploadCache(self.cache_path).get(self.file),
+            "https://example.com/rates.png"
+        )
+
+        mock_time.return_value = 10
+        self.assertIsNone(cache.get(self.file))
+        self.assertEqual(UploadCache(self.cache_path).urls, {})
+
+    async def test_async(self):
+        api = MagicMock()
+        send_file_by_upload = api.sending.sendFileByUploadAsync = AsyncMock(
+            return_value=upload_response
+        )
+        send_file_by_url = api.sending.sendFileByUrlAsync = AsyncMock(
+            return_value=Response(200, "{}")
+        )
+
+        UploadCache().instrument_api(api)
+
+        for _ in range(2):
+            await api.sending.sendFileByUploadAsync("1@c.us", self.file)
+
+        send_file_by_upload.assert_awaited_once()
+        send_file_by_url.assert_awaited_once()
+
+    def test_bot_parameter(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot(
+                "", "",
+                delete_notifications_at_startup=False,
+                upload_cache=UploadCache()
+            )
+
+        self.assertTrue(hasattr(bot.api.sending.sendFileByUpload, "__wrapped__"))
+
+    def create_bot(self):
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            bot = GreenAPIBot("", "", delete_notifications_at_startup=False)
+
+        sending = bot.api.sending = MagicMock()
+        sending.sendFileByUpload.return_value = upload_response
+        sending.sendFileByUrl.return_value = Response(200, '{"idMessage": "2"}')
+        sending.sendFileByUploadAsync = AsyncMock(return_value=upload_response)
+
+        send_file_by_upload = sending.sendFileByUpload
+        send_file_by_url = sending.sendFileByUrl
+
+        UploadCache(self.cache_path).instrument_api(bot.api)
+
+        return bot, send_file_by_upload, send_file_by_url
+
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = remaining = int(self.headers["Content-Length"])
+
+        body = b""
+        while remaining:
+            chunk = self.rfile.read(min(remaining, 64 * 1024))
+            remaining -= len(chunk)
+
+            # Only the beginning of the body is kept for the checks.
+            if len(body) < 4096:
+                body = (body + chunk)[:4096]
+
+        self.server.requests.append((self.path, self.headers, length, body))
+
+        content = b'{"idMessage": "1", "urlFile": "https://example.com/file"}'
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class StreamingUploadsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        server = self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), MediaRequestHandler
+        )
+        server.requests = []
+
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with patch("whatsapp_chatbot_python.bot.Bot._update_settings"):
+            self.bot = GreenAPIBot(
+                "1101", "token",
+                media=f"http://127.0.0.1:{server.server_port}",
+                delete_notifications_at_startup=False,
+                stream_uploads=True
+            )
+
+    def test_send_file_by_upload(self):
+        path = self.create_file("rates.png", 1000)
+
+        response = self.bot.api.sending.sendFileByUpload(
+            "1@c.us", path, caption="Rates"
+        )
+
+        self.assertEqual(response.code, 200)
+
+        url, headers, length, body = self.server.requests[0]
+        self.assertEqual(url, "/waInstance1101/sendFileByUpload/token")
+        self.assertEqual(length, len(body))
+        self.assertIn(b'name="caption"\r\n\r\nRates\r\n', body)
+        self.assertIn(b'filename="rates.png"\r\nContent-Type: image/png', body)
+        self.assertIn(b"\x00" * 1000, body)
+
+    def test_upload_file(self):
+        path = self.create_file("rates.png", 1000)
+
+        response = self.bot.api.sending.uploadFile(path)
+
+        self.assertEqual(response.data["urlFile"], "https://example.com/file")
+
+        url, headers, length, _ = self.server.requests[0]
+        self.assertEqual(url, "/waInstance1101/uploadFile/token")
+        self.assertEqual(headers["GA-Filename"], "rates.png")
+        self.assertEqual(length, 1000)
+
+    def test_memory(self):
+        peaks = []
+        for size in (4, 16):
+            path = self.create_file(f"{size}.mp4", size * 1024 * 1024)
+
+            tracemalloc.start()
+            try:
+                self.bot.api.sending.sendFileByUpload("1@c.us", path)
+                self.bot.api.sending.uploadFile(path)
+
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+
+        # The memory used does not grow with the file size.
+        self.assertLess(max(peaks), 1024 * 1024)
+        self.assertLess(abs(peaks[1] - peaks[0]), 256 * 1024)
+        self.assertEqual(
+            [length for *_, length, _ in self.server.requests[2:]], [
+                len(MultipartStream(
+                    {"chatId": "1@c.us"}, path, "16.mp4", "video/mp4"
+                )),
+                16 * 1024 * 1024
+            ]
+        )
+
+    def test_instrument_api(self):
+        api = MagicMock()
+
+        StreamingUploads().instrument_api(api)
+
+        self.assertTrue(hasattr(api.sending.sendFileByUpload, "__wrapped__"))
+        self.assertTrue(hasattr(api.sending.uploadFile, "__wrapped__"))
+
+    def create_file(self, name, size):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "wb") as file:
+            file.truncate(size)
+
+        return path
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from whatsapp_chatbot_python import AsyncBot, AsyncNotification
+from whatsapp_chatbot_python.dispatcher import (
+    AsyncChatDispatcher, ChatWorkerPool
+)
+from whatsapp_chatbot_python.webhook import WebhookServer
+
+event_example: dict = {
+    "typeWebhook": "incomingMessageReceived",
+    "senderData": {
+        "chatId": "11001234567@c.us",
+        "sender": "11001234567@c.us"
+    },
+    "messageData": {
+        "typeMessage": "textMessage",
+        "textMessageData": {
+            "textMessage": "Hello"
+        }
+    }
+}
+
+
+class WebhookTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_route_event(self):
+        bot = self.create_bot()
+
+        handled = []
+
+        @bot.router.message()
+        async def message_handler(notification: AsyncNotification):
+            handled.append(notification.message_text)
+
+        dispatcher = AsyncChatDispatcher(bot.router, bot.logger)
+        server = WebhookServer(
+            dispatcher.submit, bot.logger, "/webhook", "secret"
+        )
+
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.post(
+                "/webhook",
+                json=event_example,
+                headers={"Authorization": "Bearer secret"}
+            )
+            self.assertEqual(response.status, 200)
+
+            await dispatcher.join()
+
+        self.assertEqual(handled, ["Hello"])
+
+    async def test_authorization(self):
+        events = []
+
+        async def on_event(event: dict) -> None:
+            events.append(event)
+
+        server = WebhookServer(on_event, MagicMock(), webhook_token="secret")
+
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.post("/", json=event_example)
+            self.assertEqual(response.status, 401)
+
+            response = await client.post(
+                "/", json=event_example, headers={"Authorization": "wrong"}
+            )
+            self.assertEqual(response.status, 401)
+
+            response = await client.post(
+                "/", json=event_example, headers={"Authorization": "secret"}
+            )
+            self.assertEqual(response.status, 200)
+
+        self.assertEqual(events, [event_example])
+
+    async def test_bad_request(self):
+        async def on_event(_: dict) -> None:
+            raise AssertionError("event must not be routed")
+
+        server = WebhookServer(on_event, MagicMock())
+
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.post("/", data="not json")
+            self.assertEqual(response.status, 400)
+
+            response = await client.post("/", json=["typeWebhook"])
+            self.assertEqual(response.status, 400)
+
+    async def test_full_queue(self):
+        bot = self.create_bot()
+
+        pool = ChatWorkerPool(bot.router, bot.logger, 1, queue_size=1)
+
+        async def on_event(event: dict) -> None:
+            pool.submit(event, block=False)
+
+        server = WebhookServer(on_event, MagicMock())
+
+        # The worker is not started, so the second event does not fit.
+        async with TestClient(TestServer(server.create_app())) as client:
+            response = await client.post("/", json=event_example)
+            self.assertEqual(response.status, 200)
+
+            response = await client.post("/", json=event_example)
+            self.assertEqual(response.status, 503)
+
+    @patch("whatsapp_chatbot_python.bot.Bot._update_settings")
+    def create_bot(self, mock__update_settings: MagicMock) -> AsyncBot:
+        mock__update_settings.return_value = None
+
+        return AsyncBot("", "", delete_notifications_at_startup=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,54 @@
-from .bot import Bot, GreenAPI, GreenAPIBot, GreenAPIError, GreenAPIBotError
-from .manager.handler import Notification
-from .manager.state import BaseStates
+import importlib
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bot import (
+        AsyncBot, Bot, GreenAPI, GreenAPIBot, GreenAPIError, GreenAPIBotError
+    )
+    from .manager.handler import AsyncNotification, Notification
+    from .manager.state import BaseStates
+    from .multibot import MultiBot
+
+# Names are imported when they are used for the first time, so importing the
+# package or one of its modules does not load the API client and aiohttp.
+_modules = {
+    "AsyncBot": ".bot",
+    "AsyncNotification": ".manager.handler",
+    "Bot": ".bot",
+    "GreenAPI": ".bot",
+    "GreenAPIBot": ".bot",
+    "GreenAPIError": ".bot",
+    "GreenAPIBotError": ".bot",
+    "MultiBot": ".multibot",
+    "Notification": ".manager.handler",
+    "BaseStates": ".manager.state"
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _modules.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list:
+    return sorted([*globals(), *_modules])
+
 
 __all__ = [
+    "AsyncBot",
+    "AsyncNotification",
     "Bot",
     "GreenAPI",
     "GreenAPIBot",
     "GreenAPIError",
     "GreenAPIBotError",
+    "MultiBot",
     "Notification",
     "BaseStates"
 ]
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+import aiohttp
+from whatsapp_api_client_python.response import Response
+
+from .metrics import Metrics
+
+NETWORK_ERROR = "network"
+API_ERROR = "api"
+HANDLER_ERROR = "handler"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Backoff:
+    def __init__(
+            self,
+            initial_delay: float = 0.1,
+            max_delay: float = 30.0,
+            multiplier: float = 2.0
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+        self.attempts = 0
+
+    def get_delay(self) -> float:
+        delay = min(
+            self.initial_delay * self.multiplier ** self.attempts, self.max_delay
+        )
+
+        self.attempts += 1
+
+        # Half of the delay is random, so many bots that lost the connection
+        # at the same time do not retry at the same time.
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+class CircuitBreaker:
+    def __init__(
+            self,
+            failure_threshold: int = 5,
+            recovery_timeout: float = 30.0,
+            on_change: Optional[Callable[[str, str], None]] = None
+    ):
+        if failure_threshold < 1:
+            raise ValueError("The failure threshold must be positive.")
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.on_change = on_change
+
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = CLOSED
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            self._check_timeout()
+
+            return self._state
+
+    def get_remaining_time(self) -> float:
+        with self.lock:
+            if self._state != OPEN:
+                return 0.0
+
+            return max(
+                self.opened_at + self.recovery_timeout - time.monotonic(), 0.0
+            )
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.failures = 0
+
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self.lock:
+            # The failed request may be the probe after the timeout, even if
+            # the state was not read before it.
+            self._check_timeout()
+
+            self.failures += 1
+
+            if self._state == HALF_OPEN or (
+                    self._state == CLOSED
+                    and self.failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+
+                self._set_state(OPEN)
+
+    def _check_timeout(self) -> None:
+        # After the timeout one request is let through to check whether the
+        # API is available again.
+        if (
+                self._state == OPEN
+                and time.monotonic() - self.opened_at >= self.recovery_timeout
+        ):
+            self._set_state(HALF_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        previous_state, self._state = self._state, state
+
+        if self.on_change is not None:
+            self.on_change(previous_state, state)
+
+
+class ReceiveBackoff:
+    def __init__(
+            self,
+            logger: Optional[logging.Logger] = None,
+            metrics: Optional[Metrics] = None,
+            initial_delay: float = 0.1,
+            max_delay: float = 30.0,
+            failure_threshold: int = 5,
+            recovery_timeout: float = 30.0
+    ):
+        self.logger = logger or logging.getLogger("whatsapp-chatbot-python")
+        self.metrics = metrics
+
+        self.backoff = Backoff(initial_delay, max_delay)
+        self.breaker = CircuitBreaker(
+            failure_threshold, recovery_timeout, self._on_state_change
+        )
+
+    def on_success(self) -> None:
+        if self.backoff.attempts or self.breaker.failures:
+            self.backoff.reset()
+
+            self.breaker.record_success()
+
+    def on_error(self, kind: str, error: object) -> float:
+        # Returns how long to wait before the next request.
+        self.logger.log(logging.ERROR, error)
+
+        if self.metrics is not None:
+            self.metrics.increment("receive_errors_total", kind=kind)
+
+        self.breaker.record_failure()
+
+        if self.breaker.state == OPEN:
+            delay = self.breaker.get_remaining_time()
+        else:
+            delay = self.backoff.get_delay()
+
+        if self.metrics is not None:
+            self.metrics.increment("receive_backoff_seconds_total", delay)
+
+        return delay
+
+    def on_handler_error(self, error: Exception) -> None:
+        # A handler error is a bug in the bot, not a problem with the API, so
+        # notifications keep being received.
+        self.logger.log(logging.ERROR, error)
+
+        if self.metrics is not None:
+            self.metrics.increment("receive_errors_total", kind=HANDLER_ERROR)
+
+    def _on_state_change(self, previous_state: str, state: str) -> None:
+        self.logger.log(
+            logging.WARNING if state == OPEN else logging.INFO,
+            f"Circuit breaker changed from {previous_state} to {state}."
+        )
+
+        if self.metrics is not None:
+            self.metrics.increment(
+                "circuit_breaker_transitions_total", state=state
+            )
+
+
+def get_error_kind(error: BaseException) -> str:
+    if isinstance(
+            error, (OSError, asyncio.TimeoutError, aiohttp.ClientError)
+    ):
+        return NETWORK_ERROR
+    return API_ERROR
+
+
+def get_response_error_kind(response: Response) -> Optional[str]:
+    if response.code == 200:
+        return None
+    if response.code is None:
+        return NETWORK_ERROR
+    return API_ERROR
+
+
+__all__ = [
+    "API_ERROR",
+    "Backoff",
+    "CLOSED",
+    "CircuitBreaker",
+    "HALF_OPEN",
+    "HANDLER_ERROR",
+    "NETWORK_ERROR",
+    "OPEN",
+    "ReceiveBackoff",
+    "get_error_kind",
+    "get_response_error_kind"
+]
@@ -1,13 +1,42 @@
+import asyncio
+import json
 import logging
+import threading
 import time
-from typing import NoReturn, Optional
+from typing import (
+    Callable, Iterable, Iterator, NoReturn, Optional, Type, Union
+)
 
+import aiohttp
+from requests.adapters import HTTPAdapter
 from whatsapp_api_client_python.API import GreenAPI, GreenAPIError
 
-from .manager.router import Router
+from .backoff import (
+    ReceiveBackoff, get_error_kind, get_response_error_kind
+)
+from .broadcast import (
+    BroadcastResult, MessageFactory, broadcast, broadcast_file
+)
+from .dedupe import EventDeduplicator
+from .dispatcher import (
+    AsyncChatDispatcher,
+    ChatWorkerPool,
+    NotificationPrefetcher,
+    ProcessSupervisor
+)
+from .drain import NotificationDrainer
+from .journal import EventJournal
+from .manager.router import AsyncRouter, Router
+from .manager.state import AbstractStateManager
+from .metrics import Metrics
+from .recorder import EventRecorder
+from .settings import MESSAGE_WEBHOOKS, SettingsCache
+from .uploads import StreamingUploads, UploadCache
 
 
 class Bot:
+    router_class: Type[Router] = Router
+
     def __init__(
             self,
             id_instance: str,
@@ -18,7 +47,18 @@ class Bot:
             media: Optional[str] = None,
             bot_debug_mode: bool = False,
             settings: Optional[dict] = None,
-            delete_notifications_at_startup: bool = True
+            delete_notifications_at_startup: bool = True,
+            metrics: Optional[Metrics] = None,
+            state_manager: Optional[AbstractStateManager] = None,
+            upload_cache: Optional[UploadCache] = None,
+            stream_uploads: bool = False,
+            receive_backoff: Optional[ReceiveBackoff] = None,
+            max_notification_age: Optional[float] = None,
+            drain_in_background: bool = False,
+            settings_cache: Optional[SettingsCache] = None,
+            deduplicator: Optional[EventDeduplicator] = None,
+            journal: Optional[EventJournal] = None,
+            recorder: Optional[EventRecorder] = None
     ):
         self.id_instance = id_instance
         self.api_token_instance = api_token_instance
@@ -36,15 +76,38 @@ class Bot:
 
         self.bot_debug_mode = bot_debug_mode
 
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.instrument_api(self.api)
+
+        if stream_uploads:
+            StreamingUploads().instrument_api(self.api)
+
+        if upload_cache is not None:
+            upload_cache.instrument_api(self.api)
+
         self.logger = logging.getLogger("whatsapp-chatbot-python")
         self.__prepare_logger()
 
-        if not settings:
-            self._update_settings()
-        else:
-            self.logger.log(logging.DEBUG, "Updating instance settings.")
+        self.receive_backoff = receive_backoff or ReceiveBackoff(
+            self.logger, metrics
+        )
 
-            self.api.account.setSettings(settings)
+        if settings_cache is not None and settings_cache.is_valid(
+                id_instance, settings
+        ):
+            # The last known settings are used at once and checked while the
+            # bot is already receiving notifications.
+            self.logger.log(logging.DEBUG, "Using cached instance settings.")
+
+            threading.Thread(
+                target=self._check_settings_in_background,
+                args=(settings, settings_cache),
+                name="whatsapp-chatbot-settings",
+                daemon=True
+            ).start()
+        else:
+            self._check_settings(settings, settings_cache)
 
         if bot_debug_mode:
             if not delete_notifications_at_startup:
@@ -54,47 +117,291 @@ class Bot:
                     logging.DEBUG, "Enabled delete_notifications_at_startup."
                 )
 
+        self.drainer: Optional[NotificationDrainer] = None
         if delete_notifications_at_startup:
-            self._delete_notifications_at_startup()
+            self._delete_notifications_at_startup(
+                max_notification_age, drain_in_background
+            )
+
+        self.journal = journal
+        self.recorder = recorder
+
+        self.router = self.router_class(
+            self.api, self.logger, metrics, state_manager, deduplicator, journal
+        )
 
-        self.router = Router(self.api, self.logger)
+    def run_forever(
+            self, workers: int = 0, prefetch: int = 0, processes: int = 0
+    ) -> Optional[NoReturn]:
+        if workers and processes:
+            raise ValueError("Use either workers or processes, not both.")
+        if self.journal is not None and processes:
+            raise ValueError("The journal cannot be used with processes.")
 
-    def run_forever(self) -> Optional[NoReturn]:
         self.api.session.headers["Connection"] = "keep-alive"
 
+        pool = None
+        if processes:
+            pool = ProcessSupervisor(self.router, self.logger, processes)
+            pool.start()
+        elif workers:
+            self._resize_connection_pool(workers + 1)
+
+            pool = ChatWorkerPool(self.router, self.logger, workers)
+            pool.start()
+
+        prefetcher = None
+        if prefetch:
+            prefetcher = NotificationPrefetcher(
+                self.api, self.logger, prefetch, self.receive_backoff,
+                self.journal, self.recorder
+            )
+            prefetcher.start()
+
+        if self.journal is not None:
+            self._replay_journal(pool)
+
         self.logger.log(
             logging.INFO, "Started receiving incoming notifications."
         )
 
         while True:
             try:
+                if prefetcher:
+                    self._handle_event(prefetcher.get(), pool)
+
+                    continue
+
                 response = self.api.receiving.receiveNotification()
 
                 if not response.data:
+                    kind = get_response_error_kind(response)
+                    if kind:
+                        time.sleep(
+                            self.receive_backoff.on_error(kind, response.error)
+                        )
+                    else:
+                        self.receive_backoff.on_success()
+
                     continue
                 response = response.data
 
-                self.router.route_event(response["body"])
+                self.receive_backoff.on_success()
+
+                if self.recorder is not None:
+                    self.recorder.record(response["body"])
+
+                if self.journal is not None:
+                    # The event is on the disk, so it can be deleted before it
+                    # is handled.
+                    self.journal.append(response["body"])
+                    self.journal.sync()
+
+                    self.api.receiving.deleteNotification(
+                        response["receiptId"]
+                    )
+
+                    self._handle_event(response["body"], pool)
+
+                    continue
+
+                self._handle_event(response["body"], pool)
 
                 self.api.receiving.deleteNotification(response["receiptId"])
             except KeyboardInterrupt:
                 break
+            except GreenAPIBotError:
+                raise
             except Exception as error:
                 if self.raise_errors:
                     raise GreenAPIBotError(error)
-                self.logger.log(logging.ERROR, error)
 
-                time.sleep(5.0)
+                time.sleep(self.receive_backoff.on_error(
+                    get_error_kind(error), error
+                ))
 
                 continue
 
+        if prefetcher:
+            prefetcher.stop()
+
+            for event in prefetcher.drain():
+                try:
+                    self._dispatch_event(event, pool)
+                except Exception as error:
+                    self.logger.log(logging.ERROR, error)
+
+        if pool:
+            pool.stop()
+
         self.api.session.headers["Connection"] = "close"
 
         self.logger.log(
             logging.INFO, "Stopped receiving incoming notifications."
         )
 
-    def _update_settings(self) -> Optional[NoReturn]:
+    def broadcast(
+            self,
+            chats: Iterable[str],
+            message: Union[str, MessageFactory],
+            concurrency: int = 8,
+            rate: Optional[float] = None,
+            checkpoint: Optional[str] = None,
+            max_retries: int = 3
+    ) -> Iterator[BroadcastResult]:
+        yield from self._keep_alive(concurrency, lambda: broadcast(
+            self.api,
+            chats,
+            message,
+            concurrency,
+            rate,
+            checkpoint,
+            max_retries,
+            logger=self.logger
+        ))
+
+    def broadcast_file(
+            self,
+            chats: Iterable[str],
+            path: str,
+            file_name: Optional[str] = None,
+            caption: Optional[Union[str, MessageFactory]] = None,
+            concurrency: int = 8,
+            rate: Optional[float] = None,
+            checkpoint: Optional[str] = None,
+            max_retries: int = 3
+    ) -> Iterator[BroadcastResult]:
+        yield from self._keep_alive(concurrency, lambda: broadcast_file(
+            self.api,
+            chats,
+            path,
+            file_name,
+            caption,
+            concurrency,
+            rate,
+            checkpoint,
+            max_retries,
+            logger=self.logger
+        ))
+
+    def _keep_alive(
+            self,
+            concurrency: int,
+            get_results: Callable[[], Iterator[BroadcastResult]]
+    ) -> Iterator[BroadcastResult]:
+        self._resize_connection_pool(concurrency)
+
+        connection = self.api.session.headers.get("Connection")
+        self.api.session.headers["Connection"] = "keep-alive"
+        try:
+            yield from get_results()
+        finally:
+            if connection is None:
+                self.api.session.headers.pop("Connection", None)
+            else:
+                self.api.session.headers["Connection"] = connection
+
+    def run_webhook(
+            self,
+            host: str = "0.0.0.0",
+            port: int = 8080,
+            path: str = "/",
+            webhook_token: Optional[str] = None,
+            workers: int = 1
+    ) -> None:
+        self._resize_connection_pool(workers + 1)
+
+        pool = ChatWorkerPool(self.router, self.logger, workers)
+        pool.start()
+
+        async def on_event(event: dict) -> None:
+            # The event loop must not wait for a worker, so a full queue is
+            # reported to Green API, which sends the notification again.
+            pool.submit(event, block=False)
+
+        from aiohttp import web
+
+        from .webhook import WebhookServer
+
+        server = WebhookServer(on_event, self.logger, path, webhook_token)
+
+        self.logger.log(
+            logging.INFO,
+            f"Started receiving webhook notifications on {host}:{port}."
+        )
+
+        try:
+            web.run_app(server.create_app(), host=host, port=port, print=None)
+        finally:
+            pool.stop()
+
+        self.logger.log(
+            logging.INFO, "Stopped receiving webhook notifications."
+        )
+
+    def _handle_event(
+            self,
+            event: dict,
+            pool: Optional[Union[ChatWorkerPool, ProcessSupervisor]]
+    ) -> None:
+        if self.drainer is not None and self.drainer.is_stale(event):
+            if self.journal is not None:
+                self.journal.mark_done(event)
+
+            return None
+
+        try:
+            self._dispatch_event(event, pool)
+        except Exception as error:
+            if self.raise_errors:
+                raise GreenAPIBotError(error)
+            self.receive_backoff.on_handler_error(error)
+
+    def _replay_journal(
+            self, pool: Optional[Union[ChatWorkerPool, ProcessSupervisor]]
+    ) -> None:
+        for event in self.journal.replay():
+            try:
+                self._dispatch_event(event, pool)
+            except Exception as error:
+                self.receive_backoff.on_handler_error(error)
+
+    def _dispatch_event(
+            self,
+            event: dict,
+            pool: Optional[Union[ChatWorkerPool, ProcessSupervisor]]
+    ) -> None:
+        if pool:
+            pool.submit(event)
+        else:
+            self.router.route_event(event)
+
+    def _check_settings(
+            self,
+            settings: Optional[dict],
+            settings_cache: Optional[SettingsCache]
+    ) -> None:
+        if not settings:
+            settings = self._update_settings()
+        else:
+            self.logger.log(logging.DEBUG, "Updating instance settings.")
+
+            self.api.account.setSettings(settings)
+
+        if settings_cache is not None and settings:
+            settings_cache.set(self.id_instance, settings)
+
+    def _check_settings_in_background(
+            self,
+            settings: Optional[dict],
+            settings_cache: SettingsCache
+    ) -> None:
+        try:
+            self._check_settings(settings, settings_cache)
+        except Exception as error:
+            self.logger.log(logging.ERROR, error)
+
+    def _update_settings(self) -> Optional[dict]:
         self.logger.log(logging.DEBUG, "Checking current instance settings.")
 
         settings = self.api.account.getSettings()
@@ -117,50 +424,226 @@ class Bot:
                 )
             )
 
-            self.api.account.setSettings({
-                "incomingWebhook": "yes",
-                "outgoingMessageWebhook": "yes",
-                "outgoingAPIMessageWebhook": "yes"
-            })
+            enabled_settings = dict.fromkeys(MESSAGE_WEBHOOKS, "yes")
 
-    def _delete_notifications_at_startup(self) -> Optional[NoReturn]:
-        self.api.session.headers["Connection"] = "keep-alive"
+            self.api.account.setSettings(enabled_settings)
+
+            return {**response, **enabled_settings}
+
+        return response
 
+    def _delete_notifications_at_startup(
+            self, max_age: Optional[float], in_background: bool
+    ) -> Optional[NoReturn]:
+        drainer = NotificationDrainer(self.api, self.logger, max_age)
+
+        if in_background:
+            # Old notifications are deleted without handling while receiving,
+            # so the bot starts at once.
+            self.drainer = drainer
+        else:
+            drainer.drain()
+
+    def _resize_connection_pool(self, size: int) -> None:
+        for prefix, adapter in list(self.api.session.adapters.items()):
+            self.api.session.mount(prefix, HTTPAdapter(
+                pool_maxsize=size, max_retries=adapter.max_retries
+            ))
+
+    def __prepare_logger(self) -> None:
+        # Several bots in one process share the logger.
+        if not self.logger.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(
+                (
+                    "%(asctime)s:%(name)s:"
+                    "%(levelname)s:%(message)s"
+                ), datefmt="%Y-%m-%d %H:%M:%S"
+            ))
+
+            self.logger.addHandler(handler)
+
+        if not self.bot_debug_mode:
+            self.logger.setLevel(logging.INFO)
+        else:
+            self.logger.setLevel(logging.DEBUG)
+
+
+class AsyncBot(Bot):
+    router_class = AsyncRouter
+
+    router: AsyncRouter
+
+    async def run_forever(self, max_concurrent_events: int = 100) -> None:
         self.logger.log(
-            logging.DEBUG, "Started deleting old incoming notifications."
+            logging.INFO, "Started receiving incoming notifications."
         )
 
-        while True:
-            response = self.api.receiving.receiveNotification()
+        dispatcher = AsyncChatDispatcher(
+            self.router, self.logger, max_concurrent_events
+        )
 
-            if not response.data:
-                break
+        if self.journal is not None:
+            for event in self.journal.replay():
+                await dispatcher.submit(event)
 
-            self.api.receiving.deleteNotification(response.data["receiptId"])
+        async with self._create_session() as session:
+            await self._poll(session, dispatcher)
 
-        self.api.session.headers["Connection"] = "close"
+        self.logger.log(
+            logging.INFO, "Stopped receiving incoming notifications."
+        )
+
+    async def run_webhook(
+            self,
+            host: str = "0.0.0.0",
+            port: int = 8080,
+            path: str = "/",
+            webhook_token: Optional[str] = None,
+            max_concurrent_events: int = 100
+    ) -> None:
+        dispatcher = AsyncChatDispatcher(
+            self.router, self.logger, max_concurrent_events
+        )
+
+        from aiohttp import web
+
+        from .webhook import WebhookServer
+
+        server = WebhookServer(
+            dispatcher.submit, self.logger, path, webhook_token
+        )
+
+        runner = web.AppRunner(server.create_app())
+        await runner.setup()
+
+        site = web.TCPSite(runner, host, port)
+        await site.start()
 
         self.logger.log(
-            logging.DEBUG, "Stopped deleting old incoming notifications."
+            logging.INFO,
+            f"Started receiving webhook notifications on {host}:{port}."
         )
 
-        self.logger.log(logging.INFO, "Deleted old incoming notifications.")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await runner.cleanup()
 
-    def __prepare_logger(self) -> None:
-        handler = logging.StreamHandler()
-        handler.setFormatter(logging.Formatter(
-            (
-                "%(asctime)s:%(name)s:"
-                "%(levelname)s:%(message)s"
-            ), datefmt="%Y-%m-%d %H:%M:%S"
-        ))
+            await dispatcher.join()
 
-        self.logger.addHandler(handler)
+        self.logger.log(
+            logging.INFO, "Stopped receiving webhook notifications."
+        )
 
-        if not self.bot_debug_mode:
-            self.logger.setLevel(logging.INFO)
-        else:
-            self.logger.setLevel(logging.DEBUG)
+    def _create_session(
+            self, connector: Optional[aiohttp.BaseConnector] = None
+    ) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.api.host_timeout),
+            headers={"Connection": "keep-alive"}
+        )
+
+    async def _poll(
+            self,
+            session: aiohttp.ClientSession,
+            dispatcher: AsyncChatDispatcher
+    ) -> None:
+        while True:
+            try:
+                response = await self._request(
+                    session, "GET", "receiveNotification"
+                )
+
+                self.receive_backoff.on_success()
+
+                if not response:
+                    continue
+
+                event = response["body"]
+                if self.recorder is not None:
+                    self.recorder.record(event)
+
+                stale = (
+                        self.drainer is not None
+                        and self.drainer.is_stale(event)
+                )
+
+                if self.journal is not None and not stale:
+                    # The event is on the disk, so it can be deleted before it
+                    # is handled.
+                    self.journal.append(event)
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self.journal.sync
+                    )
+
+                    await self._request(
+                        session, "DELETE",
+                        "deleteNotification", str(response["receiptId"])
+                    )
+
+                    await dispatcher.submit(event)
+
+                    continue
+
+                if not stale:
+                    await dispatcher.submit(event)
+
+                await self._request(
+                    session, "DELETE",
+                    "deleteNotification", str(response["receiptId"])
+                )
+            except asyncio.CancelledError:
+                break
+            except Exception as error:
+                if self.raise_errors:
+                    raise GreenAPIBotError(error)
+
+                await asyncio.sleep(self.receive_backoff.on_error(
+                    get_error_kind(error), error
+                ))
+
+                continue
+
+        await dispatcher.join()
+
+    async def _request(
+            self,
+            session: aiohttp.ClientSession,
+            method: str,
+            api_method: str,
+            *path: str
+    ) -> Optional[dict]:
+        url = "/".join([
+            f"{self.api.host}/waInstance{self.id_instance}",
+            api_method,
+            self.api_token_instance,
+            *path
+        ])
+
+        started = time.perf_counter()
+
+        async with session.request(method, url) as response:
+            text = await response.text()
+
+        if self.metrics is not None:
+            self.metrics.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started,
+                method=api_method,
+                code=str(response.status)
+            )
+
+        if response.status != 200:
+            raise GreenAPIError(
+                f"Request was failed with status code: {response.status}."
+                f" Data: {text}"
+            )
+
+        return json.loads(text)
 
 
 class GreenAPIBot(Bot):
@@ -172,6 +655,7 @@ class GreenAPIBotError(Exception):
 
 
 __all__ = [
+    "AsyncBot",
     "Bot",
     "GreenAPI",
     "GreenAPIBot",
@@ -0,0 +1,222 @@
+import logging
+import os
+import pathlib
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import (
+    Callable, Dict, Iterable, Iterator, Optional, Set, TYPE_CHECKING, Union
+)
+
+from whatsapp_api_client_python.API import GreenAPIError
+from whatsapp_api_client_python.response import Response
+
+from .outbox import TokenBucket, call_with_retries
+from .uploads import upload_file
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+
+MessageFactory = Callable[[str], str]
+
+
+@dataclass()
+class BroadcastResult:
+    chat: str
+    response: Optional[Response]
+    error: Optional[Exception]
+    sent: int
+    failed: int
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and getattr(self.response, "code", None) == 200
+
+
+def broadcast(
+        api: "GreenAPI",
+        chats: Iterable[str],
+        message: Union[str, MessageFactory],
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        checkpoint: Optional[str] = None,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        logger: Optional[logging.Logger] = None
+) -> Iterator[BroadcastResult]:
+    def get_arguments(chat: str) -> tuple:
+        return chat, message(chat) if callable(message) else message
+
+    return send_to_chats(
+        api.sending.sendMessage,
+        get_arguments,
+        chats,
+        concurrency,
+        rate,
+        checkpoint,
+        max_retries,
+        backoff,
+        logger
+    )
+
+
+def broadcast_file(
+        api: "GreenAPI",
+        chats: Iterable[str],
+        path: str,
+        file_name: Optional[str] = None,
+        caption: Optional[Union[str, MessageFactory]] = None,
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        checkpoint: Optional[str] = None,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        logger: Optional[logging.Logger] = None
+) -> Iterator[BroadcastResult]:
+    # The file is uploaded once and then sent to every chat by its link.
+    response = upload_file(api, path)
+    if response.code != 200 or not (response.data or {}).get("urlFile"):
+        raise GreenAPIError(
+            f"Failed to upload file {path}: {response.error or response.data}"
+        )
+
+    url = response.data["urlFile"]
+    file_name = file_name or pathlib.Path(path).name
+
+    def get_arguments(chat: str) -> tuple:
+        return (
+            chat, url, file_name,
+            caption(chat) if callable(caption) else caption
+        )
+
+    return send_to_chats(
+        api.sending.sendFileByUrl,
+        get_arguments,
+        chats,
+        concurrency,
+        rate,
+        checkpoint,
+        max_retries,
+        backoff,
+        logger
+    )
+
+
+def send_to_chats(
+        method: Callable[..., Response],
+        get_arguments: Callable[[str], tuple],
+        chats: Iterable[str],
+        concurrency: int,
+        rate: Optional[float],
+        checkpoint: Optional[str],
+        max_retries: int,
+        backoff: float,
+        logger: Optional[logging.Logger]
+) -> Iterator[BroadcastResult]:
+    if concurrency < 1:
+        raise ValueError("The concurrency must be positive.")
+
+    logger = logger or logging.getLogger("whatsapp-chatbot-python")
+
+    bucket = TokenBucket(rate) if rate else None
+
+    completed = load_checkpoint(checkpoint)
+    if completed:
+        logger.log(
+            logging.INFO,
+            f"Skipping {len(completed)} chats from the checkpoint."
+        )
+
+    def send(chat: str) -> Response:
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay:
+                time.sleep(delay)
+
+        return call_with_retries(
+            method, get_arguments(chat), {},
+            max_retries, backoff, 60.0, logger
+        )
+
+    return _send_to_chats(send, chats, concurrency, completed, checkpoint)
+
+
+def _send_to_chats(
+        send: Callable[[str], Response],
+        chats: Iterable[str],
+        concurrency: int,
+        completed: Set[str],
+        checkpoint: Optional[str]
+) -> Iterator[BroadcastResult]:
+    checkpoint_file = open(checkpoint, "a") if checkpoint else None
+
+    sent = failed = 0
+    pending: Dict[Future, str] = {}
+
+    executor = ThreadPoolExecutor(
+        concurrency, thread_name_prefix="whatsapp-chatbot-broadcast"
+    )
+    try:
+        chats = iter(chats)
+        exhausted = False
+        while True:
+            # Only a few messages are queued at a time, so the chats can be a
+            # lazy iterable of any size.
+            while not exhausted and len(pending) < concurrency * 2:
+                chat = next(chats, None)
+                if chat is None:
+                    exhausted = True
+                elif chat not in completed:
+                    completed.add(chat)
+
+                    pending[executor.submit(send, chat)] = chat
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chat = pending.pop(future)
+
+                response, error = None, future.exception()
+                if error is None:
+                    response = future.result()
+
+                result = BroadcastResult(chat, response, error, sent, failed)
+                if result.ok:
+                    sent += 1
+
+                    if checkpoint_file:
+                        checkpoint_file.write(f"{chat}\n")
+                        checkpoint_file.flush()
+                else:
+                    failed += 1
+
+                result.sent, result.failed = sent, failed
+
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+        executor.shutdown(wait=True)
+
+        if checkpoint_file:
+            checkpoint_file.close()
+
+
+def load_checkpoint(checkpoint: Optional[str]) -> Set[str]:
+    if not checkpoint or not os.path.exists(checkpoint):
+        return set()
+
+    with open(checkpoint) as file:
+        return {line.strip() for line in file if line.strip()}
+
+
+__all__ = [
+    "BroadcastResult",
+    "MessageFactory",
+    "broadcast",
+    "broadcast_file",
+    "send_to_chats"
+]
@@ -0,0 +1,152 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .metrics import Metrics
+
+# Notifications are redelivered only while they are in the queue, so handled
+# notifications are remembered for a limited time.
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def get_event_key(event: dict) -> Optional[str]:
+    id_message = event.get("idMessage")
+    if not id_message:
+        return None
+
+    # A group message has the same ID on every instance in the group, and
+    # MultiBot shares one deduplicator between instances.
+    id_instance = (event.get("instanceData") or {}).get("idInstance", "")
+
+    # Each status of an outgoing message is a separate notification with the
+    # same message ID.
+    return (
+        f"{id_instance}:{event.get('typeWebhook')}:{id_message}:"
+        f"{event.get('status', '')}"
+    )
+
+
+class EventDeduplicator:
+    def __init__(
+            self,
+            max_size: int = 100000,
+            ttl: float = DEFAULT_TTL,
+            path: Optional[str] = None,
+            metrics: Optional[Metrics] = None
+    ):
+        if max_size < 1:
+            raise ValueError("The maximum size must be positive.")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.metrics = metrics
+
+        self.lock = threading.Lock()
+        # Hash of the key -> expiration time, from the oldest to the newest.
+        # 64-bit hashes take less memory than the keys themselves.
+        self.keys: "OrderedDict[int, float]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+        self.additions = 0
+
+        self.connection: Optional[sqlite3.Connection] = None
+        if path:
+            self._open(path)
+
+    def is_handled(self, event: dict) -> bool:
+        key = get_event_key(event)
+        if key is None:
+            return False
+
+        with self.lock:
+            expires = self.keys.get(hash(key))
+            handled = expires is not None and expires > time.time()
+
+            if handled:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if self.metrics is not None:
+            self.metrics.increment(
+                "dedupe_hits_total" if handled else "dedupe_misses_total"
+            )
+
+        return handled
+
+    def add(self, event: dict) -> None:
+        key = get_event_key(event)
+        if key is None:
+            return None
+
+        now = time.time()
+        expires = now + self.ttl
+
+        with self.lock:
+            self._remember(hash(key), expires, now)
+
+            if self.connection is not None:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO events (key, expires) VALUES (?, ?)",
+                    (key, expires)
+                )
+
+                self.additions += 1
+                if self.additions % 1000 == 0:
+                    self.connection.execute(
+                        "DELETE FROM events WHERE expires <= ?", (now,)
+                    )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+    def _remember(self, key_hash: int, expires: float, now: float) -> None:
+        self.keys[key_hash] = expires
+        self.keys.move_to_end(key_hash)
+
+        # The oldest keys are removed when they expire or do not fit.
+        while self.keys:
+            oldest_hash, oldest_expires = next(iter(self.keys.items()))
+            if len(self.keys) <= self.max_size and oldest_expires > now:
+                break
+
+            del self.keys[oldest_hash]
+
+    def _open(self, path: str) -> None:
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "key TEXT PRIMARY KEY, "
+            "expires REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+
+        # The newest keys are loaded, so lookups never read the disk.
+        now = time.time()
+        rows = self.connection.execute(
+            "SELECT key, expires FROM events WHERE expires > ? "
+            "ORDER BY expires DESC LIMIT ?", (now, self.max_size)
+        ).fetchall()
+        for key, expires in reversed(rows):
+            self._remember(hash(key), expires, now)
+
+        atexit.register(self.close)
+
+
+__all__ = ["DEFAULT_TTL", "EventDeduplicator", "get_event_key"]
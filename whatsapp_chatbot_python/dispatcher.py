@@ -0,0 +1,442 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import threading
+import zlib
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, Iterator, List, Optional, TYPE_CHECKING
+
+from .backoff import ReceiveBackoff, get_error_kind, get_response_error_kind
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+    from .journal import EventJournal
+    from .manager.router import AsyncRouter, Router
+    from .recorder import EventRecorder
+
+
+def get_chat_id(event: dict) -> str:
+    sender_data = event.get("senderData")
+    if sender_data:
+        return sender_data.get("chatId", "")
+
+    return event.get("chatId") or event.get("from") or ""
+
+
+def get_shard(event: dict, shards: int) -> int:
+    chat = get_chat_id(event)
+
+    return zlib.crc32(chat.encode()) % shards
+
+
+class ChatWorkerPool:
+    def __init__(
+            self,
+            router: "Router",
+            logger: logging.Logger,
+            workers: int,
+            queue_size: int = 1000
+    ):
+        if workers < 1:
+            raise ValueError("The number of workers must be positive.")
+
+        self.router = router
+        self.logger = logger
+
+        self.queues: List["queue.Queue[Optional[dict]]"] = [
+            queue.Queue(queue_size) for _ in range(workers)
+        ]
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for index, event_queue in enumerate(self.queues):
+            thread = threading.Thread(
+                target=self._work,
+                args=(event_queue,),
+                name=f"whatsapp-chatbot-worker-{index}",
+                daemon=True
+            )
+            thread.start()
+
+            self.threads.append(thread)
+
+        self.logger.log(
+            logging.DEBUG, f"Started {len(self.threads)} event workers."
+        )
+
+    def submit(self, event: dict, block: bool = True) -> None:
+        # Without blocking, queue.Full is raised when the worker is busy.
+        index = get_shard(event, len(self.queues))
+
+        self.queues[index].put(event, block)
+
+    def stop(self) -> None:
+        for event_queue in self.queues:
+            event_queue.put(None)
+
+        for thread in self.threads:
+            thread.join()
+
+        self.threads.clear()
+
+        self.logger.log(logging.DEBUG, "Stopped event workers.")
+
+    def _work(self, event_queue: "queue.Queue[Optional[dict]]") -> None:
+        while True:
+            event = event_queue.get()
+            if event is None:
+                break
+
+            try:
+                self.router.route_event(event)
+            except Exception as error:
+                self.logger.log(logging.ERROR, error)
+
+
+class ProcessSupervisor:
+    def __init__(
+            self,
+            router: "Router",
+            logger: logging.Logger,
+            processes: int,
+            max_in_flight: int = 100,
+            max_attempts: int = 3,
+            start_method: str = "fork"
+    ):
+        if processes < 1:
+            raise ValueError("The number of processes must be positive.")
+
+        self.router = router
+        self.logger = logger
+
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+
+        # Handlers are usually closures, so worker processes are forked to
+        # inherit the router instead of receiving it pickled.
+        self.context = multiprocessing.get_context(start_method)
+
+        # Each worker has its own queue and its own pipe for confirmations,
+        # so a crashed worker cannot leave a lock shared with others held.
+        self.queues: List[Any] = [None] * processes
+        self.connections: List[Connection] = [None] * processes
+        self.processes: List[Any] = [None] * processes
+
+        # Events that were sent to a worker but not confirmed yet, with the
+        # number of delivery attempts. They are sent again if the worker dies.
+        self.in_flight: List[Dict[int, List[Any]]] = [
+            {} for _ in range(processes)
+        ]
+        self.sequence = 0
+
+    def start(self) -> None:
+        for index in range(len(self.processes)):
+            self._start_worker(index)
+
+        self.logger.log(
+            logging.DEBUG, f"Started {len(self.processes)} worker processes."
+        )
+
+    def submit(self, event: dict) -> None:
+        index = get_shard(event, len(self.processes))
+
+        while len(self.in_flight[index]) >= self.max_in_flight:
+            self._receive_confirmations(timeout=0.5)
+            self._check_workers()
+
+        self.sequence += 1
+        self.queues[index].put((self.sequence, event))
+        self.in_flight[index][self.sequence] = [event, 1]
+
+        self._receive_confirmations()
+        self._check_workers()
+
+    def join(self) -> None:
+        while any(self.in_flight):
+            self._receive_confirmations(timeout=0.5)
+            self._check_workers()
+
+    def stop(self) -> None:
+        self.join()
+
+        for event_queue in self.queues:
+            event_queue.put(None)
+
+        for process in self.processes:
+            process.join()
+
+        for connection in self.connections:
+            connection.close()
+
+        self.logger.log(logging.DEBUG, "Stopped worker processes.")
+
+    def _start_worker(self, index: int) -> None:
+        event_queue = self.context.Queue()
+        connection, child_connection = self.context.Pipe(duplex=False)
+
+        process = self.context.Process(
+            target=self._work,
+            args=(event_queue, child_connection),
+            name=f"whatsapp-chatbot-process-{index}",
+            daemon=True
+        )
+        process.start()
+
+        child_connection.close()
+
+        self.queues[index] = event_queue
+        self.connections[index] = connection
+        self.processes[index] = process
+
+    def _check_workers(self) -> None:
+        for index, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+
+            self.logger.log(
+                logging.ERROR, (
+                    f"Worker process {index} exited with code "
+                    f"{process.exitcode}. Restarting it."
+                )
+            )
+
+            # Events confirmed before the worker died are not sent again.
+            self._drain_connection(index)
+
+            self.queues[index].cancel_join_thread()
+            self.queues[index].close()
+            self.connections[index].close()
+
+            self._start_worker(index)
+
+            # A worker handles events in order, so only the oldest event
+            # could have crashed it.
+            in_flight = self.in_flight[index]
+            if in_flight:
+                sequence = next(iter(in_flight))
+                event, attempts = in_flight[sequence]
+                if attempts >= self.max_attempts:
+                    del in_flight[sequence]
+
+                    self.logger.log(
+                        logging.ERROR, (
+                            f"Dropped event after {attempts} attempts: "
+                            f"{event.get('typeWebhook')}."
+                        )
+                    )
+                else:
+                    in_flight[sequence][1] += 1
+
+            for sequence, (event, _) in in_flight.items():
+                self.queues[index].put((sequence, event))
+
+    def _receive_confirmations(self, timeout: float = 0) -> None:
+        ready = wait(self.connections, timeout)
+
+        for connection in ready:
+            index = self.connections.index(connection)
+
+            if not self._drain_connection(index):
+                # The worker has exited, wait for it to be restarted.
+                self.processes[index].join(1.0)
+
+    def _drain_connection(self, index: int) -> bool:
+        # Returns False if the worker has closed its end of the pipe.
+        connection = self.connections[index]
+        try:
+            while connection.poll():
+                self.in_flight[index].pop(connection.recv(), None)
+        except (EOFError, OSError):
+            return False
+
+        return True
+
+    def _work(self, event_queue: Any, connection: Connection) -> None:
+        # Ctrl + C is handled by the supervisor, which stops workers after
+        # they have handled their events.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        # Do not reuse HTTP connections opened by the parent process.
+        session = getattr(self.router.api, "session", None)
+        if session is not None:
+            session.close()
+
+        while True:
+            item = event_queue.get()
+            if item is None:
+                break
+
+            sequence, event = item
+            try:
+                self.router.route_event(event)
+            except Exception as error:
+                self.logger.log(logging.ERROR, error)
+
+            connection.send(sequence)
+
+
+class AsyncChatDispatcher:
+    def __init__(
+            self,
+            router: "AsyncRouter",
+            logger: logging.Logger,
+            max_concurrent_events: int = 100
+    ):
+        self.router = router
+        self.logger = logger
+
+        self.semaphore = asyncio.Semaphore(max_concurrent_events)
+        self.chat_tasks: Dict[str, asyncio.Task] = {}
+
+    async def submit(self, event: dict) -> asyncio.Task:
+        await self.semaphore.acquire()
+
+        chat = get_chat_id(event)
+
+        task = asyncio.ensure_future(
+            self._handle_event(event, self.chat_tasks.get(chat))
+        )
+
+        self.chat_tasks[chat] = task
+
+        def discard(_: asyncio.Task) -> None:
+            if self.chat_tasks.get(chat) is task:
+                del self.chat_tasks[chat]
+
+        task.add_done_callback(discard)
+
+        return task
+
+    async def join(self) -> None:
+        while self.chat_tasks:
+            await asyncio.gather(
+                *self.chat_tasks.values(), return_exceptions=True
+            )
+
+    async def _handle_event(
+            self, event: dict, previous_task: Optional[asyncio.Task]
+    ) -> None:
+        try:
+            if previous_task:
+                await asyncio.wait([previous_task])
+
+            await self.router.route_event(event)
+        except Exception as error:
+            self.logger.log(logging.ERROR, error)
+        finally:
+            self.semaphore.release()
+
+
+class NotificationPrefetcher:
+    def __init__(
+            self,
+            api: "GreenAPI",
+            logger: logging.Logger,
+            depth: int,
+            receive_backoff: Optional[ReceiveBackoff] = None,
+            journal: Optional["EventJournal"] = None,
+            recorder: Optional["EventRecorder"] = None
+    ):
+        if depth < 1:
+            raise ValueError("The prefetch depth must be positive.")
+
+        self.api = api
+        self.logger = logger
+        self.receive_backoff = receive_backoff or ReceiveBackoff(logger)
+        self.journal = journal
+        self.recorder = recorder
+
+        self.events: "queue.Queue[dict]" = queue.Queue(depth)
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        self.last_receipt_id: Optional[int] = None
+
+    def start(self) -> None:
+        self.stopped.clear()
+
+        self.thread = threading.Thread(
+            target=self._receive,
+            name="whatsapp-chatbot-receiver",
+            daemon=True
+        )
+        self.thread.start()
+
+    def get(self) -> dict:
+        return self.events.get()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def drain(self) -> Iterator[dict]:
+        while True:
+            try:
+                yield self.events.get_nowait()
+            except queue.Empty:
+                break
+
+    def _receive(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                response = self.api.receiving.receiveNotification()
+
+                if not response.data:
+                    kind = get_response_error_kind(response)
+                    if kind:
+                        self.stopped.wait(
+                            self.receive_backoff.on_error(kind, response.error)
+                        )
+                    else:
+                        self.receive_backoff.on_success()
+
+                    continue
+                response = response.data
+
+                self.receive_backoff.on_success()
+
+                receipt_id = response["receiptId"]
+                if receipt_id != self.last_receipt_id:
+                    if self.recorder is not None:
+                        self.recorder.record(response["body"])
+
+                    if self.journal is not None:
+                        self.journal.append(response["body"])
+                        self.journal.sync()
+
+                    if not self._put(response["body"]):
+                        break
+
+                    self.last_receipt_id = receipt_id
+
+                self.api.receiving.deleteNotification(receipt_id)
+            except Exception as error:
+                self.stopped.wait(self.receive_backoff.on_error(
+                    get_error_kind(error), error
+                ))
+
+    def _put(self, event: dict) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.events.put(event, timeout=0.5)
+
+                return True
+            except queue.Full:
+                continue
+
+        return False
+
+
+__all__ = [
+    "AsyncChatDispatcher",
+    "ChatWorkerPool",
+    "NotificationPrefetcher",
+    "ProcessSupervisor",
+    "get_chat_id",
+    "get_shard"
+]
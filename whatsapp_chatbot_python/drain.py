@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+
+
+class NotificationDrainer:
+    def __init__(
+            self,
+            api: "GreenAPI",
+            logger: logging.Logger,
+            max_age: Optional[float] = None,
+            progress_interval: float = 5.0,
+            clock_skew: float = 5.0
+    ):
+        self.api = api
+        self.logger = logger
+        self.max_age = max_age
+        self.progress_interval = progress_interval
+        self.clock_skew = clock_skew
+
+        # Notifications sent before this time are old. Timestamps are whole
+        # seconds of the server clock, so notifications sent in the startup
+        # second or within the clock skew are not old.
+        self.stale_before: Optional[float] = (
+            int(time.time()) - (max_age or 0) - clock_skew
+        )
+
+        self.lock = threading.Lock()
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    def drain(self) -> int:
+        # Returns the number of deleted notifications.
+        if self.max_age is None:
+            # The whole queue is cleared with one request instead of two
+            # requests for each notification.
+            response = self.api.queues.clearWebhooksQueue()
+            if response.code == 200:
+                self.stale_before = None
+
+                self.logger.log(
+                    logging.INFO, "Cleared the incoming notification queue."
+                )
+
+                return 0
+
+            self.logger.log(
+                logging.WARNING, (
+                    "Failed to clear the incoming notification queue. "
+                    "Deleting notifications one by one."
+                )
+            )
+
+        connection = self.api.session.headers.get("Connection")
+        self.api.session.headers["Connection"] = "keep-alive"
+
+        deleted = 0
+        started = reported = time.monotonic()
+        try:
+            while True:
+                response = self.api.receiving.receiveNotification()
+                if not response.data:
+                    break
+
+                # The queue is ordered by time, so after the first recent
+                # notification the rest are recent too.
+                if not self._is_old(response.data["body"]):
+                    break
+
+                self.api.receiving.deleteNotification(
+                    response.data["receiptId"]
+                )
+
+                deleted += 1
+
+                if time.monotonic() - reported >= self.progress_interval:
+                    reported = time.monotonic()
+
+                    self.logger.log(
+                        logging.INFO, (
+                            f"Deleted {deleted} old incoming notifications "
+                            f"in {reported - started:.1f} seconds."
+                        )
+                    )
+        finally:
+            if connection is None:
+                self.api.session.headers.pop("Connection", None)
+            else:
+                self.api.session.headers["Connection"] = connection
+
+        self.stale_before = None
+
+        self.logger.log(
+            logging.INFO, (
+                f"Deleted {deleted} old incoming notifications "
+                f"in {time.monotonic() - started:.1f} seconds."
+            )
+        )
+
+        return deleted
+
+    def is_stale(self, event: dict) -> bool:
+        if self.stale_before is None:
+            return False
+
+        if self._is_old(event):
+            self._count_skipped()
+
+            return True
+
+        # Old notifications are no longer expected after a recent one.
+        with self.lock:
+            if self.stale_before is not None:
+                self.stale_before = None
+
+                self.logger.log(
+                    logging.INFO, (
+                        f"Skipped {self.skipped} old incoming notifications "
+                        f"in {time.monotonic() - self.started:.1f} seconds."
+                    )
+                )
+
+        return False
+
+    def _is_old(self, event: dict) -> bool:
+        stale_before = self.stale_before
+
+        return (
+                stale_before is not None
+                and event.get("timestamp", 0) < stale_before
+        )
+
+    def _count_skipped(self) -> None:
+        with self.lock:
+            self.skipped += 1
+
+            if self.skipped % 1000 == 0:
+                self.logger.log(
+                    logging.INFO,
+                    f"Skipped {self.skipped} old incoming notifications."
+                )
+
+
+__all__ = ["NotificationDrainer"]
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from re import RegexFlag, fullmatch
-from typing import Dict, List, Optional, TYPE_CHECKING, Type, Union
+from enum import Enum
+from re import RegexFlag, compile as compile_regexp
+from typing import (
+    Any, Dict, FrozenSet, Iterable, List, Optional, TYPE_CHECKING, Type, Union
+)
 
 if TYPE_CHECKING:
     from .manager.handler import Notification
@@ -8,6 +11,24 @@ if TYPE_CHECKING:
 TEXT_TYPES = ["textMessage", "extendedTextMessage", "quotedMessage"]
 
 
+def to_key(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def to_frozenset(value: Union[str, Iterable[str]]) -> FrozenSet[str]:
+    if isinstance(value, str):
+        return frozenset([to_key(value)])
+
+    values = frozenset(to_key(item) for item in value)
+    for item in values:
+        if not isinstance(item, str):
+            raise TypeError(f"Filter values must be strings, not {item!r}.")
+
+    return values
+
+
 class AbstractFilter(ABC):
     @abstractmethod
     def __init__(self, *args, **kwargs):
@@ -20,9 +41,7 @@ class AbstractFilter(ABC):
 
 class ChatIDFilter(AbstractFilter):
     def __init__(self, chat: Union[str, List[str]]):
-        self.chat = chat
-        if isinstance(chat, str):
-            self.chat = [chat]
+        self.chat = to_frozenset(chat)
 
     def check_event(self, notification: "Notification") -> bool:
         chat = notification.chat
@@ -34,9 +53,7 @@ class ChatIDFilter(AbstractFilter):
 
 class SenderFilter(AbstractFilter):
     def __init__(self, sender: Union[str, List[str]]):
-        self.sender = sender
-        if isinstance(sender, str):
-            self.sender = [sender]
+        self.sender = to_frozenset(sender)
 
     def check_event(self, notification: "Notification") -> bool:
         sender = notification.sender
@@ -48,9 +65,7 @@ class SenderFilter(AbstractFilter):
 
 class TypeMessageFilter(AbstractFilter):
     def __init__(self, type_message: Union[str, List[str]]):
-        self.type_message = type_message
-        if isinstance(type_message, str):
-            self.type_message = [type_message]
+        self.type_message = to_frozenset(type_message)
 
     def check_event(self, notification: "Notification") -> bool:
         type_message = notification.event["messageData"]["typeMessage"]
@@ -62,9 +77,7 @@ class TypeMessageFilter(AbstractFilter):
 
 class TextMessageFilter(AbstractFilter):
     def __init__(self, text_message: Union[str, List[str]]):
-        self.text_message = text_message
-        if isinstance(text_message, str):
-            self.text_message = [text_message]
+        self.text_message = to_frozenset(text_message)
 
     def check_event(self, notification: "Notification") -> bool:
         text_message = notification.message_text
@@ -81,16 +94,22 @@ class RegExpFilter(AbstractFilter):
         if isinstance(pattern, str):
             self.pattern = pattern
             self.flags = flags
-        elif isinstance(pattern, tuple):
-            if len(pattern) == 2:
-                self.pattern, self.flags = pattern
+        elif isinstance(pattern, tuple) and len(pattern) == 2:
+            self.pattern, self.flags = pattern
+        else:
+            raise TypeError(
+                "The regexp filter must be a pattern "
+                f"or a (pattern, flags) tuple, not {pattern!r}."
+            )
+
+        self.regexp = compile_regexp(self.pattern, self.flags)
 
     def check_event(self, notification: "Notification") -> bool:
         text_message = notification.message_text
         if text_message is None:
             return False
 
-        if fullmatch(self.pattern, text_message, self.flags):
+        if self.regexp.fullmatch(text_message):
             return True
         return False
 
@@ -100,18 +119,25 @@ class CommandFilter(AbstractFilter):
         if isinstance(command, str):
             self.command = command
             self.prefixes = prefixes
-        elif isinstance(command, tuple):
-            if len(command) == 2:
-                self.command, self.prefixes = command
+        elif isinstance(command, tuple) and len(command) == 2:
+            self.command, self.prefixes = command
+        else:
+            raise TypeError(
+                "The command filter must be a command "
+                f"or a (command, prefixes) tuple, not {command!r}."
+            )
+
+        self.commands = to_frozenset(
+            f"{prefix}{self.command}" for prefix in self.prefixes
+        )
 
     def check_event(self, notification: "Notification") -> bool:
         text_message = notification.message_text
         if text_message is None:
             return False
 
-        for prefix in self.prefixes:
-            if text_message.split()[0] != f"{prefix}{self.command}":
-                continue
+        words = text_message.split(maxsplit=1)
+        if words and words[0] in self.commands:
             return True
         return False
 
@@ -164,6 +190,9 @@ filters: Dict[str, Type[AbstractFilter]] = {
 __all__ = [
     "TEXT_TYPES",
 
+    "to_frozenset",
+    "to_key",
+
     "AbstractFilter",
     "ChatIDFilter",
     "SenderFilter",
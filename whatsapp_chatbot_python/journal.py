@@ -0,0 +1,216 @@
+import atexit
+import json
+import logging
+import os
+import threading
+from typing import Dict, IO, Iterator, List, Optional
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class EventJournal:
+    def __init__(
+            self,
+            directory: str = "journal",
+            segment_size: int = 16 * 1024 * 1024,
+            flush_interval: float = 0.1,
+            logger: Optional[logging.Logger] = None
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.logger = logger or logging.getLogger("whatsapp-chatbot-python")
+
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+
+        # Entry ID -> event that is not handled yet. Events are found by
+        # their identity, so handlers receive them unchanged.
+        self.pending: Dict[int, dict] = {}
+        self.ids: Dict[int, int] = {}
+
+        self.last_id = 0
+        self.written = 0
+        self.synced = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+        segments = self._get_segments()
+        for segment in segments:
+            self._load(segment)
+
+        self.segment = segments[-1] + 1 if segments else 1
+        self.file: IO[str] = self._open_segment(self.segment)
+        self._compact(segments)
+
+        if self.pending:
+            self.logger.log(
+                logging.INFO,
+                f"Found {len(self.pending)} unfinished events in the journal."
+            )
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        if flush_interval > 0:
+            self.thread = threading.Thread(
+                target=self._flush_periodically,
+                name="whatsapp-chatbot-journal",
+                daemon=True
+            )
+            self.thread.start()
+
+        atexit.register(self.close)
+
+    def append(self, event: dict) -> None:
+        with self.lock:
+            self.last_id += 1
+
+            self.pending[self.last_id] = event
+            self.ids[id(event)] = self.last_id
+
+            self._write({"id": self.last_id, "event": event})
+
+            if self.file.tell() >= self.segment_size:
+                self._roll()
+
+    def mark_done(self, event: dict) -> None:
+        with self.lock:
+            entry_id = self.ids.pop(id(event), None)
+            if entry_id is None:
+                return None
+
+            del self.pending[entry_id]
+
+            self._write({"id": entry_id})
+
+            if self.file.tell() >= self.segment_size:
+                self._roll()
+
+    def sync(self) -> None:
+        # Waits until all written entries are on the disk. Concurrent calls
+        # share one fsync.
+        with self.lock:
+            position = self.written
+            if self.synced >= position:
+                return None
+
+            self.file.flush()
+
+        with self.sync_lock:
+            if self.synced >= position:
+                return None
+
+            os.fsync(self.file.fileno())
+
+            self.synced = max(self.synced, position)
+
+    def replay(self) -> Iterator[dict]:
+        # Events that were received, but not handled before the process
+        # stopped. They are marked done by the router after handling.
+        with self.lock:
+            events = list(self.pending.values())
+
+        yield from events
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def close(self) -> None:
+        self.stopped.set()
+
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+        with self.lock:
+            if self.file.closed:
+                return None
+
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+    def _write(self, record: dict) -> None:
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        self.written += 1
+
+    def _roll(self) -> None:
+        with self.sync_lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+            self.synced = self.written
+
+        previous_segment = self.segment
+
+        self.segment += 1
+        self.file = self._open_segment(self.segment)
+        self._compact([previous_segment])
+
+    def _compact(self, segments: List[int]) -> None:
+        # Unfinished events are copied to the new segment, so older segments
+        # can be deleted and the journal does not grow.
+        for entry_id, event in self.pending.items():
+            self._write({"id": entry_id, "event": event})
+
+        with self.sync_lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+            self.synced = self.written
+
+        for segment in segments:
+            os.remove(self._get_path(segment))
+
+    def _load(self, segment: int) -> None:
+        with open(self._get_path(segment), encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may be incomplete after a crash.
+                    continue
+
+                entry_id = record["id"]
+                self.last_id = max(self.last_id, entry_id)
+
+                event = record.get("event")
+                if event is not None:
+                    # Unfinished events are copied on compaction.
+                    if entry_id in self.pending:
+                        del self.ids[id(self.pending[entry_id])]
+
+                    self.pending[entry_id] = event
+                    self.ids[id(event)] = entry_id
+                elif entry_id in self.pending:
+                    del self.ids[id(self.pending.pop(entry_id))]
+
+    def _get_segments(self) -> List[int]:
+        return sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _get_path(self, segment: int) -> str:
+        return os.path.join(
+            self.directory, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}"
+        )
+
+    def _open_segment(self, segment: int) -> IO[str]:
+        return open(self._get_path(segment), "a", encoding="utf-8")
+
+    def _flush_periodically(self) -> None:
+        # Entries are written to the disk in batches. Done marks may be lost
+        # in a crash, then the event is handled again.
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.sync()
+            except Exception as error:
+                self.logger.log(logging.ERROR, error)
+
+
+__all__ = ["EventJournal"]
@@ -1,11 +1,14 @@
+import asyncio
+import inspect
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
 from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Union
 
 from whatsapp_api_client_python.response import Response
 
-from ..filters import filters as event_filters
+from ..filters import AbstractFilter, filters as event_filters
 
 if TYPE_CHECKING:
     from .observer import Observer
@@ -13,7 +16,14 @@ if TYPE_CHECKING:
     from ..bot import GreenAPI
 
 
+UNSET: Any = object()
+
+
 class Notification:
+    __slots__ = (
+        "event", "api", "state_manager", "_chat", "_sender", "_message_text"
+    )
+
     event: dict
 
     api: "GreenAPI"
@@ -30,6 +40,10 @@ class Notification:
         self.api = api
         self.state_manager = state_manager
 
+        self._chat = UNSET
+        self._sender = UNSET
+        self._message_text = UNSET
+
     @property
     def chat(self) -> Optional[str]:
         return self.get_chat()
@@ -43,16 +57,31 @@ class Notification:
         return self.get_message_text()
 
     def get_chat(self) -> Optional[str]:
+        if self._chat is UNSET:
+            self._chat = self._find_chat()
+        return self._chat
+
+    def get_sender(self) -> Optional[str]:
+        if self._sender is UNSET:
+            self._sender = self._find_sender()
+        return self._sender
+
+    def get_message_text(self) -> Optional[str]:
+        if self._message_text is UNSET:
+            self._message_text = self._find_message_text()
+        return self._message_text
+
+    def _find_chat(self) -> Optional[str]:
         type_webhook = self.event["typeWebhook"]
         if type_webhook != "outgoingMessageStatus":
             return self.event["senderData"]["chatId"]
 
-    def get_sender(self) -> Optional[str]:
+    def _find_sender(self) -> Optional[str]:
         type_webhook = self.event["typeWebhook"]
         if type_webhook != "outgoingMessageStatus":
             return self.event["senderData"]["sender"]
 
-    def get_message_text(self) -> Optional[str]:
+    def _find_message_text(self) -> Optional[str]:
         type_webhook = self.event["typeWebhook"]
         if type_webhook != "outgoingMessageStatus":
             message_data = self.event["messageData"]
@@ -166,19 +195,115 @@ class Notification:
                 chat, message, options, multiple_answers, quoted_message_id, typing_time
             )
 
+
+class AsyncNotification(Notification):
+    __slots__ = ()
+
+    async def answer(
+            self,
+            message: str,
+            quoted_message_id: Optional[str] = None,
+            archive_chat: Optional[bool] = None,
+            link_preview: Optional[bool] = None,
+            typing_time: Optional[int] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            return await self.api.sending.sendMessageAsync(
+                chat, message, quoted_message_id, archive_chat, link_preview, typing_time
+            )
+
+    async def answer_buttons(
+            self,
+            message: str,
+            buttons: List[Dict[str, Union[int, str]]],
+            footer: Optional[str] = None,
+            quoted_message_id: Optional[str] = None,
+            archive_chat: Optional[bool] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            loop = asyncio.get_event_loop()
+
+            return await loop.run_in_executor(
+                None, self.api.sending.sendButtons,
+                chat, message, buttons, footer, quoted_message_id, archive_chat
+            )
+
+    async def answer_with_interactive_buttons(
+            self,
+            body: str,
+            buttons: List[Dict[str, Union[str, Dict[str, str]]]],
+            header: Optional[str] = None,
+            footer: Optional[str] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            return await self.api.sending.sendInteractiveButtonsAsync(
+                chat, body, buttons, header, footer
+            )
+
+    async def answer_with_interactive_buttons_reply(
+            self,
+            body: str,
+            buttons: List[Dict[str, str]],
+            header: Optional[str] = None,
+            footer: Optional[str] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            return await self.api.sending.sendInteractiveButtonsReplyAsync(
+                chat, body, buttons, header, footer
+            )
+
+    async def answer_with_file(
+            self,
+            file: str,
+            file_name: Optional[str] = None,
+            caption: Optional[str] = None,
+            quoted_message_id: Optional[str] = None,
+            typing_time: Optional[int] = None,
+            typing_type: Optional[str] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            return await self.api.sending.sendFileByUploadAsync(
+                chat, file, file_name, caption, quoted_message_id, typing_time, typing_type
+            )
+
+    async def answer_with_poll(
+            self,
+            message: str,
+            options: List[Dict[str, str]],
+            multiple_answers: Optional[bool] = None,
+            quoted_message_id: Optional[str] = None,
+            typing_time: Optional[int] = None
+    ) -> Optional[Response]:
+        chat = self.get_chat()
+        if chat:
+            return await self.api.sending.sendPollAsync(
+                chat, message, options, multiple_answers, quoted_message_id, typing_time
+            )
+
+
 HandlerType = Callable[[Notification], Any]
 
 
 class AbstractHandler(ABC):
     handler: HandlerType
     filters: Dict[str, Any]
+    compiled_filters: List[AbstractFilter]
 
     @abstractmethod
     def check_event(self, notification: Notification) -> bool:
         pass
 
     @abstractmethod
-    def execute_handler(self, observer: "Observer") -> bool:
+    def execute_handler(
+            self,
+            observer: "Observer",
+            notification: Optional[Notification] = None
+    ) -> bool:
         pass
 
 
@@ -187,43 +312,117 @@ class Handler(AbstractHandler):
         self.handler = handler
         self.filters = filters
 
+        self.name = getattr(handler, "__qualname__", repr(handler))
+
+        self.compiled_filters = [
+            event_filters[filter_name](filter_data)
+            for filter_name, filter_data in filters.items()
+            if filter_name in event_filters
+        ]
+
     def check_event(self, notification: Notification) -> bool:
-        for filter_name in self.filters.keys():
-            filter_ = event_filters.get(filter_name)
-            if filter_:
-                filter_data = self.filters[filter_name]
-                response = filter_(filter_data).check_event(notification)
-                if not response:
-                    return False
+        for filter_ in self.compiled_filters:
+            if not filter_.check_event(notification):
+                return False
 
         return True
 
-    def execute_handler(self, observer: "Observer") -> bool:
-        notification = Notification(
-            observer.event, observer.router.api, observer.state_manager
-        )
+    def match_event(
+            self, observer: "Observer", notification: Notification
+    ) -> bool:
+        logger = observer.router.logger
 
-        filters = json.dumps(self.filters, ensure_ascii=False)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            filters = json.dumps(self.filters, ensure_ascii=False, default=str)
 
-        observer.router.logger.log(
-            logging.DEBUG, f"Checking event by filters: {filters}"
-        )
+            logger.log(logging.DEBUG, f"Checking event by filters: {filters}")
 
         response = self.check_event(notification)
-        if response:
-            observer.router.logger.log(
-                logging.DEBUG, "Event matches filters. Handling event."
+
+        metrics = observer.router.metrics
+        if metrics is not None:
+            metrics.increment(
+                "handler_checks_total",
+                handler=self.name,
+                result="match" if response else "miss"
             )
 
+        if debug:
+            if response:
+                logger.log(
+                    logging.DEBUG, "Event matches filters. Handling event."
+                )
+            else:
+                logger.log(logging.DEBUG, "Event does not match filters.")
+
+        return response
+
+    def execute_handler(
+            self,
+            observer: "Observer",
+            notification: Optional[Notification] = None
+    ) -> bool:
+        if notification is None:
+            notification = observer.create_notification(observer.event)
+
+        if not self.match_event(observer, notification):
+            return False
+
+        metrics = observer.router.metrics
+        if metrics is None:
             self.handler(notification)
 
             return True
 
-        observer.router.logger.log(
-            logging.DEBUG, "Event does not match filters."
-        )
+        started = time.perf_counter()
+        try:
+            self.handler(notification)
+        finally:
+            metrics.observe(
+                "handler_duration_seconds",
+                time.perf_counter() - started,
+                handler=self.name
+            )
+
+        return True
+
 
-        return False
+class AsyncHandler(Handler):
+    async def execute_handler(
+            self,
+            observer: "Observer",
+            notification: Optional[Notification] = None
+    ) -> bool:
+        if notification is None:
+            notification = observer.create_notification(observer.event)
+
+        if not self.match_event(observer, notification):
+            return False
+
+        started = time.perf_counter()
+        try:
+            result = self.handler(notification)
+            if inspect.isawaitable(result):
+                await result
+        finally:
+            metrics = observer.router.metrics
+            if metrics is not None:
+                metrics.observe(
+                    "handler_duration_seconds",
+                    time.perf_counter() - started,
+                    handler=self.name
+                )
+
+        return True
 
 
-__all__ = ["AbstractHandler", "Handler", "HandlerType", "Notification"]
+__all__ = [
+    "UNSET",
+    "AbstractHandler",
+    "AsyncHandler",
+    "AsyncNotification",
+    "Handler",
+    "HandlerType",
+    "Notification"
+]
@@ -0,0 +1,215 @@
+import heapq
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+from .handler import AbstractHandler, Notification
+from .regexp import RegExpMatcher
+from ..filters import (
+    AbstractFilter,
+    ChatIDFilter,
+    CommandFilter,
+    StateFilter,
+    TextMessageFilter,
+    TypeMessageFilter,
+    to_key
+)
+
+MISSING = object()
+
+
+def get_text_message(notification: Notification) -> Any:
+    return notification.message_text
+
+
+def get_command(notification: Notification) -> Any:
+    text_message = notification.message_text
+    if text_message is None:
+        return MISSING
+
+    words = text_message.split(maxsplit=1)
+    if not words:
+        return MISSING
+    return words[0]
+
+
+def get_chat(notification: Notification) -> Any:
+    return notification.chat
+
+
+def get_state(notification: Notification) -> Any:
+    state = notification.state_manager.get_state(notification.sender)
+    if not state:
+        return None
+    return to_key(state.name)
+
+
+def get_type_message(notification: Notification) -> Any:
+    return notification.event["messageData"]["typeMessage"]
+
+
+# Ordered from the most to the least selective filter. A handler is indexed
+# by the first filter from this list that it has.
+INDEXED_FILTERS: List[
+    Tuple[str, Callable[[Notification], Any], Callable[[Any], Iterable[Any]]]
+] = [
+    ("text_message", get_text_message, lambda filter_: filter_.text_message),
+    ("command", get_command, lambda filter_: filter_.commands),
+    ("from_chat", get_chat, lambda filter_: filter_.chat),
+    ("state", get_state, lambda filter_: [to_key(filter_.state_name)]),
+    ("type_message", get_type_message, lambda filter_: filter_.type_message)
+]
+
+# Keys of these filters may need a request, e.g. to a state storage, so they
+# are looked up only when a handler indexed by them is reached.
+DEFERRED_FILTERS = frozenset(["state"])
+
+FILTER_TYPES: Dict[str, type] = {
+    "text_message": TextMessageFilter,
+    "command": CommandFilter,
+    "from_chat": ChatIDFilter,
+    "state": StateFilter,
+    "type_message": TypeMessageFilter
+}
+
+
+class HandlerIndex:
+    def __init__(self, handlers: Sequence[AbstractHandler]):
+        self.size = len(handlers)
+
+        self.buckets: Dict[str, Dict[Any, List[int]]] = {}
+        self.unindexed: List[int] = []
+
+        for position, handler in enumerate(handlers):
+            self._add_handler(position, handler)
+
+        # All positions of each deferred filter, whatever the key.
+        self.deferred: Dict[str, List[int]] = {
+            filter_name: sorted(
+                position
+                for positions in self.buckets[filter_name].values()
+                for position in positions
+            )
+            for filter_name in DEFERRED_FILTERS
+            if self.buckets.get(filter_name)
+        }
+
+        self.regexp = RegExpMatcher(handlers)
+
+    def get_candidates(self, notification: Notification) -> Iterator[int]:
+        positions = self._get_positions(notification)
+        if not self.regexp:
+            return iter(positions)
+
+        try:
+            text_message = notification.message_text
+        except (KeyError, TypeError):
+            text_message = None
+
+        return self.regexp.filter(positions, text_message)
+
+    def _get_positions(self, notification: Notification) -> Iterable[int]:
+        candidates = [self.unindexed]
+
+        for filter_name, get_key, _ in INDEXED_FILTERS:
+            bucket = self.buckets.get(filter_name)
+            if not bucket or filter_name in self.deferred:
+                continue
+
+            try:
+                key = get_key(notification)
+            except (KeyError, TypeError):
+                continue
+
+            if key is MISSING:
+                continue
+
+            positions = bucket.get(key)
+            if positions:
+                candidates.append(positions)
+
+        if self.deferred:
+            return self._merge_deferred(notification, candidates)
+
+        if len(candidates) == 1:
+            return self.unindexed
+        return list(heapq.merge(*candidates))
+
+    def _merge_deferred(
+            self, notification: Notification, candidates: List[List[int]]
+    ) -> Iterator[int]:
+        # Positions are tagged with the deferred filter they belong to, and
+        # its key is looked up when the first of them is reached.
+        tagged = [
+            ((position, None) for position in positions)
+            for positions in candidates
+        ]
+        tagged.extend(
+            ((position, filter_name) for position in positions)
+            for filter_name, positions in self.deferred.items()
+        )
+
+        matched: Dict[str, Any] = {}
+        for position, filter_name in heapq.merge(
+                *tagged, key=lambda item: item[0]
+        ):
+            if filter_name is not None:
+                positions = matched.get(filter_name)
+                if positions is None:
+                    positions = matched[filter_name] = self._get_deferred(
+                        notification, filter_name
+                    )
+
+                if position not in positions:
+                    continue
+
+            yield position
+
+    def _get_deferred(
+            self, notification: Notification, filter_name: str
+    ) -> frozenset:
+        get_key = next(
+            get_key for name, get_key, _ in INDEXED_FILTERS
+            if name == filter_name
+        )
+
+        try:
+            key = get_key(notification)
+        except (KeyError, TypeError):
+            return frozenset()
+
+        if key is MISSING:
+            return frozenset()
+        return frozenset(self.buckets[filter_name].get(key, ()))
+
+    def _add_handler(self, position: int, handler: AbstractHandler) -> None:
+        filters: Dict[type, AbstractFilter] = {
+            type(filter_): filter_
+            for filter_ in getattr(handler, "compiled_filters", [])
+        }
+
+        for filter_name, _, get_filter_keys in INDEXED_FILTERS:
+            filter_ = filters.get(FILTER_TYPES[filter_name])
+            if filter_ is None:
+                continue
+
+            bucket = self.buckets.setdefault(filter_name, {})
+            for key in get_filter_keys(filter_):
+                bucket.setdefault(key, []).append(position)
+
+            return None
+
+        self.unindexed.append(position)
+
+
+def get_index(
+        index: Optional[HandlerIndex], handlers: Sequence[AbstractHandler]
+) -> HandlerIndex:
+    if index is None or index.size != len(handlers):
+        return HandlerIndex(handlers)
+    return index
+
+
+__all__ = [
+    "DEFERRED_FILTERS", "HandlerIndex", "INDEXED_FILTERS", "get_index"
+]
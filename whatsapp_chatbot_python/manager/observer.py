@@ -1,8 +1,18 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, List, TYPE_CHECKING
-
-from .handler import AbstractHandler, Handler, HandlerType
+from typing import (
+    Any, Callable, Iterator, List, Optional, TYPE_CHECKING, Type
+)
+
+from .handler import (
+    AbstractHandler,
+    AsyncHandler,
+    AsyncNotification,
+    Handler,
+    HandlerType,
+    Notification
+)
+from .index import HandlerIndex, get_index
 from .state import AbstractStateManager, StateManager
 
 if TYPE_CHECKING:
@@ -17,29 +27,54 @@ class AbstractObserver(ABC):
     def update_event(self, event: dict) -> None:
         self.event = event
 
-        self.propagate_event()
+        self.propagate_event(event)
 
     @abstractmethod
     def add_handler(self, handler: HandlerType, **filters: Any) -> None:
         pass
 
     @abstractmethod
-    def propagate_event(self) -> None:
+    def propagate_event(self, event: Optional[dict] = None) -> None:
         pass
 
 
 class Observer(AbstractObserver):
+    notification_class: Type[Notification] = Notification
+
     def __init__(self, router: "Router"):
         self.router = router
 
         self.event = {}
         self.handlers = []
-        self.state_manager = StateManager()
+        if router.state_manager is not None:
+            self.state_manager = router.state_manager
+        else:
+            self.state_manager = StateManager()
+
+        self.index: Optional[HandlerIndex] = None
 
     def add_handler(self, handler: HandlerType, **filters: Any) -> None:
         self.handlers.append(Handler(handler, **filters))
 
-    def propagate_event(self) -> None:
+        self.index = None
+
+    def create_notification(self, event: dict) -> Notification:
+        return self.notification_class(
+            event, self.router.api, self.state_manager
+        )
+
+    def get_candidates(
+            self, notification: Notification
+    ) -> Iterator[AbstractHandler]:
+        self.index = get_index(self.index, self.handlers)
+
+        for position in self.index.get_candidates(notification):
+            yield self.handlers[position]
+
+    def propagate_event(self, event: Optional[dict] = None) -> None:
+        if event is None:
+            event = self.event
+
         if not self.handlers:
             self.router.logger.log(
                 logging.DEBUG, (
@@ -49,8 +84,10 @@ class Observer(AbstractObserver):
 
             return None
 
-        for handler in self.handlers:
-            response = handler.execute_handler(self)
+        notification = self.create_notification(event)
+
+        for handler in self.get_candidates(notification):
+            response = handler.execute_handler(self, notification)
             if response:
                 self.router.logger.log(
                     logging.DEBUG, "Event has been successfully handled."
@@ -74,6 +111,51 @@ class Observer(AbstractObserver):
         return wrapper
 
 
+class AsyncObserver(Observer):
+    notification_class = AsyncNotification
+
+    def add_handler(self, handler: HandlerType, **filters: Any) -> None:
+        self.handlers.append(AsyncHandler(handler, **filters))
+
+        self.index = None
+
+    async def update_event(self, event: dict) -> None:
+        self.event = event
+
+        await self.propagate_event(event)
+
+    async def propagate_event(self, event: Optional[dict] = None) -> None:
+        if event is None:
+            event = self.event
+
+        if not self.handlers:
+            self.router.logger.log(
+                logging.DEBUG, (
+                    "Skipping event because there are no subscribers."
+                )
+            )
+
+            return None
+
+        notification = self.create_notification(event)
+
+        for handler in self.get_candidates(notification):
+            response = await handler.execute_handler(self, notification)
+            if response:
+                self.router.logger.log(
+                    logging.DEBUG, "Event has been successfully handled."
+                )
+
+                return None
+
+        self.router.logger.log(
+            logging.DEBUG, (
+                "Event has not been handled "
+                "because all handlers do not match filters."
+            )
+        )
+
+
 class ButtonObserver(Observer):
     def add_handler(self, handler: HandlerType, **filters: Any) -> None:
         message_types = [
@@ -115,6 +197,7 @@ class PollUpdateObserver(Observer):
 
 __all__ = [
     "AbstractObserver",
+    "AsyncObserver",
     "ButtonObserver",
     "Observer",
     "PollObserver",
@@ -0,0 +1,239 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .state import AbstractStateManager, State, intern_state_name
+
+MISSING = object()
+
+
+class RedisStateManager(AbstractStateManager):
+    def __init__(
+            self,
+            client: Any = None,
+            url: str = "redis://localhost:6379/0",
+            prefix: str = "whatsapp_chatbot:state:",
+            ttl: Optional[int] = None,
+            near_cache: bool = False,
+            near_cache_size: int = 10000
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError(
+                    "RedisStateManager requires the redis package. "
+                    "Install it with: pip install redis"
+                ) from None
+
+            client = redis.Redis.from_url(url)
+
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+        self.channel = f"{prefix}invalidate"
+        self.id = uuid.uuid4().hex
+
+        self.near_cache = near_cache
+        self.near_cache_size = near_cache_size
+        # Sender -> state and the time when its key expires in Redis.
+        self.storage: "OrderedDict[str, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self.lock = threading.Lock()
+
+        self.pubsub = None
+        self.thread = None
+        if near_cache:
+            self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+            self.pubsub.subscribe(**{self.channel: self._invalidate})
+            self.thread = self.pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True
+            )
+
+    def get_state(self, sender: str) -> Optional[State]:
+        if self.near_cache:
+            with self.lock:
+                state, expires = self.storage.get(sender, (MISSING, None))
+                if state is not MISSING:
+                    if expires is None or expires > time.monotonic():
+                        self.storage.move_to_end(sender)
+
+                        return state
+
+                    del self.storage[sender]
+
+        return self.get_states([sender])[sender]
+
+    def get_states(self, senders: Iterable[str]) -> Dict[str, Optional[State]]:
+        senders = list(senders)
+
+        # With a TTL the remaining time of each key is read too, so cached
+        # states expire together with their keys.
+        expiring = self.near_cache and self.ttl is not None
+        step = 3 if expiring else 2
+
+        pipeline = self.client.pipeline(transaction=False)
+        for sender in senders:
+            key = self._get_key(sender)
+
+            pipeline.hget(key, "name")
+            pipeline.hgetall(f"{key}:data")
+            if expiring:
+                pipeline.pttl(key)
+
+        now = time.monotonic()
+        replies = pipeline.execute()
+
+        states = {}
+        for index, sender in enumerate(senders):
+            name, data = replies[index * step], replies[index * step + 1]
+            if name is None:
+                state = None
+            else:
+                state = State(intern_state_name(to_str(name)), {
+                    to_str(key): json.loads(value)
+                    for key, value in data.items()
+                } or None)
+
+            states[sender] = state
+
+            if self.near_cache:
+                expires = None
+                if expiring and state is not None:
+                    expires = now + max(replies[index * step + 2], 0) / 1000
+
+                self._cache(sender, state, expires)
+
+        return states
+
+    def set_state(self, sender: str, state_name: str) -> None:
+        key = self._get_key(sender)
+
+        pipeline = self.client.pipeline()
+        pipeline.delete(f"{key}:data")
+        pipeline.hset(key, "name", state_name)
+        self._expire(pipeline, key)
+        self._execute(pipeline, sender)
+
+    def update_state(self, sender: str, state_name: str) -> None:
+        key = self._get_key(sender)
+
+        pipeline = self.client.pipeline()
+        pipeline.hset(key, "name", state_name)
+        self._expire(pipeline, key)
+        self._execute(pipeline, sender)
+
+    def delete_state(self, sender: str) -> None:
+        key = self._get_key(sender)
+
+        pipeline = self.client.pipeline()
+        pipeline.delete(key, f"{key}:data")
+        self._execute(pipeline, sender)
+
+    def get_state_data(self, sender: str) -> Optional[dict]:
+        state = self.get_state(sender)
+        if state:
+            return state.data
+
+    def set_state_data(self, sender: str, state_data: dict) -> None:
+        self._write_state_data(sender, state_data, replace=True)
+
+    def update_state_data(self, sender: str, state_data: dict) -> None:
+        self._write_state_data(sender, state_data, replace=False)
+
+    def delete_state_data(self, sender: str) -> None:
+        key = self._get_key(sender)
+
+        pipeline = self.client.pipeline()
+        pipeline.delete(f"{key}:data")
+        self._execute(pipeline, sender)
+
+    def close(self) -> None:
+        if self.thread is not None:
+            self.thread.stop()
+            self.thread.join()
+            self.thread = None
+
+        if self.pubsub is not None:
+            self.pubsub.close()
+            self.pubsub = None
+
+    def _write_state_data(
+            self, sender: str, state_data: dict, replace: bool
+    ) -> None:
+        key = self._get_key(sender)
+
+        # The data is stored as a hash of JSON values, so a merge is a single
+        # HSET and concurrent updates of different keys do not overwrite
+        # each other. The state key is watched so that the data of a state
+        # deleted in the meantime is not written.
+        def write(pipeline: Any) -> None:
+            if not pipeline.exists(key):
+                return None
+
+            pipeline.multi()
+            if replace:
+                pipeline.delete(f"{key}:data")
+            if state_data:
+                pipeline.hset(f"{key}:data", mapping={
+                    name: json.dumps(value, ensure_ascii=False)
+                    for name, value in state_data.items()
+                })
+            self._expire(pipeline, key)
+            self._publish(pipeline, sender)
+
+        self.client.transaction(write, key)
+
+        self._forget(sender)
+
+    def _expire(self, pipeline: Any, key: str) -> None:
+        if self.ttl is not None:
+            pipeline.expire(key, self.ttl)
+            pipeline.expire(f"{key}:data", self.ttl)
+
+    def _execute(self, pipeline: Any, sender: str) -> None:
+        self._publish(pipeline, sender)
+        pipeline.execute()
+
+        self._forget(sender)
+
+    def _publish(self, pipeline: Any, sender: str) -> None:
+        if self.near_cache:
+            pipeline.publish(self.channel, f"{self.id}:{sender}")
+
+    def _forget(self, sender: str) -> None:
+        if self.near_cache:
+            with self.lock:
+                self.storage.pop(sender, None)
+
+    def _cache(
+            self, sender: str, state: Optional[State], expires: Optional[float]
+    ) -> None:
+        with self.lock:
+            self.storage[sender] = state, expires
+            self.storage.move_to_end(sender)
+
+            while len(self.storage) > self.near_cache_size:
+                self.storage.popitem(last=False)
+
+    def _invalidate(self, message: dict) -> None:
+        instance_id, _, sender = to_str(message["data"]).partition(":")
+        if instance_id != self.id:
+            self._forget(sender)
+
+    def _get_key(self, sender: str) -> str:
+        return f"{self.prefix}{sender}"
+
+
+def to_str(value: Union[bytes, str]) -> str:
+    if isinstance(value, bytes):
+        return value.decode()
+    return value
+
+
+__all__ = ["RedisStateManager"]
@@ -0,0 +1,127 @@
+import re
+from typing import (
+    Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+)
+
+from .handler import AbstractHandler
+from ..filters import RegExpFilter
+
+INLINE_FLAGS = {
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+    re.ASCII: "a",
+    re.UNICODE: ""
+}
+
+GLOBAL_FLAGS = re.compile(r"^\(\?[aiLmsux]+\)")
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
+NO_MATCH = -1
+
+
+def to_group(name: str, regexp: Pattern) -> Optional[str]:
+    pattern = regexp.pattern
+    if not isinstance(pattern, str):
+        return None
+    if regexp.groupindex or BACKREFERENCE.search(pattern):
+        return None
+
+    flags = regexp.flags
+    letters = ""
+    for flag, letter in INLINE_FLAGS.items():
+        if flags & flag:
+            letters += letter
+            flags &= ~flag
+    if flags:
+        return None
+
+    pattern = GLOBAL_FLAGS.sub("", pattern)
+    if "x" in letters:
+        pattern = f"{pattern}\n"
+
+    group = f"(?P<{name}>(?{letters}:{pattern}))"
+    try:
+        re.compile(group)
+    except re.error:
+        return None
+
+    return group
+
+
+class RegExpMatcher:
+    def __init__(
+            self, handlers: Sequence[AbstractHandler], chunk_size: int = 512
+    ):
+        self.filters: Dict[int, RegExpFilter] = {}
+        self.chunks: List[Tuple[List[int], Pattern]] = []
+        self.positions: Dict[int, Tuple[int, int]] = {}
+
+        groups: List[Tuple[int, str]] = []
+        for position, handler in enumerate(handlers):
+            for filter_ in getattr(handler, "compiled_filters", []):
+                if isinstance(filter_, RegExpFilter):
+                    group = to_group(f"h{position}", filter_.regexp)
+                    if group:
+                        self.filters[position] = filter_
+
+                        groups.append((position, group))
+
+                    break
+
+        for start in range(0, len(groups), chunk_size):
+            chunk = groups[start:start + chunk_size]
+
+            positions = [position for position, _ in chunk]
+            regexp = re.compile("|".join(group for _, group in chunk))
+
+            for offset, position in enumerate(positions):
+                self.positions[position] = (len(self.chunks), offset)
+
+            self.chunks.append((positions, regexp))
+
+    def __bool__(self) -> bool:
+        return bool(self.chunks)
+
+    def filter(
+            self, positions: Iterable[int], text_message: Optional[str]
+    ) -> Iterator[int]:
+        matched: Optional[int] = None
+        for position in positions:
+            if position not in self.positions:
+                yield position
+
+                continue
+
+            if text_message is None:
+                continue
+
+            if matched is None or (NO_MATCH < matched < position):
+                matched = self.match(text_message, position)
+
+            if matched == position:
+                yield position
+
+    def match(self, text_message: str, start: int) -> int:
+        chunk_index, offset = self.positions[start]
+
+        positions, regexp = self.chunks[chunk_index]
+        if not offset:
+            match = regexp.fullmatch(text_message)
+            if match:
+                return int(match.lastgroup[1:])
+        else:
+            for position in positions[offset:]:
+                if self.filters[position].regexp.fullmatch(text_message):
+                    return position
+
+        for positions, regexp in self.chunks[chunk_index + 1:]:
+            match = regexp.fullmatch(text_message)
+            if match:
+                return int(match.lastgroup[1:])
+
+        return NO_MATCH
+
+
+__all__ = ["RegExpMatcher", "to_group"]
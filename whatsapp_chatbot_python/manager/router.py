@@ -1,29 +1,49 @@
 import json
 import logging
-from typing import Dict, TYPE_CHECKING
+import time
+from typing import Dict, Optional, TYPE_CHECKING, Type
 
 from .observer import (
     AbstractObserver,
+    AsyncObserver,
     ButtonObserver,
     Observer,
     PollObserver,
     PollUpdateObserver
 )
+from .state import AbstractStateManager
 
 if TYPE_CHECKING:
     from ..bot import GreenAPI
+    from ..dedupe import EventDeduplicator
+    from ..journal import EventJournal
+    from ..metrics import Metrics
 
 
 class Router:
-    def __init__(self, api: "GreenAPI", logger: logging.Logger):
+    observer_class: Type[Observer] = Observer
+
+    def __init__(
+            self,
+            api: "GreenAPI",
+            logger: logging.Logger,
+            metrics: Optional["Metrics"] = None,
+            state_manager: Optional[AbstractStateManager] = None,
+            deduplicator: Optional["EventDeduplicator"] = None,
+            journal: Optional["EventJournal"] = None
+    ):
         self.api = api
         self.logger = logger
+        self.metrics = metrics
+        self.state_manager = state_manager
+        self.deduplicator = deduplicator
+        self.journal = journal
 
-        self.message: AbstractObserver = Observer(self)
-        self.outgoing_message: AbstractObserver = Observer(self)
-        self.outgoing_api_message: AbstractObserver = Observer(self)
-        self.outgoing_message_status: AbstractObserver = Observer(self)
-        self.incoming_call: AbstractObserver = Observer(self)
+        self.message: AbstractObserver = self.observer_class(self)
+        self.outgoing_message: AbstractObserver = self.observer_class(self)
+        self.outgoing_api_message: AbstractObserver = self.observer_class(self)
+        self.outgoing_message_status: AbstractObserver = self.observer_class(self)
+        self.incoming_call: AbstractObserver = self.observer_class(self)
 
         self.buttons: AbstractObserver = ButtonObserver(self)
 
@@ -39,19 +59,90 @@ class Router:
         }
 
     def route_event(self, event: dict) -> None:
+        if self.journal is None:
+            return self._route_event(event)
+
+        try:
+            self._route_event(event)
+        finally:
+            self.journal.mark_done(event)
+
+    def _route_event(self, event: dict) -> None:
+        deduplicator = self.deduplicator
+        if deduplicator is not None and deduplicator.is_handled(event):
+            return None
+
         type_webhook = event["typeWebhook"]
 
         observer = self.observers.get(type_webhook)
         if observer:
+            self._log_event(type_webhook, event)
+
+            if self.metrics is None:
+                observer.update_event(event)
+            else:
+                started = time.perf_counter()
+                try:
+                    observer.update_event(event)
+                finally:
+                    self._observe_event(type_webhook, started)
+
+        # The event is remembered only after it is handled, so it is handled
+        # again if the process stops in the middle.
+        if deduplicator is not None:
+            deduplicator.add(event)
+
+    def _log_event(self, type_webhook: str, event: dict) -> None:
+        if self.logger.isEnabledFor(logging.DEBUG):
             data = json.dumps(event, ensure_ascii=False, indent=4)
-         
+
             self.logger.log(
                 logging.DEBUG, (
                     f"Routing {type_webhook} event with data: {data}"
                 )
             )
 
-            observer.update_event(event)
+    def _observe_event(self, type_webhook: str, started: float) -> None:
+        self.metrics.observe(
+            "observer_duration_seconds",
+            time.perf_counter() - started,
+            observer=type_webhook
+        )
+        self.metrics.increment("events_total", type_webhook=type_webhook)
+
+
+class AsyncRouter(Router):
+    observer_class = AsyncObserver
+
+    async def route_event(self, event: dict) -> None:
+        if self.journal is None:
+            return await self._route_event(event)
+
+        try:
+            await self._route_event(event)
+        finally:
+            self.journal.mark_done(event)
+
+    async def _route_event(self, event: dict) -> None:
+        deduplicator = self.deduplicator
+        if deduplicator is not None and deduplicator.is_handled(event):
+            return None
+
+        type_webhook = event["typeWebhook"]
+
+        observer = self.observers.get(type_webhook)
+        if observer:
+            self._log_event(type_webhook, event)
+
+            started = time.perf_counter()
+            try:
+                await observer.update_event(event)
+            finally:
+                if self.metrics is not None:
+                    self._observe_event(type_webhook, started)
+
+        if deduplicator is not None:
+            deduplicator.add(event)
 
 
-__all__ = ["Router"]
+__all__ = ["AsyncRouter", "Router"]
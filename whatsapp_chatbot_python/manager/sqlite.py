@@ -0,0 +1,242 @@
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+from typing import Optional, Set
+
+from .state import State, StateManager, intern_state_name
+
+DURABILITY_LEVELS = {"off": "OFF", "normal": "NORMAL", "full": "FULL"}
+
+
+class SQLiteStateManager(StateManager):
+    def __init__(
+            self,
+            path: str = "states.db",
+            namespace: str = "default",
+            durability: str = "normal",
+            flush_interval: float = 1.0,
+            preload: bool = True,
+            logger: Optional[logging.Logger] = None
+    ):
+        super().__init__()
+
+        synchronous = DURABILITY_LEVELS.get(durability)
+        if synchronous is None:
+            raise ValueError(
+                f"Unknown durability level: {durability}. "
+                f"Available levels: {', '.join(DURABILITY_LEVELS)}."
+            )
+
+        self.path = path
+        self.namespace = namespace
+        self.flush_interval = flush_interval
+        self.preload = preload
+        self.logger = logger or logging.getLogger("whatsapp-chatbot-python")
+
+        self.lock = threading.RLock()
+        self.dirty: Set[str] = set()
+        self.missing: Set[str] = set()
+
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={synchronous}")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS states ("
+            "namespace TEXT NOT NULL, "
+            "sender TEXT NOT NULL, "
+            "name TEXT NOT NULL, "
+            "data TEXT, "
+            "PRIMARY KEY (namespace, sender)"
+            ") WITHOUT ROWID"
+        )
+
+        if preload:
+            rows = self.connection.execute(
+                "SELECT sender, name, data FROM states WHERE namespace = ?",
+                (namespace,)
+            )
+            for sender, name, data in rows:
+                self.storage[sender] = State(
+                    intern_state_name(name), self._load_data(data)
+                )
+
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        if flush_interval > 0:
+            self.thread = threading.Thread(
+                target=self._flush_periodically,
+                name="whatsapp-chatbot-state-flusher",
+                daemon=True
+            )
+            self.thread.start()
+
+        atexit.register(self.close)
+
+    def get_state(self, sender: str) -> Optional[State]:
+        state = self.storage.get(sender)
+        if state is not None or self.preload:
+            return state
+
+        with self.lock:
+            if sender in self.storage or sender in self.missing:
+                return self.storage.get(sender)
+
+            row = self.connection.execute(
+                "SELECT name, data FROM states "
+                "WHERE namespace = ? AND sender = ?",
+                (self.namespace, sender)
+            ).fetchone()
+            if row is None:
+                self.missing.add(sender)
+
+                return None
+
+            state = self.storage[sender] = State(
+                intern_state_name(row[0]), self._load_data(row[1])
+            )
+
+            return state
+
+    def set_state(self, sender: str, state_name: str) -> None:
+        with self.lock:
+            super().set_state(sender, state_name)
+
+            self._mark_dirty(sender)
+
+    def update_state(self, sender: str, state_name: str) -> None:
+        with self.lock:
+            super().update_state(sender, state_name)
+
+            self._mark_dirty(sender)
+
+    def delete_state(self, sender: str) -> None:
+        with self.lock:
+            super().delete_state(sender)
+
+            self._mark_dirty(sender)
+
+            # The row is deleted on the next flush, so it must not be read
+            # again before that.
+            self.missing.add(sender)
+
+    def set_state_data(self, sender: str, state_data: dict) -> None:
+        # Data that cannot be stored is rejected at once, not on a flush.
+        self._dump_data(state_data)
+
+        with self.lock:
+            super().set_state_data(sender, state_data)
+
+            self._mark_dirty(sender)
+
+    def update_state_data(self, sender: str, state_data: dict) -> None:
+        self._dump_data(state_data)
+
+        with self.lock:
+            super().update_state_data(sender, state_data)
+
+            self._mark_dirty(sender)
+
+    def delete_state_data(self, sender: str) -> None:
+        with self.lock:
+            super().delete_state_data(sender)
+
+            self._mark_dirty(sender)
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return None
+
+            updated, deleted = [], []
+            written, error = set(), None
+            for sender in self.dirty:
+                state = self.storage.get(sender)
+                if state is None:
+                    deleted.append((self.namespace, sender))
+                else:
+                    # Data can still be changed in place after it was set.
+                    try:
+                        data = self._dump_data(state.data)
+                    except (TypeError, ValueError) as dump_error:
+                        error = dump_error
+                        continue
+
+                    updated.append((self.namespace, sender, state.name, data))
+
+                written.add(sender)
+
+            self.connection.execute("BEGIN")
+            try:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO states (namespace, sender, name, data)"
+                    " VALUES (?, ?, ?, ?)", updated
+                )
+                self.connection.executemany(
+                    "DELETE FROM states WHERE namespace = ? AND sender = ?",
+                    deleted
+                )
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            else:
+                self.connection.execute("COMMIT")
+
+            # Senders that were not written stay dirty and are written on
+            # the next flush.
+            self.dirty.difference_update(written)
+
+            if error is not None:
+                raise error
+
+    def close(self) -> None:
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+        with self.lock:
+            if self.connection is None:
+                return None
+
+            try:
+                self.flush()
+            except Exception as error:
+                self.logger.log(logging.ERROR, error)
+
+            self.connection.close()
+            self.connection = None
+
+        atexit.unregister(self.close)
+
+    def _mark_dirty(self, sender: str) -> None:
+        self.missing.discard(sender)
+        self.dirty.add(sender)
+
+        if self.flush_interval <= 0:
+            self.flush()
+
+    def _flush_periodically(self) -> None:
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as error:
+                self.logger.log(logging.ERROR, error)
+
+    @staticmethod
+    def _dump_data(data: Optional[dict]) -> Optional[str]:
+        if data is None:
+            return None
+        return json.dumps(data, ensure_ascii=False)
+
+    @staticmethod
+    def _load_data(data: Optional[str]) -> Optional[dict]:
+        if data is None:
+            return None
+        return json.loads(data)
+
+
+__all__ = ["DURABILITY_LEVELS", "SQLiteStateManager"]
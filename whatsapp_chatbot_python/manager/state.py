@@ -1,7 +1,11 @@
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 
 class BaseStates(str, Enum):
@@ -10,10 +14,20 @@ class BaseStates(str, Enum):
 
 @dataclass()
 class State:
+    __slots__ = ("name", "data")
+
     name: str
     data: Optional[dict]
 
 
+def intern_state_name(state_name: str) -> str:
+    # Millions of states usually share a few names, so they should share
+    # one string object. Enum members are singletons already.
+    if type(state_name) is str:
+        return sys.intern(state_name)
+    return state_name
+
+
 class AbstractStateManager(ABC):
     storage: Dict[str, State]
 
@@ -58,12 +72,12 @@ class StateManager(AbstractStateManager):
         return self.storage.get(sender)
 
     def set_state(self, sender: str, state_name: str) -> None:
-        self.storage[sender] = State(state_name, None)
+        self.storage[sender] = State(intern_state_name(state_name), None)
 
     def update_state(self, sender: str, state_name: str) -> None:
         state = self.get_state(sender)
         if state:
-            state.name = state_name
+            state.name = intern_state_name(state_name)
         else:
             self.set_state(sender, state_name)
 
@@ -95,4 +109,164 @@ class StateManager(AbstractStateManager):
             state.data = None
 
 
-__all__ = ["BaseStates", "State", "AbstractStateManager", "StateManager"]
+class BoundedStateManager(StateManager):
+    def __init__(
+            self,
+            max_size: Optional[int] = None,
+            ttl: Optional[float] = None,
+            on_evict: Optional[Callable[[str, State], Any]] = None
+    ):
+        super().__init__()
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+
+        self.storage: "OrderedDict[str, State]" = OrderedDict()
+        self.accessed: Dict[str, float] = {}
+        self.lock = threading.RLock()
+
+    def get_state(self, sender: str) -> Optional[State]:
+        with self.lock:
+            state = self.storage.get(sender)
+            if state is None:
+                return None
+
+            now = time.monotonic()
+            if self.ttl is not None and now - self.accessed[sender] >= self.ttl:
+                self._evict(sender)
+
+                return None
+
+            self._touch(sender, now)
+
+            return state
+
+    def set_state(self, sender: str, state_name: str) -> None:
+        with self.lock:
+            super().set_state(sender, state_name)
+
+            self._touch(sender, time.monotonic())
+
+    def update_state(self, sender: str, state_name: str) -> None:
+        with self.lock:
+            super().update_state(sender, state_name)
+
+    def delete_state(self, sender: str) -> None:
+        with self.lock:
+            super().delete_state(sender)
+
+            self.accessed.pop(sender, None)
+
+    def set_state_data(self, sender: str, state_data: dict) -> None:
+        with self.lock:
+            super().set_state_data(sender, state_data)
+
+    def update_state_data(self, sender: str, state_data: dict) -> None:
+        with self.lock:
+            super().update_state_data(sender, state_data)
+
+    def delete_state_data(self, sender: str) -> None:
+        with self.lock:
+            super().delete_state_data(sender)
+
+    def _touch(self, sender: str, now: float) -> None:
+        self.storage.move_to_end(sender)
+        self.accessed[sender] = now
+
+        # The storage is ordered by the last access, so the expired and the
+        # least recently used states are always at the beginning.
+        while self.storage:
+            oldest = next(iter(self.storage))
+            if self.max_size is not None and len(self.storage) > self.max_size:
+                self._evict(oldest)
+            elif (
+                    self.ttl is not None
+                    and now - self.accessed[oldest] >= self.ttl
+            ):
+                self._evict(oldest)
+            else:
+                break
+
+    def _evict(self, sender: str) -> None:
+        state = self.storage.pop(sender)
+        del self.accessed[sender]
+
+        if self.on_evict is not None:
+            self.on_evict(sender, state)
+
+
+class CompactStateManager(StateManager):
+    def __init__(self):
+        super().__init__()
+
+        # States without data are stored as codes of their names instead of
+        # State objects. The storage keeps only the states that have data.
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.compact: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.compact) + len(self.storage)
+
+    def get_state(self, sender: str) -> Optional[State]:
+        code = self.compact.get(sender)
+        if code is not None:
+            return State(self.names[code], None)
+        return self.storage.get(sender)
+
+    def set_state(self, sender: str, state_name: str) -> None:
+        self.storage.pop(sender, None)
+        self.compact[sender] = self._get_code(state_name)
+
+    def update_state(self, sender: str, state_name: str) -> None:
+        state = self.storage.get(sender)
+        if state:
+            state.name = intern_state_name(state_name)
+        else:
+            self.set_state(sender, state_name)
+
+    def delete_state(self, sender: str) -> None:
+        self.compact.pop(sender, None)
+        self.storage.pop(sender, None)
+
+    def set_state_data(self, sender: str, state_data: dict) -> None:
+        code = self.compact.get(sender)
+        if code is not None:
+            if state_data is not None:
+                del self.compact[sender]
+
+                self.storage[sender] = State(self.names[code], state_data)
+        else:
+            super().set_state_data(sender, state_data)
+
+    def update_state_data(self, sender: str, state_data: dict) -> None:
+        if sender in self.compact:
+            self.set_state_data(sender, state_data)
+        else:
+            super().update_state_data(sender, state_data)
+
+    def delete_state_data(self, sender: str) -> None:
+        state = self.storage.pop(sender, None)
+        if state:
+            self.compact[sender] = self._get_code(state.name)
+
+    def _get_code(self, state_name: str) -> int:
+        code = self.codes.get(state_name)
+        if code is None:
+            code = self.codes[state_name] = len(self.names)
+
+            self.names.append(intern_state_name(state_name))
+
+        return code
+
+
+__all__ = [
+    "BaseStates",
+    "State",
+    "AbstractStateManager",
+    "StateManager",
+    "BoundedStateManager",
+    "CompactStateManager",
+    "intern_state_name"
+]
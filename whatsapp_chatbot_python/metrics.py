@@ -0,0 +1,281 @@
+import bisect
+import copy
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Sequence, TYPE_CHECKING,
+    Tuple
+)
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelsKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class AbstractMetricsSink(ABC):
+    @abstractmethod
+    def record(
+            self, kind: str, name: str, value: float, labels: Dict[str, str]
+    ) -> None:
+        pass
+
+
+class CallbackSink(AbstractMetricsSink):
+    def __init__(
+            self, callback: Callable[[str, str, float, Dict[str, str]], Any]
+    ):
+        self.callback = callback
+
+    def record(
+            self, kind: str, name: str, value: float, labels: Dict[str, str]
+    ) -> None:
+        self.callback(kind, name, value, labels)
+
+
+class Metrics:
+    def __init__(
+            self,
+            sinks: Optional[Iterable[AbstractMetricsSink]] = None,
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+            prefix: str = "whatsapp_chatbot_"
+    ):
+        self.sinks: List[AbstractMetricsSink] = list(sinks or [])
+        self.buckets = buckets
+        self.prefix = prefix
+
+        self.labels: Dict[str, str] = {}
+
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelsKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelsKey, Histogram]] = {}
+
+    def with_labels(self, **labels: str) -> "Metrics":
+        metrics = copy.copy(self)
+        metrics.labels = {**self.labels, **labels}
+
+        return metrics
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        if self.labels:
+            labels = {**self.labels, **labels}
+
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            counter = self.counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+        for sink in self.sinks:
+            sink.record("counter", name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if self.labels:
+            labels = {**self.labels, **labels}
+
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            histograms = self.histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram(self.buckets)
+
+            histogram.observe(value)
+
+        for sink in self.sinks:
+            sink.record("histogram", name, value, labels)
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        if self.labels:
+            labels = {**self.labels, **labels}
+
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            return self.counters.get(name, {}).get(key, 0)
+
+    def get_histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        if self.labels:
+            labels = {**self.labels, **labels}
+
+        key = tuple(sorted(labels.items()))
+
+        with self.lock:
+            return self.histograms.get(name, {}).get(key)
+
+    def instrument_api(self, api: "GreenAPI") -> None:
+        api.request = self._time_request(api.request, get_api_method)
+        api.raw_request = self._time_request(
+            api.raw_request, lambda **arguments: get_api_method(
+                arguments.get("method", ""), arguments.get("url", "")
+            )
+        )
+
+    def render_prometheus(self) -> str:
+        lines = []
+
+        with self.lock:
+            for name, counter in sorted(self.counters.items()):
+                name = f"{self.prefix}{name}"
+
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(counter.items()):
+                    lines.append(f"{name}{format_labels(key)} {value}")
+
+            for name, histograms in sorted(self.histograms.items()):
+                name = f"{self.prefix}{name}"
+
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(histograms.items()):
+                    total = 0
+                    for bound, count in zip(
+                            [*histogram.buckets, "+Inf"], histogram.counts
+                    ):
+                        total += count
+
+                        labels = format_labels((*key, ("le", str(bound))))
+                        lines.append(f"{name}_bucket{labels} {total}")
+
+                    labels = format_labels(key)
+                    lines.append(f"{name}_sum{labels} {histogram.sum}")
+                    lines.append(f"{name}_count{labels} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _time_request(
+            self, request: Callable[..., Any], get_method: Callable[..., str]
+    ) -> Callable[..., Any]:
+        @wraps(request)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+
+            response = request(*args, **kwargs)
+
+            self.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - started,
+                method=get_method(*args, **kwargs),
+                code=str(getattr(response, "code", None))
+            )
+
+            return response
+
+        return wrapper
+
+
+class MetricsServer:
+    def __init__(
+            self,
+            metrics: Metrics,
+            host: str = "0.0.0.0",
+            port: int = 9100,
+            logger: Optional[logging.Logger] = None
+    ):
+        self.metrics = metrics
+        self.logger = logger or logging.getLogger("whatsapp-chatbot-python")
+
+        metrics_ = metrics
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path != "/metrics":
+                    self.send_error(404)
+
+                    return None
+
+                body = metrics_.render_prometheus().encode()
+
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+
+                self.wfile.write(body)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), RequestHandler)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self) -> None:
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            name="whatsapp-chatbot-metrics",
+            daemon=True
+        )
+        self.thread.start()
+
+        self.logger.log(
+            logging.INFO, f"Started metrics server on port {self.port}."
+        )
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+
+def get_api_method(method: str, url: str, *_: Any, **__: Any) -> str:
+    parts = url.split("/")
+    for index, part in enumerate(parts):
+        if part.startswith("waInstance") and index + 1 < len(parts):
+            return parts[index + 1]
+
+    return method
+
+
+def format_labels(key: LabelsKey) -> str:
+    if not key:
+        return ""
+
+    labels = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\")
+            .replace("\n", "\\n").replace('"', '\\"')
+        ) for name, value in key
+    )
+
+    return f"{{{labels}}}"
+
+
+__all__ = [
+    "AbstractMetricsSink",
+    "CallbackSink",
+    "DEFAULT_BUCKETS",
+    "Histogram",
+    "Metrics",
+    "MetricsServer"
+]
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+)
+
+import aiohttp
+from whatsapp_api_client_python.response import Response
+
+from .bot import AsyncBot, GreenAPI, GreenAPIError
+from .dedupe import EventDeduplicator
+from .dispatcher import AsyncChatDispatcher
+from .manager.router import AsyncRouter
+from .metrics import Metrics
+from .settings import SettingsCache
+
+
+class MultiBot:
+    bot_class: Type[AsyncBot] = AsyncBot
+
+    def __init__(
+            self,
+            instances: Iterable[Tuple[str, str]],
+            debug_mode: bool = False,
+            raise_errors: bool = False,
+            host: Optional[str] = None,
+            media: Optional[str] = None,
+            bot_debug_mode: bool = False,
+            settings: Optional[dict] = None,
+            delete_notifications_at_startup: bool = True,
+            metrics: Optional[Metrics] = None,
+            startup_workers: int = 16,
+            max_notification_age: Optional[float] = None,
+            drain_in_background: bool = False,
+            settings_cache: Optional[SettingsCache] = None,
+            deduplicator: Optional[EventDeduplicator] = None
+    ):
+        self.metrics = metrics
+
+        def create_bot(instance: Tuple[str, str]) -> AsyncBot:
+            id_instance, api_token_instance = instance
+
+            return self.bot_class(
+                id_instance,
+                api_token_instance,
+                debug_mode=debug_mode,
+                raise_errors=raise_errors,
+                host=host,
+                media=media,
+                bot_debug_mode=bot_debug_mode,
+                settings=settings,
+                delete_notifications_at_startup=delete_notifications_at_startup,
+                metrics=(
+                    metrics.with_labels(instance=id_instance)
+                    if metrics is not None else None
+                ),
+                max_notification_age=max_notification_age,
+                drain_in_background=drain_in_background,
+                settings_cache=settings_cache,
+                deduplicator=deduplicator
+            )
+
+        with ThreadPoolExecutor(startup_workers) as executor:
+            self.bots: List[AsyncBot] = list(executor.map(create_bot, instances))
+
+        self.logger = logging.getLogger("whatsapp-chatbot-python")
+
+        # Handlers are added to this router once and used by the routers of
+        # all instances. Each instance keeps its own API client and states.
+        self.router = AsyncRouter(None, self.logger, metrics)
+        for bot in self.bots:
+            self._share_handlers(bot.router)
+
+        self._share_session()
+
+    def get_bot(self, id_instance: str) -> AsyncBot:
+        for bot in self.bots:
+            if bot.id_instance == id_instance:
+                return bot
+
+        raise KeyError(id_instance)
+
+    async def run_forever(
+            self,
+            max_concurrent_events: int = 100,
+            max_connections: int = 0
+    ) -> None:
+        self.logger.log(
+            logging.INFO, (
+                "Started receiving incoming notifications "
+                f"for {len(self.bots)} instances."
+            )
+        )
+
+        connector = aiohttp.TCPConnector(limit=max_connections)
+        async with self.bots[0]._create_session(connector) as session:
+            # Answers from handlers use the same connections as polling.
+            for bot in self.bots:
+                bot.api.requestAsync = request_with_session(bot.api, session)
+
+            try:
+                await asyncio.gather(*[
+                    bot._poll(session, AsyncChatDispatcher(
+                        bot.router, bot.logger, max_concurrent_events
+                    )) for bot in self.bots
+                ])
+            finally:
+                for bot in self.bots:
+                    del bot.api.requestAsync
+
+        self.logger.log(
+            logging.INFO, "Stopped receiving incoming notifications."
+        )
+
+    def _share_handlers(self, router: AsyncRouter) -> None:
+        observers: Dict[str, List] = {
+            type_webhook: observer.handlers
+            for type_webhook, observer in self.router.observers.items()
+        }
+
+        for type_webhook, observer in router.observers.items():
+            observer.handlers = observers[type_webhook]
+            observer.index = None
+
+    def _share_session(self) -> None:
+        if not self.bots:
+            return None
+
+        session = self.bots[0].api.session
+        session.headers["Connection"] = "keep-alive"
+
+        for bot in self.bots[1:]:
+            bot.api.session.close()
+            bot.api.session = session
+
+        self.bots[0]._resize_connection_pool(max(len(self.bots), 10))
+
+
+def request_with_session(
+        api: GreenAPI, session: aiohttp.ClientSession
+) -> Callable[..., Awaitable[Response]]:
+    # Replaces GreenAPI.requestAsync, which opens a new session and
+    # connection for every request.
+    async def request(
+            method: str,
+            url: str,
+            payload: Optional[dict] = None,
+            files: Optional[dict] = None
+    ) -> Response:
+        url = url.replace("{{host}}", api.host)
+        url = url.replace("{{media}}", api.media)
+        url = url.replace("{{idInstance}}", api.idInstance)
+        url = url.replace("{{apiTokenInstance}}", api.apiTokenInstance)
+
+        arguments: Dict[str, Any] = {"json": payload}
+        if files:
+            data = aiohttp.FormData()
+            for key, value in (payload or {}).items():
+                if isinstance(value, (dict, list)):
+                    data.add_field(
+                        key, json.dumps(value), content_type="application/json"
+                    )
+                else:
+                    data.add_field(key, str(value))
+
+            for field_name, (file_name, file, content_type) in files.items():
+                data.add_field(
+                    field_name, file,
+                    filename=file_name, content_type=content_type
+                )
+
+            arguments = {"data": data}
+
+        timeout = aiohttp.ClientTimeout(
+            total=api.media_timeout if files else api.host_timeout
+        )
+
+        try:
+            async with session.request(
+                    method, url, timeout=timeout, **arguments
+            ) as response:
+                status, text = response.status, await response.text()
+        except Exception as error:
+            error_message = f"Async request was failed with error: {error}."
+
+            if api.raise_errors:
+                raise GreenAPIError(error_message)
+            api.logger.log(logging.CRITICAL, error_message)
+
+            return Response(None, error_message)
+
+        if status != 200:
+            error_message = (
+                f"Async request was failed with status code: {status}."
+                f" Data: {text}"
+            )
+
+            if api.raise_errors:
+                raise GreenAPIError(error_message)
+            api.logger.log(logging.ERROR, error_message)
+
+        return Response(status, text)
+
+    return request
+
+
+__all__ = ["MultiBot", "request_with_session"]
@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+
+RETRY_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Takes a token and returns how long the caller has to wait before
+        # using it. Tokens may be borrowed from the future, so callers are
+        # served in the order they came.
+        with self.lock:
+            now = time.monotonic()
+
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def is_full(self) -> bool:
+        with self.lock:
+            elapsed = time.monotonic() - self.updated
+
+            return self.tokens + elapsed * self.rate >= self.capacity
+
+
+class Message:
+    __slots__ = ("method", "chat", "args", "kwargs", "futures")
+
+    def __init__(
+            self, method: str, chat: str, args: tuple, kwargs: dict
+    ):
+        self.method = method
+        self.chat = chat
+        self.args = args
+        self.kwargs = kwargs
+        self.futures: List[Future] = [Future()]
+
+    def is_plain_text(self) -> bool:
+        return (
+                self.method == "sendMessage"
+                and len(self.args) >= 2
+                and all(arg is None for arg in self.args[2:])
+                and not self.kwargs
+        )
+
+    def can_coalesce(self, message: "Message") -> bool:
+        # Only text messages without options are joined.
+        return (
+                self.chat == message.chat
+                and self.is_plain_text() and message.is_plain_text()
+        )
+
+
+class Outbox:
+    def __init__(
+            self,
+            api: "GreenAPI",
+            logger: Optional[logging.Logger] = None,
+            rate: Optional[float] = None,
+            chat_rate: Optional[float] = None,
+            workers: int = 4,
+            max_retries: int = 5,
+            backoff: float = 1.0,
+            max_backoff: float = 60.0,
+            coalesce: bool = False,
+            max_message_length: int = 4096,
+            queue_size: int = 10000
+    ):
+        if workers < 1:
+            raise ValueError("The number of workers must be positive.")
+
+        self.api = api
+        self.logger = logger or logging.getLogger("whatsapp-chatbot-python")
+
+        self.sending = api.sending
+
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self.bucket = TokenBucket(rate) if rate else None
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.coalesce = coalesce
+        self.max_message_length = max_message_length
+
+        self.queue_size = queue_size
+        self.queues: List[Deque[Message]] = [deque() for _ in range(workers)]
+        self.conditions = [threading.Condition() for _ in range(workers)]
+        self.threads: List[threading.Thread] = []
+        self.stopped = False
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_") or "sending" not in self.__dict__:
+            raise AttributeError(name)
+
+        method = getattr(self.sending, name)
+        if not callable(method):
+            return method
+
+        if name.endswith("Async"):
+            sync_name = name[:-len("Async")]
+
+            async def submit_async(*args: Any, **kwargs: Any) -> asyncio.Future:
+                future = self._put(sync_name, args, kwargs, block=False)
+                if future is None:
+                    # The queue is full, so the event loop is not blocked
+                    # while waiting for a place in it.
+                    future = await asyncio.get_running_loop().run_in_executor(
+                        None, partial(self.submit, sync_name, *args, **kwargs)
+                    )
+
+                return asyncio.wrap_future(future)
+
+            return submit_async
+
+        def submit(*args: Any, **kwargs: Any) -> Future:
+            return self.submit(name, *args, **kwargs)
+
+        return submit
+
+    def start(self) -> None:
+        self.stopped = False
+
+        for index, condition in enumerate(self.conditions):
+            thread = threading.Thread(
+                target=self._work,
+                args=(self.queues[index], condition),
+                name=f"whatsapp-chatbot-outbox-{index}",
+                daemon=True
+            )
+            thread.start()
+
+            self.threads.append(thread)
+
+        self.api.sending = self
+
+        self.logger.log(
+            logging.DEBUG, f"Started {len(self.threads)} outbox workers."
+        )
+
+    def stop(self) -> None:
+        self.api.sending = self.sending
+
+        for condition in self.conditions:
+            with condition:
+                self.stopped = True
+
+                condition.notify_all()
+
+        for thread in self.threads:
+            thread.join()
+
+        self.threads.clear()
+
+        self.logger.log(logging.DEBUG, "Stopped outbox workers.")
+
+    def submit(self, method: str, *args: Any, **kwargs: Any) -> Future:
+        return self._put(method, args, kwargs, block=True)
+
+    def _put(
+            self, method: str, args: tuple, kwargs: dict, block: bool
+    ) -> Optional[Future]:
+        # Without blocking, None is returned when the queue is full.
+        chat = args[0] if args and isinstance(args[0], str) else ""
+
+        message = Message(method, chat, args, kwargs)
+
+        index = zlib.crc32(chat.encode()) % len(self.queues)
+
+        condition = self.conditions[index]
+        with condition:
+            if self.stopped:
+                raise RuntimeError("The outbox is stopped.")
+
+            message_queue = self.queues[index]
+            while len(message_queue) >= self.queue_size:
+                if not block:
+                    return None
+
+                condition.wait()
+
+            message_queue.append(message)
+
+            condition.notify_all()
+
+        return message.futures[0]
+
+    def _work(
+            self, message_queue: Deque[Message], condition: threading.Condition
+    ) -> None:
+        while True:
+            with condition:
+                while not message_queue and not self.stopped:
+                    condition.wait()
+
+                if not message_queue:
+                    break
+
+                message = message_queue.popleft()
+                if self.coalesce:
+                    self._coalesce(message, message_queue)
+
+                condition.notify_all()
+
+            delay = self._reserve(message.chat)
+            if delay:
+                time.sleep(delay)
+
+            self._send(message)
+
+    def _coalesce(self, message: Message, message_queue: Deque[Message]) -> None:
+        while message_queue and message.can_coalesce(message_queue[0]):
+            chat, text, *options = message.args
+            next_text = message_queue[0].args[1]
+
+            text = f"{text}\n{next_text}"
+            if len(text) > self.max_message_length:
+                break
+
+            message.args = (chat, text, *options)
+            message.futures.extend(message_queue.popleft().futures)
+
+    def _reserve(self, chat: str) -> float:
+        delay = 0.0
+        if self.bucket is not None:
+            delay = self.bucket.reserve()
+
+        if self.chat_rate and chat:
+            with self.lock:
+                bucket = self.chat_buckets.get(chat)
+                if bucket is None:
+                    if len(self.chat_buckets) >= self.queue_size:
+                        self._remove_idle_buckets()
+
+                    bucket = self.chat_buckets[chat] = TokenBucket(
+                        self.chat_rate
+                    )
+
+            delay = max(delay, bucket.reserve())
+
+        return delay
+
+    def _remove_idle_buckets(self) -> None:
+        for chat, bucket in list(self.chat_buckets.items()):
+            if bucket.is_full():
+                del self.chat_buckets[chat]
+
+    def _send(self, message: Message) -> None:
+        try:
+            response = call_with_retries(
+                getattr(self.sending, message.method),
+                message.args,
+                message.kwargs,
+                self.max_retries,
+                self.backoff,
+                self.max_backoff,
+                self.logger
+            )
+        except Exception as error:
+            for future in message.futures:
+                future.set_exception(error)
+        else:
+            for future in message.futures:
+                future.set_result(response)
+
+
+def call_with_retries(
+        function: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        max_retries: int,
+        backoff: float,
+        max_backoff: float,
+        logger: logging.Logger
+) -> Any:
+    attempt = 0
+    while True:
+        try:
+            response = function(*args, **kwargs)
+        except Exception as error:
+            if attempt >= max_retries:
+                raise
+
+            logger.log(logging.ERROR, error)
+        else:
+            code = getattr(response, "code", None)
+            if code not in RETRY_CODES or attempt >= max_retries:
+                return response
+
+            logger.log(
+                logging.WARNING, (
+                    f"Request {getattr(function, '__name__', function)} "
+                    f"failed with status code {code}. Retrying it."
+                )
+            )
+
+        time.sleep(min(backoff * 2 ** attempt, max_backoff))
+
+        attempt += 1
+
+
+__all__ = ["Outbox", "RETRY_CODES", "TokenBucket", "call_with_retries"]
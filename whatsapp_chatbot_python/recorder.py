@@ -0,0 +1,69 @@
+import atexit
+import gzip
+import json
+import threading
+import time
+import zlib
+from typing import IO, Iterator, Tuple
+
+
+class EventRecorder:
+    def __init__(
+            self, path: str = "events.jsonl.gz", flush_interval: float = 1.0
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self.lock = threading.Lock()
+        # Each run appends a new gzip member, so one file can hold several
+        # recordings.
+        self.file: IO[str] = gzip.open(path, "at", encoding="utf-8")
+
+        self.recorded = 0
+        self.flushed = time.monotonic()
+
+        atexit.register(self.close)
+
+    def record(self, event: dict) -> None:
+        line = json.dumps(
+            {"time": time.time(), "body": event}, ensure_ascii=False
+        )
+
+        with self.lock:
+            if self.file.closed:
+                return None
+
+            self.file.write(line + "\n")
+
+            self.recorded += 1
+
+            # Compressed data is written out periodically, so a recording
+            # of a killed bot can still be read.
+            now = time.monotonic()
+            if now - self.flushed >= self.flush_interval:
+                self.file.flush()
+                self.flushed = now
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, dict]]:
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        try:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may be incomplete if the bot was killed.
+                    continue
+
+                yield record["time"], record["body"]
+        except (EOFError, zlib.error):
+            # The last gzip member is not finished if the bot was killed.
+            pass
+
+
+__all__ = ["EventRecorder", "read_recording"]
@@ -0,0 +1,422 @@
+import argparse
+import asyncio
+import contextlib
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+)
+
+from whatsapp_api_client_python.response import Response
+
+from .manager.router import AsyncRouter, Router
+from .metrics import CallbackSink, Metrics
+from .recorder import read_recording
+
+
+class StubSending:
+    # Replaces api.sending, so handlers can answer without an instance.
+    # Every method returns a successful response.
+    def __init__(self):
+        self.calls: Dict[str, int] = defaultdict(int)
+
+        self.counter = itertools.count(1)
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name.endswith("Async"):
+            async def method(*_: Any, **__: Any) -> Response:
+                return self._respond(name)
+        else:
+            def method(*_: Any, **__: Any) -> Response:
+                return self._respond(name)
+
+        return method
+
+    def _respond(self, name: str) -> Response:
+        self.calls[name] += 1
+
+        return Response(
+            200, json.dumps({"idMessage": f"REPLAY{next(self.counter):012d}"})
+        )
+
+
+@dataclass()
+class LatencyStats:
+    count: int
+    p50: float
+    p99: float
+
+    @classmethod
+    def from_durations(cls, durations: List[float]) -> "LatencyStats":
+        durations = sorted(durations)
+
+        return cls(
+            len(durations),
+            get_percentile(durations, 50),
+            get_percentile(durations, 99)
+        )
+
+
+@dataclass()
+class ReplayReport:
+    events: int
+    errors: int
+    elapsed: float
+    latency: LatencyStats
+    observers: Dict[str, LatencyStats]
+    handlers: Dict[str, LatencyStats]
+    sent: Dict[str, int]
+    allocated_blocks: Optional[int] = None
+    allocated_bytes: Optional[int] = None
+    peak_bytes: Optional[int] = None
+    top_allocations: List[str] = field(default_factory=list)
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> str:
+        lines = [
+            f"Events: {self.events}, errors: {self.errors}, "
+            f"elapsed: {self.elapsed:.3f} s, "
+            f"events/s: {self.events_per_second:.0f}",
+            "",
+            f"{'':<40} {'count':>8} {'p50, ms':>9} {'p99, ms':>9}",
+            format_latency("route_event", self.latency)
+        ]
+
+        for name, stats in sorted(self.observers.items()):
+            lines.append(format_latency(f"observer {name}", stats))
+        for name, stats in sorted(self.handlers.items()):
+            lines.append(format_latency(f"handler {name}", stats))
+
+        if self.sent:
+            lines.append("")
+            lines.append("Stubbed API calls: " + ", ".join(
+                f"{name}={count}" for name, count in sorted(self.sent.items())
+            ))
+
+        if self.allocated_blocks is not None:
+            lines.append("")
+            per_event = self.allocated_blocks / max(self.events, 1)
+
+            lines.append(
+                f"Allocated blocks still alive: {self.allocated_blocks} "
+                f"({per_event:.1f} per event), "
+                f"{self.allocated_bytes} bytes, peak: {self.peak_bytes} bytes"
+            )
+            lines.extend(self.top_allocations)
+
+        return "\n".join(lines)
+
+
+def replay(
+        router: Router,
+        events: Iterable[Tuple[float, dict]],
+        speed: Optional[float] = None,
+        trace_allocations: bool = False
+) -> ReplayReport:
+    # Events are routed one by one, as fast as possible or, with speed, at
+    # the recorded pace multiplied by it.
+    events = list(events)
+
+    durations: Dict[Tuple[str, str], List[float]] = defaultdict(list)
+
+    def collect(
+            kind: str, name: str, value: float, labels: Dict[str, str]
+    ) -> None:
+        if name == "observer_duration_seconds":
+            durations["observer", labels["observer"]].append(value)
+        elif name == "handler_duration_seconds":
+            durations["handler", labels["handler"]].append(value)
+
+    sending = StubSending()
+    latencies: List[float] = []
+
+    with _prepare_router(router, Metrics([CallbackSink(collect)]), sending):
+        started = time.perf_counter()
+
+        errors = _run(router, events, speed, latencies)
+
+        elapsed = time.perf_counter() - started
+
+    allocations = {}
+    if trace_allocations:
+        # Allocations are counted in a second pass without metrics, so
+        # tracing does not slow down the timed pass, and the durations kept
+        # for the report are not counted.
+        with _prepare_router(router, None, StubSending()):
+            allocations = _trace_allocations(
+                lambda: _run(router, events, None, None)
+            )
+
+    return ReplayReport(
+        events=len(events),
+        errors=errors,
+        elapsed=elapsed,
+        latency=LatencyStats.from_durations(latencies),
+        observers={
+            name: LatencyStats.from_durations(values)
+            for (kind, name), values in durations.items()
+            if kind == "observer"
+        },
+        handlers={
+            name: LatencyStats.from_durations(values)
+            for (kind, name), values in durations.items()
+            if kind == "handler"
+        },
+        sent=dict(sending.calls),
+        **allocations
+    )
+
+
+def _run(
+        router: Router,
+        events: List[Tuple[float, dict]],
+        speed: Optional[float],
+        latencies: Optional[List[float]]
+) -> int:
+    if isinstance(router, AsyncRouter):
+        return asyncio.run(_replay_async(router, events, speed, latencies))
+
+    return _replay(router, events, speed, latencies)
+
+
+def _replay(
+        router: Router,
+        events: List[Tuple[float, dict]],
+        speed: Optional[float],
+        latencies: Optional[List[float]]
+) -> int:
+    errors = 0
+
+    for delay, event in _pace(events, speed):
+        if delay > 0:
+            time.sleep(delay)
+
+        started = time.perf_counter()
+        try:
+            router.route_event(event)
+        except Exception:
+            errors += 1
+
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+
+    return errors
+
+
+async def _replay_async(
+        router: AsyncRouter,
+        events: List[Tuple[float, dict]],
+        speed: Optional[float],
+        latencies: Optional[List[float]]
+) -> int:
+    errors = 0
+
+    for delay, event in _pace(events, speed):
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        started = time.perf_counter()
+        try:
+            await router.route_event(event)
+        except Exception:
+            errors += 1
+
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+
+    return errors
+
+
+def _pace(
+        events: List[Tuple[float, dict]], speed: Optional[float]
+) -> Iterator[Tuple[float, dict]]:
+    if not speed:
+        for _, event in events:
+            yield 0.0, event
+
+        return None
+
+    started = time.perf_counter()
+    first_time = events[0][0] if events else 0.0
+    for event_time, event in events:
+        yield (
+            (event_time - first_time) / speed
+            - (time.perf_counter() - started)
+        ), event
+
+
+@contextlib.contextmanager
+def _prepare_router(
+        router: Router, metrics: Optional[Metrics], sending: StubSending
+) -> Iterator[None]:
+    # Replayed events are not in the journal, were already handled by the
+    # live bot and must not be remembered as handled, and sent messages
+    # must not reach the instance.
+    previous = (
+        router.metrics, router.journal, router.deduplicator, router.api.sending
+    )
+
+    router.metrics, router.journal, router.deduplicator = metrics, None, None
+    router.api.sending = sending
+    try:
+        yield None
+    finally:
+        (
+            router.metrics, router.journal, router.deduplicator,
+            router.api.sending
+        ) = previous
+
+
+def _trace_allocations(function: Callable[[], Any]) -> Dict[str, Any]:
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+
+    tracemalloc.clear_traces()
+    before = tracemalloc.take_snapshot()
+    current, _ = tracemalloc.get_traced_memory()
+    try:
+        function()
+
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    # Blocks that are still alive after the replay, e.g. state of senders or
+    # caches that grow with every event.
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    statistics = [
+        statistic for statistic in after.filter_traces(ignored).compare_to(
+            before.filter_traces(ignored), "lineno"
+        )
+        if statistic.count_diff > 0
+    ]
+
+    return {
+        "allocated_blocks": sum(s.count_diff for s in statistics),
+        "allocated_bytes": sum(max(s.size_diff, 0) for s in statistics),
+        "peak_bytes": peak - current,
+        "top_allocations": [str(s) for s in statistics[:5]]
+    }
+
+
+def get_percentile(durations: List[float], percent: float) -> float:
+    # Nearest-rank percentile of sorted durations.
+    if not durations:
+        return 0.0
+
+    index = max(int(len(durations) * percent / 100 + 0.5) - 1, 0)
+
+    return durations[min(index, len(durations) - 1)]
+
+
+def format_latency(name: str, stats: LatencyStats) -> str:
+    return (
+        f"{name[:40]:<40} {stats.count:>8}"
+        f" {stats.p50 * 1000:>9.3f} {stats.p99 * 1000:>9.3f}"
+    )
+
+
+def load_router(target: str) -> Router:
+    # The target is module:attribute, where the attribute is a bot, a router
+    # or a function that returns one of them. The module is imported
+    # without requests to the instance: bots skip their startup requests,
+    # and run_forever or run_webhook called by the module return at once.
+    from .bot import AsyncBot, Bot
+    from .multibot import MultiBot
+
+    def skip(*_: Any, **__: Any) -> None:
+        return None
+
+    async def skip_async(*_: Any, **__: Any) -> None:
+        return None
+
+    replacements = [
+        (Bot, "_check_settings", skip),
+        (Bot, "_delete_notifications_at_startup", skip),
+        (Bot, "run_forever", skip),
+        (Bot, "run_webhook", skip),
+        (AsyncBot, "run_forever", skip_async),
+        (AsyncBot, "run_webhook", skip_async),
+        (MultiBot, "run_forever", skip_async)
+    ]
+    originals = [
+        (owner, name, vars(owner)[name]) for owner, name, _ in replacements
+    ]
+
+    module_name, _, attribute = target.partition(":")
+
+    for owner, name, replacement in replacements:
+        setattr(owner, name, replacement)
+    try:
+        value = getattr(
+            importlib.import_module(module_name), attribute or "bot"
+        )
+        if not isinstance(value, (Bot, Router)):
+            value = value()
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+    return value.router if isinstance(value, Bot) else value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded notifications through the bot router."
+    )
+    parser.add_argument("path", help="Recording of EventRecorder.")
+    parser.add_argument(
+        "target", help="Bot or router as module:attribute, e.g. main:bot."
+    )
+    parser.add_argument(
+        "--speed", type=float, default=None,
+        help="Replay at the recorded pace multiplied by this value."
+    )
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--allocations", action="store_true",
+        help="Count memory allocations with tracemalloc."
+    )
+    arguments = parser.parse_args()
+
+    sys.path.insert(0, os.getcwd())
+
+    router = load_router(arguments.target)
+
+    events = list(itertools.islice(
+        read_recording(arguments.path), arguments.limit
+    ))
+
+    report = replay(router, events, arguments.speed, arguments.allocations)
+
+    print(report.format())
+
+
+__all__ = [
+    "LatencyStats",
+    "ReplayReport",
+    "StubSending",
+    "get_percentile",
+    "load_router",
+    "replay"
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+# At least one of these notifications is needed to receive messages.
+MESSAGE_WEBHOOKS = (
+    "incomingWebhook", "outgoingMessageWebhook", "outgoingAPIMessageWebhook"
+)
+
+
+class SettingsCache:
+    def __init__(self, path: str):
+        self.path = path
+
+        self.lock = threading.Lock()
+        self.settings: Dict[str, dict] = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.settings = json.load(file)
+
+    def get(self, id_instance: str) -> Optional[dict]:
+        with self.lock:
+            return self.settings.get(id_instance)
+
+    def set(self, id_instance: str, settings: dict) -> None:
+        with self.lock:
+            self.settings[id_instance] = settings
+
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(self.settings, file)
+
+            os.replace(temporary_path, self.path)
+
+    def is_valid(self, id_instance: str, settings: Optional[dict]) -> bool:
+        # Checks whether the last known settings are enough to start without
+        # waiting for the API.
+        cached_settings = self.get(id_instance)
+        if not cached_settings:
+            return False
+
+        if settings:
+            return all(
+                cached_settings.get(key) == value
+                for key, value in settings.items()
+            )
+
+        return any(
+            cached_settings.get(key) == "yes" for key in MESSAGE_WEBHOOKS
+        )
+
+
+__all__ = ["MESSAGE_WEBHOOKS", "SettingsCache"]
@@ -0,0 +1,400 @@
+import hashlib
+import json
+import mimetypes
+import os
+import pathlib
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import (
+    Any, Callable, Dict, Iterator, Optional, TYPE_CHECKING, Tuple
+)
+
+from whatsapp_api_client_python.response import Response
+
+if TYPE_CHECKING:
+    from .bot import GreenAPI
+
+# Files uploaded to the Green API storage are kept for a limited time, so
+# links are not reused forever.
+DEFAULT_TTL = 24 * 60 * 60
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class UploadCache:
+    def __init__(
+            self,
+            path: Optional[str] = None,
+            ttl: float = DEFAULT_TTL,
+            chunk_size: int = 1024 * 1024
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+
+        self.lock = threading.Lock()
+        # Content digest -> (URL, expiration time).
+        self.urls: Dict[str, Tuple[str, float]] = {}
+        # File path -> (size, modification time, content digest).
+        self.digests: Dict[str, Tuple[int, int, str]] = {}
+
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                now = time.time()
+
+                self.urls = {
+                    digest: (url, expires)
+                    for digest, (url, expires) in json.load(file).items()
+                    if expires > now
+                }
+
+    def get(self, file: str) -> Optional[str]:
+        digest = self.get_digest(file)
+
+        with self.lock:
+            item = self.urls.get(digest)
+            if item is None:
+                return None
+
+            url, expires = item
+            if expires <= time.time():
+                del self.urls[digest]
+
+                return None
+
+            return url
+
+    def set(self, file: str, url: str) -> None:
+        digest = self.get_digest(file)
+
+        with self.lock:
+            self.urls[digest] = (url, time.time() + self.ttl)
+
+            self._save()
+
+    def invalidate(self, file: str) -> None:
+        digest = self.get_digest(file)
+
+        with self.lock:
+            if self.urls.pop(digest, None):
+                self._save()
+
+    def get_digest(self, file: str) -> str:
+        # Files are hashed only when they have changed.
+        path = os.path.realpath(file)
+        stat = os.stat(path)
+
+        item = self.digests.get(path)
+        if item and item[:2] == (stat.st_size, stat.st_mtime_ns):
+            return item[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as content:
+            for chunk in iter(lambda: content.read(self.chunk_size), b""):
+                digest.update(chunk)
+
+        self.digests[path] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+        return digest.hexdigest()
+
+    def instrument_api(self, api: "GreenAPI") -> None:
+        sending = api.sending
+
+        sending.sendFileByUpload = self._cache_upload(
+            sending.sendFileByUpload, sending.sendFileByUrl
+        )
+        sending.sendFileByUploadAsync = self._cache_upload_async(
+            sending.sendFileByUploadAsync, sending.sendFileByUrlAsync
+        )
+
+    def _save(self) -> None:
+        if not self.path:
+            return None
+
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(self.urls, file)
+
+        os.replace(temporary_path, self.path)
+
+    def _cache_upload(
+            self,
+            send_file_by_upload: Callable[..., Response],
+            send_file_by_url: Callable[..., Response]
+    ) -> Callable[..., Response]:
+        @wraps(send_file_by_upload)
+        def wrapper(
+                chatId: str,
+                path: str,
+                fileName: Optional[str] = None,
+                caption: Optional[str] = None,
+                quotedMessageId: Optional[str] = None,
+                typingTime: Optional[int] = None,
+                typingType: Optional[str] = None
+        ) -> Response:
+            url = self.get(path)
+            if url:
+                response = send_file_by_url(
+                    chatId, url, fileName or pathlib.Path(path).name,
+                    caption, quotedMessageId, None, typingTime, typingType
+                )
+                if response.code == 200:
+                    return response
+
+                self.invalidate(path)
+
+            response = send_file_by_upload(
+                chatId, path, fileName, caption, quotedMessageId,
+                typingTime, typingType
+            )
+            self._remember(path, response)
+
+            return response
+
+        return wrapper
+
+    def _cache_upload_async(
+            self,
+            send_file_by_upload: Callable[..., Any],
+            send_file_by_url: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        @wraps(send_file_by_upload)
+        async def wrapper(
+                chatId: str,
+                path: str,
+                fileName: Optional[str] = None,
+                caption: Optional[str] = None,
+                quotedMessageId: Optional[str] = None,
+                typingTime: Optional[int] = None,
+                typingType: Optional[str] = None
+        ) -> Response:
+            url = self.get(path)
+            if url:
+                response = await send_file_by_url(
+                    chatId, url, fileName or pathlib.Path(path).name,
+                    caption, quotedMessageId, None, typingTime, typingType
+                )
+                if response.code == 200:
+                    return response
+
+                self.invalidate(path)
+
+            response = await send_file_by_upload(
+                chatId, path, fileName, caption, quotedMessageId,
+                typingTime, typingType
+            )
+            self._remember(path, response)
+
+            return response
+
+        return wrapper
+
+    def _remember(self, path: str, response: Response) -> None:
+        if response.code != 200:
+            return None
+
+        url = (response.data or {}).get("urlFile")
+        if url:
+            self.set(path, url)
+
+
+class MultipartStream:
+    # A multipart/form-data body that reads the file in chunks while it is
+    # sent, so the memory used does not depend on the file size.
+
+    def __init__(
+            self,
+            fields: Dict[str, Any],
+            path: str,
+            file_name: str,
+            content_type: Optional[str] = None,
+            chunk_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        self.path = path
+        self.chunk_size = chunk_size
+
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        head = b"".join(
+            self._get_part_header(name) + str(value).encode() + b"\r\n"
+            for name, value in fields.items() if value is not None
+        )
+
+        file_name = file_name.replace('"', "%22")
+        self.head = head + self._get_part_header(
+            "file", f'; filename="{file_name}"',
+            content_type or "application/octet-stream"
+        )
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+    def __len__(self) -> int:
+        # The length is known in advance, so the body is sent with the
+        # Content-Length header instead of the chunked transfer encoding.
+        return len(self.head) + os.path.getsize(self.path) + len(self.tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        # The file is opened again on each iteration, so the body can be sent
+        # again when a request is retried.
+        yield self.head
+
+        with open(self.path, "rb") as file:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                yield chunk
+
+        yield self.tail
+
+    def _get_part_header(
+            self,
+            name: str,
+            parameters: str = "",
+            content_type: Optional[str] = None
+    ) -> bytes:
+        header = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"{parameters}\r\n'
+        )
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+
+        return f"{header}\r\n".encode()
+
+
+class StreamingUploads:
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def instrument_api(self, api: "GreenAPI") -> None:
+        sending = api.sending
+
+        @wraps(sending.sendFileByUpload)
+        def send_file_by_upload(*args: Any, **kwargs: Any) -> Response:
+            return stream_file_by_upload(
+                api, *args, chunk_size=self.chunk_size, **kwargs
+            )
+
+        @wraps(sending.sendFileByUploadAsync)
+        async def send_file_by_upload_async(
+                *args: Any, **kwargs: Any
+        ) -> Response:
+            return await stream_file_by_upload_async(api, *args, **kwargs)
+
+        @wraps(sending.uploadFile)
+        def upload(path: str) -> Response:
+            return upload_file(api, path)
+
+        sending.sendFileByUpload = send_file_by_upload
+        sending.sendFileByUploadAsync = send_file_by_upload_async
+        sending.uploadFile = upload
+
+
+def stream_file_by_upload(
+        api: "GreenAPI",
+        chatId: str,
+        path: str,
+        fileName: Optional[str] = None,
+        caption: Optional[str] = None,
+        quotedMessageId: Optional[str] = None,
+        typingTime: Optional[int] = None,
+        typingType: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Response:
+    file_name = pathlib.Path(path).name
+
+    body = MultipartStream(
+        {
+            "chatId": chatId,
+            "fileName": fileName,
+            "caption": caption,
+            "quotedMessageId": quotedMessageId,
+            "typingTime": typingTime,
+            "typingType": typingType
+        },
+        path,
+        file_name,
+        mimetypes.guess_type(file_name)[0],
+        chunk_size
+    )
+
+    return api.raw_request(
+        method="POST",
+        url=(
+            f"{api.media}/waInstance{api.idInstance}/"
+            f"sendFileByUpload/{api.apiTokenInstance}"
+        ),
+        data=body,
+        headers={
+            "Content-Type": body.content_type,
+            "User-Agent": "GREEN-API_SDK_PY/1.0"
+        },
+        timeout=api.media_timeout
+    )
+
+
+async def stream_file_by_upload_async(
+        api: "GreenAPI",
+        chatId: str,
+        path: str,
+        fileName: Optional[str] = None,
+        caption: Optional[str] = None,
+        quotedMessageId: Optional[str] = None,
+        typingTime: Optional[int] = None,
+        typingType: Optional[str] = None
+) -> Response:
+    file_name = pathlib.Path(path).name
+
+    request_body = {
+        key: value for key, value in {
+            "chatId": chatId,
+            "fileName": fileName,
+            "caption": caption,
+            "quotedMessageId": quotedMessageId,
+            "typingTime": typingTime,
+            "typingType": typingType
+        }.items() if value is not None
+    }
+
+    # aiohttp reads an open file in chunks while sending the form.
+    with open(path, "rb") as file:
+        return await api.requestAsync(
+            "POST", (
+                "{{media}}/waInstance{{idInstance}}/"
+                "sendFileByUpload/{{apiTokenInstance}}"
+            ),
+            request_body,
+            {"file": (file_name, file, mimetypes.guess_type(file_name)[0])}
+        )
+
+
+def upload_file(api: "GreenAPI", path: str) -> Response:
+    file_name = pathlib.Path(path).name
+
+    # requests sends an open file in blocks instead of reading it at once.
+    with open(path, "rb") as file:
+        return api.raw_request(
+            method="POST",
+            url=(
+                f"{api.media}/waInstance{api.idInstance}/"
+                f"uploadFile/{api.apiTokenInstance}"
+            ),
+            data=file,
+            headers={
+                "Content-Type": mimetypes.guess_type(file_name)[0],
+                "GA-Filename": file_name
+            },
+            timeout=api.media_timeout
+        )
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_TTL",
+    "MultipartStream",
+    "StreamingUploads",
+    "UploadCache",
+    "stream_file_by_upload",
+    "stream_file_by_upload_async",
+    "upload_file"
+]
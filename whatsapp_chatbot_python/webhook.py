@@ -0,0 +1,75 @@
+import hmac
+import json
+import logging
+import queue
+from typing import Any, Awaitable, Callable, Optional
+
+from aiohttp import web
+
+EventCallback = Callable[[dict], Awaitable[Any]]
+
+
+class WebhookServer:
+    def __init__(
+            self,
+            on_event: EventCallback,
+            logger: logging.Logger,
+            path: str = "/",
+            webhook_token: Optional[str] = None
+    ):
+        self.on_event = on_event
+        self.logger = logger
+
+        self.path = path
+        self.webhook_token = webhook_token
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_request)
+
+        return app
+
+    async def handle_request(self, request: web.Request) -> web.Response:
+        if not self._check_token(request.headers.get("Authorization")):
+            self.logger.log(
+                logging.WARNING,
+                f"Rejected webhook request from {request.remote}."
+            )
+
+            return web.Response(status=401)
+
+        try:
+            event = await request.json()
+        except json.JSONDecodeError:
+            return web.Response(status=400)
+
+        if not isinstance(event, dict) or "typeWebhook" not in event:
+            return web.Response(status=400)
+
+        try:
+            await self.on_event(event)
+        except queue.Full:
+            self.logger.log(
+                logging.WARNING,
+                "Rejected webhook request because the queue is full."
+            )
+
+            return web.Response(status=503)
+
+        return web.Response(status=200)
+
+    def _check_token(self, authorization: Optional[str]) -> bool:
+        if not self.webhook_token:
+            return True
+        if not authorization:
+            return False
+
+        if authorization.startswith("Bearer "):
+            authorization = authorization[len("Bearer "):]
+
+        return hmac.compare_digest(
+            authorization.encode(), self.webhook_token.encode()
+        )
+
+
+__all__ = ["EventCallback", "WebhookServer"]